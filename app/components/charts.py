@@ -0,0 +1,401 @@
+"""
+Capa de Datos para Gráficos
+===========================
+
+Pre-agrega en el servidor (NumPy) los datos de histogramas y diagramas de
+caja, de modo que al navegador solo se envían arrays resumidos cuyo tamaño
+no depende del número de filas. Para los scatter, reduce el nivel de
+detalle en el servidor y usa trazas WebGL cuando hay muchos puntos.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Número máximo de outliers individuales que se envían en un boxplot
+MAX_BOX_OUTLIERS = 500
+
+# Scatter: a partir de este número de puntos se usan trazas WebGL
+WEBGL_POINT_THRESHOLD = 1000
+
+# Scatter: número máximo de puntos enviados tras la reducción de detalle
+MAX_SCATTER_POINTS = 5000
+
+
+# =============================================================================
+# HISTOGRAMAS
+# =============================================================================
+
+def compute_histogram(
+    values,
+    nbins: int = 50,
+    log: bool = False,
+    bin_edges: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula los conteos de un histograma con NumPy.
+    
+    Args:
+        values: Valores a agrupar (los NaN se ignoran)
+        nbins: Número de bins
+        log: Usar bins espaciados logarítmicamente (solo valores positivos)
+        bin_edges: Bordes explícitos (p.ej. para compartirlos entre series)
+    
+    Returns:
+        Tupla (counts, edges) con len(edges) == len(counts) + 1
+    """
+    x = np.asarray(values, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    
+    if bin_edges is None:
+        bin_edges = compute_bin_edges(x, nbins, log)
+    
+    counts, edges = np.histogram(x, bins=bin_edges)
+    return counts, edges
+
+
+def compute_bin_edges(values, nbins: int = 50, log: bool = False) -> np.ndarray:
+    """
+    Calcula bordes de bins comunes para una o varias series.
+    
+    Args:
+        values: Valores (o concatenación de varias series)
+        nbins: Número de bins
+        log: Bins logarítmicos sobre la parte positiva de los datos
+    
+    Returns:
+        Array con nbins + 1 bordes
+    """
+    x = np.asarray(values, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    
+    if log:
+        x = x[x > 0]
+    
+    if x.size == 0:
+        return np.linspace(0, 1, nbins + 1)
+    
+    x_min, x_max = x.min(), x.max()
+    if x_min == x_max:
+        x_min, x_max = x_min - 0.5, x_max + 0.5
+    
+    if log:
+        return np.geomspace(x_min, x_max, nbins + 1)
+    return np.linspace(x_min, x_max, nbins + 1)
+
+
+def histogram_trace(
+    counts: np.ndarray,
+    edges: np.ndarray,
+    name: str = '',
+    color: Optional[str] = None,
+    opacity: float = 1.0
+) -> go.Bar:
+    """
+    Crea una traza de barras a partir de un histograma pre-agregado.
+    
+    Args:
+        counts: Conteo por bin
+        edges: Bordes de los bins
+        name: Nombre de la serie (leyenda)
+        color: Color de las barras
+        opacity: Opacidad de las barras
+    
+    Returns:
+        Traza go.Bar con una barra por bin
+    """
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    
+    return go.Bar(
+        x=centers,
+        y=counts,
+        width=widths,
+        name=name,
+        marker_color=color,
+        opacity=opacity,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate='[%{customdata[0]:,.1f}, %{customdata[1]:,.1f})<br>'
+                      'Frecuencia: %{y:,}<extra>' + name + '</extra>'
+    )
+
+
+def histogram_figure(
+    values,
+    nbins: int = 50,
+    log: bool = False,
+    color: Optional[str] = None,
+    name: str = ''
+) -> go.Figure:
+    """
+    Figura de histograma con bins calculados en el servidor.
+    
+    Equivalente a px.histogram pero enviando solo nbins barras.
+    
+    Args:
+        values: Valores a agrupar
+        nbins: Número de bins
+        log: Bins logarítmicos (y eje X en escala log)
+        color: Color de las barras
+        name: Nombre de la serie
+    
+    Returns:
+        Figura Plotly con una traza de barras
+    """
+    counts, edges = compute_histogram(values, nbins=nbins, log=log)
+    
+    fig = go.Figure(histogram_trace(counts, edges, name=name, color=color))
+    fig.update_layout(bargap=0, showlegend=bool(name))
+    
+    if log:
+        fig.update_xaxes(type='log')
+    
+    return fig
+
+
+# =============================================================================
+# DIAGRAMAS DE CAJA
+# =============================================================================
+
+def compute_box_stats(values, max_outliers: int = MAX_BOX_OUTLIERS) -> Dict[str, object]:
+    """
+    Calcula cuartiles, bigotes (regla 1.5·IQR) y outliers de una serie.
+    
+    Args:
+        values: Valores (los NaN se ignoran)
+        max_outliers: Máximo de outliers individuales a conservar
+                      (se conservan los más alejados de la mediana)
+    
+    Returns:
+        Diccionario con q1, median, q3, mean, lowerfence, upperfence,
+        outliers (array) y n_outliers (total, antes de recortar)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    
+    if x.size == 0:
+        return {
+            'q1': np.nan, 'median': np.nan, 'q3': np.nan, 'mean': np.nan,
+            'lowerfence': np.nan, 'upperfence': np.nan,
+            'outliers': np.array([]), 'n_outliers': 0
+        }
+    
+    q1, median, q3 = np.quantile(x, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_limit = q1 - 1.5 * iqr
+    high_limit = q3 + 1.5 * iqr
+    
+    inside = (x >= low_limit) & (x <= high_limit)
+    outliers = x[~inside]
+    n_outliers = outliers.size
+    
+    # Bigotes: valores extremos dentro de los límites
+    lowerfence = x[inside].min() if inside.any() else q1
+    upperfence = x[inside].max() if inside.any() else q3
+    
+    if n_outliers > max_outliers:
+        distance = np.abs(outliers - median)
+        keep = np.argpartition(distance, -max_outliers)[-max_outliers:]
+        outliers = outliers[keep]
+    
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'mean': x.mean(),
+        'lowerfence': lowerfence,
+        'upperfence': upperfence,
+        'outliers': np.sort(outliers),
+        'n_outliers': n_outliers
+    }
+
+
+def box_traces(stats: Dict[str, object], name: str = '', color: Optional[str] = None) -> List:
+    """
+    Crea las trazas de un boxplot pre-agregado (caja + outliers).
+    
+    Args:
+        stats: Diccionario devuelto por compute_box_stats
+        name: Nombre/categoría de la caja
+        color: Color de la caja y los outliers
+    
+    Returns:
+        Lista con la traza go.Box y, si hay outliers, una go.Scatter
+    """
+    traces = [go.Box(
+        x=[name],
+        q1=[stats['q1']],
+        median=[stats['median']],
+        q3=[stats['q3']],
+        mean=[stats['mean']],
+        lowerfence=[stats['lowerfence']],
+        upperfence=[stats['upperfence']],
+        name=name,
+        marker_color=color,
+        boxpoints=False,
+        showlegend=False
+    )]
+    
+    if len(stats['outliers']):
+        traces.append(go.Scatter(
+            x=[name] * len(stats['outliers']),
+            y=stats['outliers'],
+            mode='markers',
+            marker=dict(color=color, size=5, opacity=0.6),
+            name=f"Outliers ({stats['n_outliers']:,})",
+            hovertemplate='%{y:,.0f}<extra>Outlier</extra>',
+            showlegend=False
+        ))
+    
+    return traces
+
+
+def box_figure(values, name: str = '', color: Optional[str] = None) -> go.Figure:
+    """
+    Figura de boxplot con estadísticas calculadas en el servidor.
+    
+    Equivalente a px.box pero enviando solo cuartiles, bigotes y un número
+    acotado de outliers.
+    
+    Args:
+        values: Valores a resumir
+        name: Nombre de la caja
+        color: Color de la caja
+    
+    Returns:
+        Figura Plotly con la caja y sus outliers
+    """
+    return go.Figure(box_traces(compute_box_stats(values), name=name, color=color))
+
+
+# =============================================================================
+# SCATTER (WEBGL Y NIVEL DE DETALLE)
+# =============================================================================
+
+def reduce_points(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    max_points: int = MAX_SCATTER_POINTS,
+    priority: Optional[str] = None,
+    log_columns: Sequence[str] = ()
+) -> pd.DataFrame:
+    """
+    Reduce el número de puntos de un scatter con agregación en rejilla.
+    
+    Divide el espacio de las columnas en una rejilla regular y conserva un
+    representante por celda (el de mayor prioridad). Además conserva siempre
+    los extremos de cada eje y los outliers (z robusto > 3.5), de modo que la
+    forma de la nube y sus valores atípicos siguen visibles.
+    
+    Args:
+        df: Datos del scatter
+        columns: Columnas que definen la posición (2 o 3 ejes)
+        max_points: Máximo de puntos a conservar
+        priority: Columna que decide el representante de cada celda
+                  (p.ej. el tamaño de la burbuja); por defecto, el primero
+        log_columns: Columnas que se agrupan en escala logarítmica
+    
+    Returns:
+        Subconjunto de df con a lo sumo max_points filas
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    
+    coords = df[list(columns)].to_numpy(dtype=np.float64, copy=True)
+    for j, col in enumerate(columns):
+        if col in log_columns:
+            coords[:, j] = np.log10(np.where(coords[:, j] > 0, coords[:, j], np.nan))
+    
+    # Sin filas completas no hay nada que dibujar (p. ej. un eje todo NaN)
+    valid = ~np.isnan(coords).any(axis=1)
+    if not valid.any():
+        return df
+    
+    lo, hi = np.nanmin(coords, axis=0), np.nanmax(coords, axis=0)
+    filled = np.where(np.isnan(coords), lo, coords)
+    
+    # Extremos de cada eje
+    keep = np.zeros(n, dtype=bool)
+    keep[np.nanargmin(coords, axis=0)] = True
+    keep[np.nanargmax(coords, axis=0)] = True
+    
+    # Outliers por z robusto (mediana/MAD)
+    median = np.nanmedian(coords, axis=0)
+    mad = np.nanmedian(np.abs(coords - median), axis=0)
+    mad = np.where(mad > 0, mad, np.inf)
+    outliers = valid & (0.6745 * np.abs(filled - median) / mad > 3.5).any(axis=1)
+    
+    # Rejilla con ~max_points/2 celdas (el resto del presupuesto, para outliers)
+    n_dims = len(columns)
+    grid_size = max(2, int((max_points / 2) ** (1 / n_dims)))
+    span = np.where(hi > lo, hi - lo, 1.0)
+    cells = np.clip(((filled - lo) / span * grid_size).astype(np.int64), 0, grid_size - 1)
+    cell_id = np.ravel_multi_index(tuple(cells.T), (grid_size,) * n_dims)
+    
+    # Representante de cada celda: el de mayor prioridad
+    if priority:
+        weight = np.nan_to_num(df[priority].to_numpy(dtype=np.float64), nan=-np.inf)
+    else:
+        weight = -np.arange(n, dtype=np.float64)
+    order = np.lexsort((-weight, cell_id))
+    first_in_cell = np.ones(n, dtype=bool)
+    first_in_cell[1:] = cell_id[order][1:] != cell_id[order][:-1]
+    keep[order[first_in_cell]] = True
+    
+    # Outliers hasta agotar el presupuesto (los de mayor prioridad primero)
+    extra = np.flatnonzero(outliers & ~keep)
+    budget = max_points - int(keep.sum())
+    if budget > 0 and extra.size:
+        extra = extra[np.argsort(-weight[extra], kind='stable')[:budget]]
+        keep[extra] = True
+    
+    return df[keep & valid]
+
+
+def scatter_render_mode(n_points: int) -> str:
+    """Modo de renderizado de px.scatter: WebGL por encima del umbral."""
+    return 'webgl' if n_points > WEBGL_POINT_THRESHOLD else 'svg'
+
+
+def scatter_figure(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    z: Optional[str] = None,
+    max_points: int = MAX_SCATTER_POINTS,
+    priority: Optional[str] = None,
+    **kwargs
+) -> go.Figure:
+    """
+    Scatter de Plotly Express con reducción de detalle y WebGL automáticos.
+    
+    Con pocos puntos equivale a px.scatter / px.scatter_3d. Con muchos,
+    reduce los puntos en el servidor (reduce_points) y, en 2D, usa trazas
+    WebGL (scattergl) para que el tiempo de render del navegador no crezca
+    con el tamaño de los datos. Los scatter 3D ya se dibujan con WebGL.
+    
+    Args:
+        df: Datos del scatter
+        x: Columna del eje X
+        y: Columna del eje Y
+        z: Columna del eje Z (scatter 3D si se indica)
+        max_points: Máximo de puntos enviados al navegador
+        priority: Columna que decide qué punto representa cada celda
+        **kwargs: Argumentos de px.scatter / px.scatter_3d
+    
+    Returns:
+        Figura Plotly
+    """
+    columns = [x, y] if z is None else [x, y, z]
+    log_columns = [x] * bool(kwargs.get('log_x')) + [y] * bool(kwargs.get('log_y'))
+    
+    data = reduce_points(df, columns, max_points=max_points, priority=priority, log_columns=log_columns)
+    
+    if z is not None:
+        return px.scatter_3d(data, x=x, y=y, z=z, **kwargs)
+    
+    return px.scatter(data, x=x, y=y, render_mode=scatter_render_mode(len(data)), **kwargs)
@@ -0,0 +1,151 @@
+"""
+Mapa Coroplético de Saldo Migratorio
+====================================
+
+Separa el mapa mundial en una parte estática y una parte dinámica:
+el índice país → ISO3 y la figura base (geografía, escala de color y
+layout) se calculan una sola vez por versión del dataset, y ante un cambio
+de filtros solo se recalculan y sustituyen los arrays de valores (z,
+customdata) de la traza.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from typing import Dict, Tuple
+
+from components.data_loader import DataLoader, get_dataset_version
+from components.figure_cache import figure_from_spec
+
+
+MAP_HOVER_TEMPLATE = (
+    '<b>%{customdata[0]}</b><br>'
+    'Inmigración: %{customdata[1]:,}<br>'
+    'Emigración: %{customdata[2]:,}<br>'
+    'Saldo Neto: %{z:,}<extra></extra>'
+)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_country_index(_data_loader: DataLoader, version: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Índice fijo de países del dataset completo y su código ISO3.
+    
+    Se construye una vez por versión del dataset (no por filtro), de modo
+    que los valores del mapa se alinean por posición sin merges.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        version: Versión del dataset (ver get_dataset_version)
+    
+    Returns:
+        Tupla (países, iso3) como arrays alineados
+    """
+    df_flows = _data_loader.load_flows()
+    
+    iso_map = pd.concat([
+        df_flows[['origin', 'origin_iso3']].set_axis(['country', 'iso3'], axis=1),
+        df_flows[['destination', 'destination_iso3']].set_axis(['country', 'iso3'], axis=1)
+    ]).drop_duplicates(subset='country')
+    
+    return iso_map['country'].to_numpy(dtype=object), iso_map['iso3'].to_numpy(dtype=object)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_base_map_spec(version: tuple) -> dict:
+    """
+    Figura base del mapa (sin datos), cacheada por versión del dataset.
+    
+    Args:
+        version: Versión del dataset (ver get_dataset_version)
+    
+    Returns:
+        Especificación (dict) de la figura con una traza Choropleth vacía
+    """
+    fig = go.Figure(go.Choropleth(
+        locationmode='ISO-3',
+        colorscale='RdYlGn',
+        zmid=0,
+        marker_line_color='rgba(255,255,255,0.1)',
+        colorbar=dict(title='Saldo Neto'),
+        hovertemplate=MAP_HOVER_TEMPLATE
+    ))
+    
+    fig.update_geos(
+        showcountries=True,
+        countrycolor="rgba(255,255,255,0.1)",
+        bgcolor='rgba(0,0,0,0)'
+    )
+    
+    fig.update_layout(
+        title='Saldo Migratorio Neto por País',
+        height=500,
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=0, r=0, t=40, b=0)
+    )
+    
+    return fig.to_dict()
+
+
+def compute_map_values(df_flows: pd.DataFrame, countries: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Inmigración, emigración y saldo neto alineados con el índice de países.
+    
+    Usa códigos categóricos y np.bincount en lugar de groupby + merge.
+    
+    Args:
+        df_flows: DataFrame de flujos (ya filtrado)
+        countries: Índice de países devuelto por get_country_index
+    
+    Returns:
+        Diccionario con arrays immigration, emigration y net_balance
+    """
+    n_countries = len(countries)
+    weights = df_flows['n_researchers'].to_numpy(dtype='float64')
+    
+    dest_codes = pd.Categorical(df_flows['destination'], categories=countries).codes
+    origin_codes = pd.Categorical(df_flows['origin'], categories=countries).codes
+    
+    immigration = np.bincount(dest_codes[dest_codes >= 0], weights[dest_codes >= 0], minlength=n_countries)
+    emigration = np.bincount(origin_codes[origin_codes >= 0], weights[origin_codes >= 0], minlength=n_countries)
+    
+    return {
+        'immigration': immigration,
+        'emigration': emigration,
+        'net_balance': immigration - emigration
+    }
+
+
+def create_net_migration_map(df_flows: pd.DataFrame, data_loader: DataLoader) -> go.Figure:
+    """
+    Mapa coroplético del saldo neto: figura base cacheada + arrays nuevos.
+    
+    Args:
+        df_flows: DataFrame de flujos (ya filtrado)
+        data_loader: Cargador de datos compartido
+    
+    Returns:
+        Figura Plotly lista para st.plotly_chart
+    """
+    version = get_dataset_version()
+    countries, iso3 = get_country_index(data_loader, version)
+    spec = get_base_map_spec(version)
+    
+    values = compute_map_values(df_flows, countries)
+    
+    # Solo los países con flujos en el subconjunto filtrado
+    mask = (values['immigration'] + values['emigration']) > 0
+    
+    trace = dict(spec['data'][0])
+    trace['locations'] = iso3[mask].tolist()
+    trace['z'] = values['net_balance'][mask].tolist()
+    trace['customdata'] = np.column_stack([
+        countries[mask],
+        values['immigration'][mask],
+        values['emigration'][mask]
+    ]).tolist()
+    
+    return figure_from_spec({'data': [trace], 'layout': spec['layout']})
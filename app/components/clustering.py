@@ -0,0 +1,167 @@
+"""
+Motor de Clustering de Países
+=============================
+
+Escala las features migratorias, proyecta con PCA y ajusta K-Means para
+todos los k del rango de la página en un único lote paralelo (joblib).
+Los modelos ajustados se persisten en el almacén de artefactos y el
+resultado se cachea por versión del dataset, de modo que mover el slider
+de número de clusters es una consulta, no un reajuste.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from typing import Dict, Sequence
+
+from components.data_loader import DataLoader
+from components.model_store import get_or_fit
+
+
+# Features migratorias por país usadas para el clustering
+CLUSTER_FEATURES = ('immigration', 'emigration', 'net_balance', 'total_flow')
+
+# Rango de número de clusters ofrecido en la página
+K_MIN = 2
+K_MAX = 7
+
+RANDOM_STATE = 42
+N_INIT = 10
+
+
+def fit_kmeans(X: np.ndarray, n_clusters: int, n_init: int = N_INIT) -> Dict[str, object]:
+    """
+    Ajusta K-Means para un k y calcula inercia y silhouette.
+    
+    Args:
+        X: Matriz de features normalizada
+        n_clusters: Número de clusters
+        n_init: Inicializaciones de K-Means
+    
+    Returns:
+        Diccionario con model, labels, centers, inertia y silhouette
+    """
+    kmeans = KMeans(n_clusters=n_clusters, random_state=RANDOM_STATE, n_init=n_init)
+    labels = kmeans.fit_predict(X)
+    
+    return {
+        'model': kmeans,
+        'labels': labels,
+        'centers': kmeans.cluster_centers_,
+        'inertia': float(kmeans.inertia_),
+        'silhouette': float(silhouette_score(X, labels))
+    }
+
+
+def fit_kmeans_range(X: np.ndarray, k_values: Sequence[int], n_jobs: int = -1) -> Dict[int, Dict[str, object]]:
+    """
+    Ajusta K-Means para varios k en paralelo.
+    
+    Se usan hilos: K-Means libera el GIL en sus bucles internos y así se
+    evita serializar la matriz hacia procesos hijos.
+    
+    Args:
+        X: Matriz de features normalizada
+        k_values: Números de clusters a ajustar
+        n_jobs: Trabajos en paralelo (-1 = todos los núcleos)
+    
+    Returns:
+        Diccionario {k: resultado de fit_kmeans}
+    """
+    k_values = [k for k in k_values if 2 <= k < len(X)]
+    
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(fit_kmeans)(X, k) for k in k_values
+    )
+    
+    return dict(zip(k_values, results))
+
+
+@st.cache_data(ttl=3600, show_spinner="Ajustando modelos de clustering...")
+def get_clustering_model(_data_loader: DataLoader, version: tuple,
+                         feature_cols: tuple = CLUSTER_FEATURES) -> Dict[str, object]:
+    """
+    Features escaladas, proyección PCA y K-Means para k en [K_MIN, K_MAX].
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        version: Versión del dataset (ver get_dataset_version)
+        feature_cols: Columnas usadas como features
+    
+    Returns:
+        Diccionario con data (países, features, PC1/PC2), X_scaled,
+        explained_variance y fits ({k: labels, centers, inertia, silhouette});
+        data vacío si no hay países suficientes
+    """
+    feature_cols = list(feature_cols)
+    country_features = _data_loader.compute_net_migration(_data_loader.load_flows())
+    
+    if country_features.empty:
+        return {'data': pd.DataFrame(), 'X_scaled': None, 'explained_variance': None, 'fits': {}}
+    
+    clustering_data = country_features[['country'] + feature_cols].dropna().reset_index(drop=True)
+    
+    if len(clustering_data) < 10:
+        return {'data': pd.DataFrame(), 'X_scaled': None, 'explained_variance': None, 'fits': {}}
+    
+    # Modelos persistidos por hash de features e hiperparámetros
+    X = clustering_data[feature_cols].to_numpy(dtype=np.float64)
+    params = {
+        'features': feature_cols, 'k_min': K_MIN, 'k_max': K_MAX,
+        'n_init': N_INIT, 'random_state': RANDOM_STATE
+    }
+    artifacts = get_or_fit('clustering', X, params, lambda: fit_clustering_artifacts(X))
+    
+    X_scaled = artifacts['scaler'].transform(X)
+    X_pca = artifacts['pca'].transform(X_scaled)
+    clustering_data['PC1'] = X_pca[:, 0]
+    clustering_data['PC2'] = X_pca[:, 1]
+    
+    return {
+        'data': clustering_data,
+        'X_scaled': X_scaled,
+        'explained_variance': np.asarray(artifacts['pca'].explained_variance_ratio_),
+        'fits': artifacts['fits']
+    }
+
+
+def fit_clustering_artifacts(X: np.ndarray) -> Dict[str, object]:
+    """
+    Ajusta escalador, PCA y K-Means (k en [K_MIN, K_MAX]) sobre las features.
+    
+    Args:
+        X: Matriz de features sin normalizar
+    
+    Returns:
+        Diccionario con scaler, pca y fits ({k: resultado de fit_kmeans})
+    """
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    
+    return {
+        'scaler': scaler,
+        'pca': PCA(n_components=2, random_state=RANDOM_STATE).fit(X_scaled),
+        'fits': fit_kmeans_range(X_scaled, range(K_MIN, K_MAX + 1))
+    }
+
+
+def get_model_selection_table(fits: Dict[int, Dict[str, object]]) -> pd.DataFrame:
+    """
+    Tabla de inercia y silhouette por k (para el gráfico del codo).
+    
+    Args:
+        fits: Resultados de fit_kmeans_range
+    
+    Returns:
+        DataFrame con k, inertia y silhouette ordenado por k
+    """
+    return pd.DataFrame({
+        'k': list(fits),
+        'inertia': [fit['inertia'] for fit in fits.values()],
+        'silhouette': [fit['silhouette'] for fit in fits.values()]
+    }).sort_values('k').reset_index(drop=True)
@@ -0,0 +1,283 @@
+"""
+Motor de Correlaciones
+======================
+
+Correlaciones de Pearson y Spearman con datos faltantes por pares
+(pairwise-complete), p-valores, extracción vectorizada del triángulo
+superior e intervalos de confianza bootstrap calculados con todas las
+remuestras en una sola operación de arrays.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from typing import Dict, Optional
+
+
+# Número de remuestras bootstrap por defecto
+N_BOOTSTRAP = 2000
+
+# Mínimo de observaciones comunes para informar una correlación
+MIN_PERIODS = 3
+
+
+def _pairwise_pearson(X: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Pearson por pares con NaN, mediante productos matriciales.
+    
+    Para cada par (i, j) solo se usan las filas donde ambas columnas son
+    válidas (finitas, como en pandas.corr): con la máscara M y X a cero en
+    los huecos, las sumas por par salen de X.T @ M, (X²).T @ M y X.T @ X.
+    Cada columna se centra antes en la media de sus filas válidas para que
+    Σx² − (Σx)²/n no pierda precisión con desplazamientos grandes.
+    """
+    mask = np.isfinite(X)
+    M = mask.astype(np.float64)
+    center = np.where(mask, X, 0.0).sum(axis=0) / np.maximum(M.sum(axis=0), 1.0)
+    X0 = np.where(mask, X - center, 0.0)
+    
+    n = M.T @ M
+    sum_x = X0.T @ M                 # sum_x[i, j] = Σ x_i sobre filas válidas para i y j
+    sum_xx = (X0 * X0).T @ M
+    sum_xy = X0.T @ X0
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_i = sum_xx - sum_x ** 2 / n
+        var_j = var_i.T
+        r = cov / np.sqrt(var_i * var_j)
+    
+    return {'r': np.clip(r, -1.0, 1.0), 'n': n.astype(np.int64)}
+
+
+def _rank_columns(X: np.ndarray) -> np.ndarray:
+    """Rangos medios por columna ignorando los valores no finitos (NaN en el resultado)."""
+    return np.column_stack([
+        stats.rankdata(np.where(np.isfinite(col), col, np.nan), nan_policy='omit')
+        if not np.isfinite(col).all() else stats.rankdata(col)
+        for col in X.T
+    ]) if X.size else X
+
+
+def correlation_matrix(
+    data: pd.DataFrame,
+    method: str = 'pearson',
+    min_periods: int = MIN_PERIODS
+) -> Dict[str, object]:
+    """
+    Matriz de correlaciones con p-valores y observaciones por par.
+    
+    Spearman es Pearson sobre rangos. Sin datos faltantes el resultado es
+    exacto; con NaN los pares que no comparten todas las filas se
+    re-rankean sobre sus filas comunes (igual que pandas.corr).
+    
+    Args:
+        data: DataFrame con columnas numéricas
+        method: 'pearson' o 'spearman'
+        min_periods: Observaciones comunes mínimas (si no, NaN)
+    
+    Returns:
+        Diccionario con columns y matrices r, p_value y n (p × p)
+    """
+    columns = list(data.columns)
+    X = data.to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    if method == 'spearman':
+        pairwise = _pairwise_pearson(_rank_columns(X))
+        
+        missing = ~np.isfinite(X)
+        if missing.any():
+            # Solo los pares con filas no comunes necesitan rangos propios
+            for i, j in zip(*np.triu_indices(len(columns), k=1)):
+                both = ~missing[:, i] & ~missing[:, j]
+                own_rows = (both != ~missing[:, i]).any() or (both != ~missing[:, j]).any()
+                if own_rows and both.sum() >= min_periods:
+                    rho = stats.pearsonr(stats.rankdata(X[both, i]), stats.rankdata(X[both, j]))[0]
+                    pairwise['r'][i, j] = pairwise['r'][j, i] = rho
+    else:
+        pairwise = _pairwise_pearson(X)
+    
+    r, n = pairwise['r'], pairwise['n']
+    r[n < min_periods] = np.nan
+    np.fill_diagonal(r, 1.0)
+    
+    return {
+        'columns': columns,
+        'r': r,
+        'p_value': correlation_p_values(r, n),
+        'n': n
+    }
+
+
+def correlation_p_values(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    P-valores bilaterales de H0: ρ = 0 (t de Student con n - 2 g.l.).
+    
+    Args:
+        r: Coeficientes de correlación
+        n: Observaciones usadas en cada coeficiente
+    
+    Returns:
+        Array de p-valores con la forma de r
+    """
+    r = np.asarray(r, dtype=np.float64)
+    dof = np.asarray(n, dtype=np.float64) - 2
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = r * np.sqrt(dof / np.clip(1 - r ** 2, 1e-300, None))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), np.where(dof > 0, dof, np.nan))
+    
+    return np.where(np.abs(r) >= 1, 0.0, p_value)
+
+
+def adjust_p_values_bh(p_values) -> np.ndarray:
+    """
+    Corrección de Benjamini-Hochberg (tasa de falsos descubrimientos).
+    
+    Los NaN se ignoran: no cuentan como contrastes y se devuelven como NaN.
+    
+    Args:
+        p_values: P-valores sin ajustar
+    
+    Returns:
+        Array de q-valores con la forma de p_values
+    """
+    p = np.asarray(p_values, dtype=np.float64)
+    q = np.full(p.shape, np.nan)
+    
+    valid = np.flatnonzero(np.isfinite(p.ravel()))
+    m = valid.size
+    if m == 0:
+        return q
+    
+    order = valid[np.argsort(p.ravel()[valid])]
+    scaled = p.ravel()[order] * m / np.arange(1, m + 1)
+    
+    # Mínimo acumulado desde el p-valor más alto (monotonía de los q-valores)
+    q.ravel()[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    
+    return q
+
+
+def upper_triangle_pairs(result: Dict[str, object], sort_by_abs: bool = True) -> pd.DataFrame:
+    """
+    Pares de variables del triángulo superior (sin diagonal) en formato largo.
+    
+    Args:
+        result: Diccionario devuelto por correlation_matrix
+        sort_by_abs: Ordenar por |r| descendente
+    
+    Returns:
+        DataFrame con Variable 1, Variable 2, Correlación, p-valor, n y Abs_Corr
+    """
+    rows, cols = np.triu_indices(len(result['columns']), k=1)
+    columns = np.asarray(result['columns'], dtype=object)
+    
+    pairs = pd.DataFrame({
+        'Variable 1': columns[rows],
+        'Variable 2': columns[cols],
+        'Correlación': result['r'][rows, cols],
+        'p-valor': result['p_value'][rows, cols],
+        'n': result['n'][rows, cols]
+    })
+    pairs['Abs_Corr'] = pairs['Correlación'].abs()
+    
+    if sort_by_abs:
+        pairs = pairs.sort_values('Abs_Corr', ascending=False, na_position='last').reset_index(drop=True)
+    
+    return pairs
+
+
+def _rowwise_pearson(xb: np.ndarray, yb: np.ndarray) -> np.ndarray:
+    """Pearson de cada fila de dos matrices (B × n)."""
+    xc = xb - xb.mean(axis=1, keepdims=True)
+    yc = yb - yb.mean(axis=1, keepdims=True)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.einsum('ij,ij->i', xc, yc) / np.sqrt(
+            np.einsum('ij,ij->i', xc, xc) * np.einsum('ij,ij->i', yc, yc)
+        )
+
+
+def bootstrap_correlation_ci(
+    x,
+    y,
+    method: str = 'pearson',
+    n_boot: int = N_BOOTSTRAP,
+    confidence: float = 0.95,
+    seed: Optional[int] = 42
+) -> Dict[str, float]:
+    """
+    Correlación con IC bootstrap por percentiles (remuestreo en lote).
+    
+    Todas las remuestras se generan como una matriz de índices (B × n) y
+    los coeficientes se calculan fila a fila en una única operación.
+    
+    Args:
+        x: Valores de la primera variable
+        y: Valores de la segunda variable
+        method: 'pearson' o 'spearman'
+        n_boot: Número de remuestras
+        confidence: Nivel de confianza del intervalo
+        seed: Semilla del generador (reproducible)
+    
+    Returns:
+        Diccionario con r, p_value, ci_low, ci_high, n y n_boot
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+    x, y = x[valid], y[valid]
+    n = x.size
+    
+    if n < MIN_PERIODS:
+        return {'r': np.nan, 'p_value': np.nan, 'ci_low': np.nan, 'ci_high': np.nan, 'n': n, 'n_boot': 0}
+    
+    if method == 'spearman':
+        x, y = stats.rankdata(x), stats.rankdata(y)
+    
+    r = float(_rowwise_pearson(x[None, :], y[None, :])[0])
+    
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, size=(n_boot, n))
+    xb, yb = x[idx], y[idx]
+    
+    if method == 'spearman':
+        # Re-rankear cada remuestra (los empates reciben el rango medio)
+        xb = stats.rankdata(xb, axis=1)
+        yb = stats.rankdata(yb, axis=1)
+    
+    boot = _rowwise_pearson(xb, yb)
+    boot = boot[np.isfinite(boot)]
+    
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(boot, [tail, 100 - tail]) if boot.size else (np.nan, np.nan)
+    
+    return {
+        'r': r,
+        'p_value': float(correlation_p_values(np.array(r), np.array(n))),
+        'ci_low': float(ci_low),
+        'ci_high': float(ci_high),
+        'n': int(n),
+        'n_boot': int(boot.size)
+    }
+
+
+def format_correlation(result: Dict[str, float], label: str = 'r') -> str:
+    """
+    Texto breve de una correlación con su IC y p-valor.
+    
+    Args:
+        result: Diccionario devuelto por bootstrap_correlation_ci
+        label: Símbolo del coeficiente (r, ρ...)
+    
+    Returns:
+        Cadena del tipo 'r = 0.512 (IC 95%: 0.31 a 0.67 · p < 0.001 · n = 85)'
+    """
+    p = result['p_value']
+    p_text = 'p < 0.001' if p < 0.001 else f'p = {p:.3f}'
+    
+    return (
+        f"{label} = {result['r']:.3f} "
+        f"(IC 95%: {result['ci_low']:.2f} a {result['ci_high']:.2f} · {p_text} · n = {result['n']})"
+    )
@@ -0,0 +1,200 @@
+"""
+Agrupaciones de Países
+======================
+
+Tabla de consulta país (ISO2) → grupo con tres taxonomías: región e
+ingreso del Banco Mundial (Country.csv del WDI) y comunidades de la red de
+movilidad (Louvain sobre los flujos). Se construye en el preprocesamiento
+y load_flows la aplica a través de los códigos de las columnas categóricas
+de origen y destino: una consulta por país distinto, no por fila.
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import WB_REGION_NAMES, INCOME_GROUP_NAMES, WB_REGION_EXTRA
+from components.network import flow_adjacency, louvain_communities
+
+
+COUNTRY_GROUPS_FILE = 'country_groups.parquet'
+
+GROUPINGS = {
+    'region': 'Región (Banco Mundial)',
+    'income': 'Nivel de ingreso',
+    'community': 'Comunidad de la red'
+}
+
+# Grupo de los países sin clasificar
+UNKNOWN_GROUP = 'Otros'
+
+# Países con más flujo que dan nombre a cada comunidad
+COMMUNITY_LABEL_SIZE = 3
+
+
+def load_wdi_taxonomy(raw_dir: Path) -> Optional[pd.DataFrame]:
+    """
+    Región y nivel de ingreso de cada país según Country.csv.
+    
+    Args:
+        raw_dir: Directorio de la descarga original del WDI
+    
+    Returns:
+        DataFrame indexado por ISO2 con region e income (en español), o
+        None si no existe Country.csv
+    """
+    path = raw_dir / 'Country.csv'
+    if not path.exists():
+        return None
+    
+    # keep_default_na=False: 'NA' es el código ISO2 de Namibia
+    countries = pd.read_csv(
+        path, usecols=['Alpha2Code', 'Region', 'IncomeGroup'], keep_default_na=False
+    ).replace('', np.nan).dropna(subset=['Alpha2Code', 'Region'])
+    
+    taxonomy = countries.set_index('Alpha2Code')
+    extra = pd.Series(WB_REGION_EXTRA).drop(taxonomy.index, errors='ignore')
+    
+    return pd.DataFrame({
+        'region': pd.concat([taxonomy['Region'], extra]).map(WB_REGION_NAMES),
+        'income': taxonomy['IncomeGroup'].map(INCOME_GROUP_NAMES).reindex(
+            taxonomy.index.append(extra.index)
+        )
+    })
+
+
+def as_group_categorical(values: pd.Series, categories: Optional[List[str]] = None) -> pd.Categorical:
+    """
+    Categórica de grupos con UNKNOWN_GROUP para los valores ausentes.
+    
+    Args:
+        values: Grupo de cada país (NaN si no se conoce)
+        categories: Orden de los grupos (alfabético si None)
+    
+    Returns:
+        Categórica cuyas categorías terminan siempre en UNKNOWN_GROUP
+    """
+    categories = sorted(values.dropna().unique()) if categories is None else list(categories)
+    return pd.Categorical(values.fillna(UNKNOWN_GROUP), categories=[*categories, UNKNOWN_GROUP])
+
+
+def rank_communities(labels: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """
+    Renumera las comunidades de mayor a menor volumen de flujos (0 = mayor).
+    
+    Args:
+        labels: Comunidad de cada país
+        volume: Emigración + inmigración de cada país
+    
+    Returns:
+        Comunidad renumerada de cada país
+    """
+    order = np.argsort(-np.bincount(labels, weights=volume), kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    return rank[labels]
+
+
+def label_communities(countries: np.ndarray, labels: np.ndarray, volume: np.ndarray) -> List[str]:
+    """
+    Nombres de las comunidades a partir de sus países con más flujo.
+    
+    Args:
+        countries: Códigos de país
+        labels: Comunidad de cada país (ya ordenadas, ver rank_communities)
+        volume: Emigración + inmigración de cada país
+    
+    Returns:
+        Nombre de cada comunidad, p. ej. 'Comunidad 1 (US, CN, IN)'
+    """
+    names = []
+    for community in range(labels.max() + 1):
+        members = np.flatnonzero(labels == community)
+        leaders = countries[members[np.argsort(-volume[members], kind='stable')[:COMMUNITY_LABEL_SIZE]]]
+        names.append(f"Comunidad {community + 1} ({', '.join(leaders)})")
+    
+    return names
+
+
+def build_country_groups(df_flows: pd.DataFrame, raw_dir: Path) -> pd.DataFrame:
+    """
+    Paso de preprocesamiento: taxonomías de todos los países de los flujos.
+    
+    Args:
+        df_flows: Flujos con origin y destination (ISO2) y n_researchers
+        raw_dir: Directorio de la descarga original del WDI
+    
+    Returns:
+        DataFrame con country (ISO2) y una columna categórica por clave de
+        GROUPINGS
+    """
+    countries, W = flow_adjacency(df_flows)
+    volume = np.asarray(W.sum(axis=1)).ravel() + np.asarray(W.sum(axis=0)).ravel()
+    labels = rank_communities(louvain_communities(W), volume)
+    
+    taxonomy = load_wdi_taxonomy(raw_dir)
+    if taxonomy is None:
+        taxonomy = pd.DataFrame(columns=['region', 'income'], dtype=object)
+    taxonomy = taxonomy.reindex(countries)
+    
+    names = label_communities(countries, labels, volume)
+    
+    return pd.DataFrame({
+        'country': countries,
+        'region': as_group_categorical(taxonomy['region']),
+        'income': as_group_categorical(taxonomy['income'], INCOME_GROUP_NAMES.values()),
+        'community': as_group_categorical(pd.Series(np.asarray(names, dtype=object)[labels]), names)
+    })
+
+
+def save_country_groups(groups: pd.DataFrame, out_dir: Path) -> Path:
+    """Guarda la tabla de agrupaciones (las categóricas se conservan en Parquet)."""
+    path = out_dir / COUNTRY_GROUPS_FILE
+    groups.to_parquet(path, index=False)
+    return path
+
+
+def load_country_groups(data_dir: Path) -> Optional[pd.DataFrame]:
+    """Tabla de agrupaciones del preprocesamiento, o None si no se ha generado."""
+    path = data_dir / COUNTRY_GROUPS_FILE
+    return pd.read_parquet(path) if path.exists() else None
+
+
+def available_groupings(df_flows: pd.DataFrame) -> List[str]:
+    """Claves de GROUPINGS presentes en los flujos (solo 'region' sin tabla de agrupaciones)."""
+    return [grouping for grouping in GROUPINGS if f'origin_{grouping}' in df_flows.columns]
+
+
+def map_country_groups(codes: pd.Series, groups: pd.DataFrame) -> Dict[str, pd.Categorical]:
+    """
+    Grupos de una columna de países, vectorizado sobre códigos categóricos.
+    
+    Cada país distinto se busca una sola vez en la tabla; las filas se
+    resuelven indexando ese array de consulta con los códigos de la
+    categórica. Los países ausentes de la tabla van a UNKNOWN_GROUP.
+    
+    Args:
+        codes: Códigos ISO2 (categórica o texto)
+        groups: Tabla de build_country_groups
+    
+    Returns:
+        Diccionario clave de GROUPINGS → categórica alineada con codes
+    """
+    codes = codes.astype(str).astype('category') if codes.dtype != 'category' else codes
+    position = pd.Index(groups['country']).get_indexer(codes.cat.categories)
+    row_codes = codes.cat.codes.to_numpy()
+    
+    mapped = {}
+    for grouping in GROUPINGS:
+        column = groups[grouping].astype('category')
+        if UNKNOWN_GROUP not in column.cat.categories:
+            column = column.cat.add_categories(UNKNOWN_GROUP)
+        unknown = column.cat.categories.get_loc(UNKNOWN_GROUP)
+        
+        # Posición -1 (país fuera de la tabla) y código -1 (nulo) → UNKNOWN_GROUP
+        group_codes = np.append(column.cat.codes.to_numpy(), unknown)
+        category_codes = np.append(group_codes[position], unknown)
+        mapped[grouping] = pd.Categorical.from_codes(category_codes[row_codes], categories=column.cat.categories)
+    
+    return mapped
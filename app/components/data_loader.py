@@ -12,7 +12,44 @@ import numpy as np
 from pathlib import Path
 from typing import Optional, Dict, Tuple
 
-from config.settings import DATA_DIR, REGION_MAP
+from config.settings import (
+    DATA_DIR, CENTROIDS_FILE, WDI_RAW_DIR, REGION_MAP, WDI_FEATURES, YEAR_MIN, YEAR_MAX
+)
+from components.statistics import describe_distribution
+from components.wdi_catalog import (
+    CATALOG_COLUMNS, SERIES_STORE_FILE, FILLED_STORE_FILE, load_catalog, load_country_regions,
+    search_catalog, read_series
+)
+from components.gap_filling import fill_gaps
+from components.country_groups import load_country_groups, map_country_groups
+from components.feature_store import (
+    FLOW_FEATURES, RECENT_YEARS, update_feature_store, compute_feature_table, read_features, select_features
+)
+
+
+def get_dataset_version(data_dir: Optional[Path] = None) -> Tuple[Tuple[str, int, int], ...]:
+    """
+    Identifica la versión de los datos procesados por nombre, fecha y tamaño.
+    
+    Se usa como parte de las claves de caché para invalidar resultados
+    derivados cuando se regeneran los ficheros de datos.
+    
+    Args:
+        data_dir: Directorio de datos (usa default si None)
+    
+    Returns:
+        Tupla de (nombre, mtime_ns, tamaño) por fichero
+    """
+    data_dir = data_dir or DATA_DIR
+    
+    if not data_dir.exists():
+        return ()
+    
+    return tuple(
+        (path.name, path.stat().st_mtime_ns, path.stat().st_size)
+        for path in sorted(data_dir.iterdir())
+        if path.is_file()
+    )
 
 
 class DataLoader:
@@ -60,9 +97,15 @@ class DataLoader:
                 st.error(f"❌ No se encontró migration_flows en {_self.data_dir}")
                 return pd.DataFrame()
             
-            # Agregar región de origen y destino
-            df['origin_region'] = df['origin_iso3'].map(REGION_MAP).fillna('Otros')
-            df['destination_region'] = df['destination_iso3'].map(REGION_MAP).fillna('Otros')
+            # Agregar grupos de origen y destino (región, ingreso y comunidad)
+            groups = load_country_groups(_self.data_dir)
+            if groups is not None:
+                for side in ('origin', 'destination'):
+                    for grouping, values in map_country_groups(df[side], groups).items():
+                        df[f'{side}_{grouping}'] = values
+            else:
+                df['origin_region'] = df['origin_iso3'].map(REGION_MAP).fillna('Otros')
+                df['destination_region'] = df['destination_iso3'].map(REGION_MAP).fillna('Otros')
             
             return df
             
@@ -122,6 +165,165 @@ class DataLoader:
             st.warning(f"⚠️ Error cargando WDI: {str(e)}")
             return pd.DataFrame()
     
+    @st.cache_data(ttl=3600)
+    def load_wdi_catalog(_self) -> Dict[str, object]:
+        """
+        Carga el catálogo de metadatos WDI y su índice invertido.
+        
+        Returns:
+            Diccionario con catalog (una fila por serie) e index (arrays CSR)
+        """
+        try:
+            return load_catalog(_self.data_dir, WDI_RAW_DIR)
+        
+        except Exception as e:
+            st.warning(f"⚠️ Error cargando catálogo WDI: {str(e)}")
+            return {'catalog': pd.DataFrame(columns=CATALOG_COLUMNS), 'index': None}
+    
+    @st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+    def search_wdi_indicators(_self, query: str, limit: int = 20) -> pd.DataFrame:
+        """
+        Busca series WDI por nombre, tema, definición o prefijo de código.
+        
+        Args:
+            query: Texto de búsqueda
+            limit: Resultados máximos
+        
+        Returns:
+            DataFrame con IndicatorCode, IndicatorName, Topic y score
+        """
+        wdi_catalog = _self.load_wdi_catalog()
+        
+        if wdi_catalog['index'] is None or not query.strip():
+            return pd.DataFrame(columns=['IndicatorCode', 'IndicatorName', 'Topic', 'score'])
+        
+        return search_catalog(wdi_catalog['catalog'], wdi_catalog['index'], query, limit)
+    
+    @st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+    def load_wdi_indicator(_self, indicator_code: str) -> pd.DataFrame:
+        """
+        Carga una sola serie WDI del almacén columnar.
+        
+        Args:
+            indicator_code: Código de la serie (p. ej. 'NY.GDP.PCAP.CD')
+        
+        Returns:
+            DataFrame con iso3, IndicatorCode, Year y Value
+        """
+        store_path = _self.data_dir / SERIES_STORE_FILE
+        
+        if store_path.exists():
+            return read_series(store_path, codes=[indicator_code])
+        
+        df = _self.load_wdi()
+        if df.empty:
+            return pd.DataFrame(columns=['iso3', 'IndicatorCode', 'Year', 'Value'])
+        
+        return df.loc[df['IndicatorCode'] == indicator_code, ['iso3', 'IndicatorCode', 'Year', 'Value']]
+    
+    @st.cache_data(ttl=3600)
+    def load_wdi_series(_self) -> pd.DataFrame:
+        """
+        Descripción de las series WDI (código, nombre y tema) del catálogo.
+        
+        Returns:
+            DataFrame con IndicatorCode, IndicatorName y Topic
+        """
+        return _self.load_wdi_catalog()['catalog'][['IndicatorCode', 'IndicatorName', 'Topic']]
+    
+    @st.cache_data(ttl=3600)
+    def load_wdi_panel(_self, year_min: int, year_max: int) -> pd.DataFrame:
+        """
+        Carga todas las series WDI disponibles para un rango de años.
+        
+        Usa el almacén columnar de series si se generó en el
+        preprocesamiento; si no, Indicators.csv de la descarga original
+        (leído por bloques y filtrado por año) o, en último caso, los
+        indicadores procesados de load_wdi.
+        
+        Args:
+            year_min: Primer año incluido
+            year_max: Último año incluido
+        
+        Returns:
+            DataFrame largo con iso3, IndicatorCode, Year y Value
+        """
+        columns = ['iso3', 'IndicatorCode', 'Year', 'Value']
+        store_path = _self.data_dir / SERIES_STORE_FILE
+        csv_path = WDI_RAW_DIR / 'Indicators.csv'
+        
+        try:
+            if store_path.exists():
+                return read_series(store_path, years=(year_min, year_max))
+            
+            if csv_path.exists():
+                chunks = pd.read_csv(
+                    csv_path,
+                    usecols=['CountryCode', 'IndicatorCode', 'Year', 'Value'],
+                    dtype={'CountryCode': str, 'IndicatorCode': str, 'Year': 'int16', 'Value': 'float64'},
+                    chunksize=1_000_000
+                )
+                df = pd.concat(
+                    chunk[chunk['Year'].between(year_min, year_max)] for chunk in chunks
+                ).rename(columns={'CountryCode': 'iso3'})
+                return df[columns].reset_index(drop=True)
+        
+        except Exception as e:
+            st.warning(f"⚠️ Error cargando series WDI: {str(e)}")
+        
+        df = _self.load_wdi()
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+        
+        return df.loc[df['Year'].between(year_min, year_max), columns].reset_index(drop=True)
+    
+    @st.cache_data(ttl=3600)
+    def load_wdi_filled(_self, year_min: int, year_max: int) -> pd.DataFrame:
+        """
+        Carga el panel WDI con los huecos rellenados y su procedencia.
+        
+        Usa el panel rellenado del preprocesamiento si existe; si no, lo
+        calcula sobre todos los años (la interpolación necesita los años
+        vecinos) y después filtra el rango pedido.
+        
+        Args:
+            year_min: Primer año incluido
+            year_max: Último año incluido
+        
+        Returns:
+            DataFrame largo con iso3, IndicatorCode, Year, Value y source
+            (ver gap_filling.FILL_SOURCES)
+        """
+        store_path = _self.data_dir / FILLED_STORE_FILE
+        
+        try:
+            if store_path.exists():
+                return read_series(store_path, years=(year_min, year_max), extra_columns=('source',))
+        
+        except Exception as e:
+            st.warning(f"⚠️ Error cargando panel WDI rellenado: {str(e)}")
+        
+        df = fill_gaps(_self.load_wdi_panel(YEAR_MIN, YEAR_MAX), load_country_regions(WDI_RAW_DIR))
+        return df[df['Year'].between(year_min, year_max)].reset_index(drop=True)
+    
+    @st.cache_data(ttl=3600)
+    def load_wdi_country_means(_self, features: tuple) -> pd.DataFrame:
+        """
+        Indicadores por país: media de los años recientes del panel rellenado.
+        
+        Args:
+            features: Nombres de features (claves de WDI_FEATURES)
+        
+        Returns:
+            DataFrame indexado por iso3 con una columna por feature
+        """
+        codes = {WDI_FEATURES[name]: name for name in features}
+        wdi = _self.load_wdi_filled(*RECENT_YEARS)
+        
+        return wdi[wdi['IndicatorCode'].isin(list(codes))].pivot_table(
+            index='iso3', columns='IndicatorCode', values='Value', aggfunc='mean'
+        ).rename(columns=codes).reindex(columns=list(features))
+    
     @st.cache_data(ttl=3600)
     def load_mapping(_self) -> pd.DataFrame:
         """
@@ -144,6 +346,172 @@ class DataLoader:
             st.warning(f"⚠️ Error cargando mapping: {str(e)}")
             return pd.DataFrame()
     
+    @st.cache_data(ttl=3600)
+    def load_centroids(_self) -> pd.DataFrame:
+        """
+        Carga la tabla local de centroides de países (incluida con la app).
+        
+        Returns:
+            DataFrame con lat y lon indexado por iso3
+        """
+        try:
+            if CENTROIDS_FILE.exists():
+                return pd.read_csv(CENTROIDS_FILE, index_col='iso3')
+            else:
+                st.warning("⚠️ No se encontró la tabla de centroides (opcional)")
+                return pd.DataFrame(columns=['lat', 'lon'])
+        
+        except Exception as e:
+            st.warning(f"⚠️ Error cargando centroides: {str(e)}")
+            return pd.DataFrame(columns=['lat', 'lon'])
+    
+    def has_researcher_data(self) -> bool:
+        """Indica si existen las migraciones individuales (migrations_clean)."""
+        return any(
+            (self.data_dir / f'migrations_clean.{ext}').exists() for ext in ('parquet', 'csv')
+        )
+    
+    @st.cache_data(ttl=3600)
+    def load_yearly_corridors(_self, year_column: str = 'origin_year') -> pd.DataFrame:
+        """
+        Carga los recuentos por corredor y año.
+        
+        Usa las migraciones individuales si existen (año exacto por
+        investigador); si no, asigna cada corredor agregado a la media de
+        ese año (p. ej. origin_year_mean).
+        
+        Args:
+            year_column: 'origin_year' (primera afiliación) o 'phd_year' (doctorado)
+        
+        Returns:
+            DataFrame con origin, destination, year y n_researchers
+        """
+        if _self.has_researcher_data():
+            df = _self.load_migrations()
+            df = df[
+                (df['has_migrated'] == True) &
+                df['origin'].notna() & df['destination'].notna() &
+                df[year_column].notna() &
+                (df['origin'].astype(str) != df['destination'].astype(str))
+            ]
+            yearly = df.groupby(
+                [df['origin'].astype(str), df['destination'].astype(str), df[year_column].astype('int64')]
+            ).size()
+            yearly.index.names = ['origin', 'destination', 'year']
+            return yearly.rename('n_researchers').reset_index()
+        
+        df_flows = _self.load_flows()
+        if df_flows.empty:
+            return pd.DataFrame(columns=['origin', 'destination', 'year', 'n_researchers'])
+        
+        df_flows = df_flows[df_flows[f'{year_column}_mean'].notna()]
+        
+        return pd.DataFrame({
+            'origin': df_flows['origin'].astype(str),
+            'destination': df_flows['destination'].astype(str),
+            'year': df_flows[f'{year_column}_mean'].astype('int64'),
+            'n_researchers': df_flows['n_researchers'].astype('int64')
+        })
+    
+    def _feature_store_inputs(self) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Entradas del feature store: corredores por año con ISO3 y panel WDI.
+        
+        Returns:
+            Tupla (yearly, wdi_panel), o None si no hay flujos
+        """
+        df_flows = self.load_flows()
+        yearly = self.load_yearly_corridors()
+        
+        if df_flows.empty or yearly.empty:
+            return None
+        
+        iso_map = pd.concat([
+            df_flows[['origin', 'origin_iso3']].set_axis(['country', 'iso3'], axis=1),
+            df_flows[['destination', 'destination_iso3']].set_axis(['country', 'iso3'], axis=1)
+        ]).astype(str).drop_duplicates(subset='country').set_index('country')['iso3']
+        
+        yearly = yearly.assign(
+            origin_iso3=yearly['origin'].map(iso_map),
+            destination_iso3=yearly['destination'].map(iso_map)
+        ).dropna(subset=['origin_iso3', 'destination_iso3'])
+        
+        return yearly, self.load_wdi_panel(YEAR_MIN, YEAR_MAX)
+    
+    @st.cache_data(ttl=3600, show_spinner="Actualizando feature store...")
+    def refresh_feature_store(_self) -> dict:
+        """
+        Actualiza (de forma incremental) el feature store país × año.
+        
+        Returns:
+            Manifiesto del feature store (vacío si no se pudo actualizar)
+        """
+        try:
+            inputs = _self._feature_store_inputs()
+            if inputs is None:
+                return {}
+            
+            return update_feature_store(*inputs, WDI_FEATURES)
+        
+        except OSError as e:
+            # Despliegue de solo lectura, disco lleno...: load_features calcula en memoria
+            st.info(f"ℹ️ No se pudo guardar el feature store ({str(e)}); se calcula en memoria")
+            return {}
+        
+        except Exception as e:
+            st.warning(f"⚠️ Error actualizando feature store: {str(e)}")
+            return {}
+    
+    @st.cache_data(ttl=3600, show_spinner="Calculando features en memoria...")
+    def compute_features(_self) -> pd.DataFrame:
+        """
+        Tabla del feature store calculada en memoria (sin escribir en disco).
+        
+        Returns:
+            DataFrame indexado por (iso3, year); vacío si no hay flujos
+        """
+        inputs = _self._feature_store_inputs()
+        if inputs is None:
+            return pd.DataFrame()
+        
+        return compute_feature_table(*inputs, WDI_FEATURES)
+    
+    @st.cache_data(ttl=3600)
+    def load_features(_self, features: tuple, year_min: Optional[int] = None,
+                      year_max: Optional[int] = None) -> pd.DataFrame:
+        """
+        Lee features país × año por nombre del feature store.
+        
+        Si el store no se pudo actualizar (p. ej. outputs/ de solo lectura)
+        las features se calculan en memoria. Sin migraciones individuales
+        las FLOW_FEATURES por año serían una aproximación (cada corredor en
+        su año medio) y se devuelven como NaN.
+        
+        Args:
+            features: Nombres de features (FLOW_FEATURES o claves de WDI_FEATURES)
+            year_min: Primer año incluido (todos si None)
+            year_max: Último año incluido (todos si None)
+        
+        Returns:
+            DataFrame con iso3, year y las features pedidas
+        """
+        withheld = [] if _self.has_researcher_data() else [name for name in features if name in FLOW_FEATURES]
+        stored = [name for name in features if name not in withheld]
+        years = (year_min or YEAR_MIN, year_max or YEAR_MAX) if year_min or year_max else None
+        
+        if _self.refresh_feature_store():
+            df = read_features(stored, years)
+        else:
+            table = _self.compute_features()
+            if table.empty:
+                return pd.DataFrame(columns=['iso3', 'year'] + list(features))
+            df = select_features(table, stored, years)
+        
+        for name in withheld:
+            df[name] = np.nan
+        
+        return df[['iso3', 'year'] + list(features)]
+    
     @st.cache_data(ttl=3600)
     def compute_net_migration(_self, df_flows: pd.DataFrame) -> pd.DataFrame:
         """
@@ -238,18 +606,26 @@ class DataLoader:
         return df_flows.nlargest(top_n, 'n_researchers')
     
     @st.cache_data(ttl=3600)
-    def get_regional_flows(_self, df_flows: pd.DataFrame) -> pd.DataFrame:
+    def get_regional_flows(_self, df_flows: pd.DataFrame, grouping: str = 'region') -> pd.DataFrame:
         """
-        Agrega flujos por región geográfica.
+        Agrega flujos por región geográfica (u otra agrupación de países).
         
         Args:
             df_flows: DataFrame de flujos migratorios
-            
+            grouping: Agrupación ('region', 'income' o 'community'; ver GROUPINGS)
+        
         Returns:
-            DataFrame con flujos agregados por región
+            DataFrame con flujos agregados (origin_region, destination_region
+            y n_researchers, sea cual sea la agrupación)
         """
-        # Agrupar por región origen y destino
-        region_flows = df_flows.groupby(['origin_region', 'destination_region'])['n_researchers'].sum().reset_index()
+        # Agrupar por grupo de origen y destino
+        region_flows = df_flows.groupby(
+            [f'origin_{grouping}', f'destination_{grouping}'], observed=True
+        )['n_researchers'].sum().reset_index()
+        region_flows.columns = ['origin_region', 'destination_region', 'n_researchers']
+        region_flows[['origin_region', 'destination_region']] = region_flows[
+            ['origin_region', 'destination_region']
+        ].astype(str)
         
         # Excluir flujos intra-región
         region_flows = region_flows[region_flows['origin_region'] != region_flows['destination_region']]
@@ -259,6 +635,27 @@ class DataLoader:
         
         return region_flows
     
+    @st.cache_data(ttl=3600)
+    def get_distribution_stats(_self, _df_flows: pd.DataFrame, signature: tuple, version: tuple,
+                               column: str = 'n_researchers') -> Dict[str, any]:
+        """
+        Estadísticas descriptivas de una columna, cacheadas por firma de filtros.
+        
+        El DataFrame no se hashea (prefijo '_'): la clave de caché es la firma
+        de filtros y la versión del dataset, de modo que un rerun con los
+        mismos filtros no recorre los datos.
+        
+        Args:
+            _df_flows: DataFrame de flujos ya filtrado
+            signature: Firma de los filtros aplicados (ver get_filter_signature)
+            version: Versión del dataset (ver get_dataset_version)
+            column: Columna numérica a describir
+        
+        Returns:
+            Diccionario de describe_distribution
+        """
+        return describe_distribution(_df_flows[column].to_numpy(dtype='float64', na_value=np.nan))
+    
     def get_summary_stats(self, df_flows: pd.DataFrame) -> Dict[str, any]:
         """
         Calcula estadísticas resumen del dataset.
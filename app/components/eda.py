@@ -10,8 +10,41 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from components.data_loader import DataLoader
-from config.settings import THEME_COLORS, PLOTLY_CONFIG
+from components.data_loader import DataLoader, get_dataset_version
+from components.statistics import stats_to_describe
+from components.sankey import SANKEY_LEVELS, SANKEY_TITLES, create_sankey_regional, get_sankey_spec
+from components.country_groups import GROUPINGS, available_groupings
+from components.figure_cache import render_cached_chart, figure_from_spec
+from components.temporal import (
+    get_year_country_cube, trim_cube_years, create_animated_map, filter_yearly_corridors,
+    get_corridor_indicators, YEARLY_FALLBACK_NOTE, PHD_YEAR_FALLBACK_NOTE
+)
+from components.flowmap import create_flow_map, create_animated_flow_map
+from components.markov import MARKOV_STEPS, get_markov_projection
+from components.network import CENTRALITY_COLUMNS, get_network_centrality
+from components.feature_store import RECENT_YEARS
+from components.correlation import bootstrap_correlation_ci, format_correlation
+from components.screening import (
+    get_indicator_screening, SCREENING_TARGETS, SCREENING_YEARS, MIN_COUNTRIES, FDR_ALPHA
+)
+from components.trendlines import fit_trendline, add_trendline, format_trendline_summary
+from components.charts import (
+    histogram_figure, histogram_trace, box_figure, scatter_figure,
+    compute_histogram, compute_bin_edges
+)
+from config.settings import THEME_COLORS, PLOTLY_CONFIG, WDI_FEATURES
+
+
+# Secciones de la página EDA (en orden de navegación)
+EDA_SECTIONS = [
+    "📈 Resumen Estadístico",
+    "🌍 Emisores y Receptores",
+    "🛤️ Corredores Migratorios",
+    "🌐 Análisis Regional",
+    "💰 Correlación Económica",
+    "📅 Evolución Temporal",
+    "🎯 Diagrama de Flujos"
+]
 
 
 def render_eda(data_loader: DataLoader, filters: dict):
@@ -33,66 +66,67 @@ def render_eda(data_loader: DataLoader, filters: dict):
     
     # Cargar datos
     df_flows = data_loader.load_flows()
-    df_migrations = data_loader.load_migrations()
-    df_wdi = data_loader.load_wdi()
     
     if df_flows.empty:
         st.error("❌ No se pudieron cargar los datos principales.")
         return
     
     # Aplicar filtros (importar función de home)
-    from components.home import apply_filters
+    from components.home import apply_filters, get_filter_signature
     df_filtered = apply_filters(df_flows, filters)
-    
-    # Tabs para organizar contenido
-    tabs = st.tabs([
-        "📈 Resumen Estadístico",
-        "🌍 Emisores y Receptores",
-        "🛤️ Corredores Migratorios",
-        "🌐 Análisis Regional",
-        "💰 Correlación Económica",
-        "📅 Evolución Temporal",
-        "🎯 Diagrama de Flujos"
-    ])
+    signature = get_filter_signature(filters)
+    
+    # Navegación por secciones: a diferencia de st.tabs, solo se ejecuta
+    # (y se calculan los datos y figuras de) la sección seleccionada
+    section = st.radio(
+        "Sección del análisis:",
+        EDA_SECTIONS,
+        horizontal=True,
+        key="eda_section",
+        label_visibility="collapsed"
+    )
     
     # TAB 1: Resumen Estadístico
-    with tabs[0]:
-        render_statistical_summary(df_filtered, data_loader)
+    if section == "📈 Resumen Estadístico":
+        render_statistical_summary(df_filtered, data_loader, signature)
     
     # TAB 2: Emisores y Receptores
-    with tabs[1]:
-        render_emitters_receivers(df_filtered, data_loader, filters)
+    elif section == "🌍 Emisores y Receptores":
+        render_emitters_receivers(df_filtered, data_loader, filters, signature)
     
     # TAB 3: Corredores
-    with tabs[2]:
-        render_corridors(df_filtered, data_loader, filters)
+    elif section == "🛤️ Corredores Migratorios":
+        render_corridors(df_filtered, data_loader, filters, signature)
     
     # TAB 4: Análisis Regional
-    with tabs[3]:
-        render_regional_analysis(df_filtered, data_loader)
+    elif section == "🌐 Análisis Regional":
+        render_regional_analysis(df_filtered, data_loader, signature)
     
-    # TAB 5: Correlación Económica
-    with tabs[4]:
-        render_economic_correlation(df_filtered, df_wdi, data_loader)
+    # TAB 5: Correlación Económica (WDI se carga solo al abrir la sección)
+    elif section == "💰 Correlación Económica":
+        render_economic_correlation(df_filtered, data_loader.load_wdi(), data_loader, signature)
     
-    # TAB 6: Evolución Temporal
-    with tabs[5]:
-        render_temporal_evolution(df_filtered, df_migrations)
+    # TAB 6: Evolución Temporal (migraciones individuales bajo demanda)
+    elif section == "📅 Evolución Temporal":
+        render_temporal_evolution(df_filtered, data_loader.load_migrations(), data_loader, signature)
     
     # TAB 7: Diagrama de Flujos (Sankey)
-    with tabs[6]:
-        render_flow_diagram(df_filtered, filters)
+    elif section == "🎯 Diagrama de Flujos":
+        render_flow_diagram(df_filtered, data_loader, signature)
 
 
 # =============================================================================
 # TAB 1: RESUMEN ESTADÍSTICO
 # =============================================================================
 
-def render_statistical_summary(df: pd.DataFrame, data_loader: DataLoader):
+def render_statistical_summary(df: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
     """Renderiza resumen estadístico del dataset."""
     
     st.markdown('<div class="section-header">📊 Estadísticas Descriptivas</div>', unsafe_allow_html=True)
     
+    # Todas las estadísticas en una pasada, cacheadas por firma de filtros
+    stats = data_loader.get_distribution_stats(df, signature, get_dataset_version())
+    
     # Métricas en columnas
     col1, col2, col3 = st.columns(3)
     
@@ -103,9 +137,9 @@ def render_statistical_summary(df: pd.DataFrame, data_loader: DataLoader):
         </div>
         """, unsafe_allow_html=True)
         
-        st.metric("Media", f"{df['n_researchers'].mean():.2f}", "investigadores/ruta")
-        st.metric("Mediana", f"{df['n_researchers'].median():.0f}", "investigadores/ruta")
-        st.metric("Moda", f"{df['n_researchers'].mode()[0] if not df['n_researchers'].mode().empty else 'N/A'}")
+        st.metric("Media", f"{stats['mean']:.2f}", "investigadores/ruta")
+        st.metric("Mediana", f"{stats['median']:.0f}", "investigadores/ruta")
+        st.metric("Moda", f"{stats['mode']:.0f}" if stats['mode'] is not None else 'N/A')
     
     with col2:
         st.markdown("""
@@ -114,9 +148,9 @@ def render_statistical_summary(df: pd.DataFrame, data_loader: DataLoader):
         </div>
         """, unsafe_allow_html=True)
         
-        st.metric("Desviación Estándar", f"{df['n_researchers'].std():.2f}")
-        st.metric("Varianza", f"{df['n_researchers'].var():.2f}")
-        st.metric("Rango", f"{df['n_researchers'].max() - df['n_researchers'].min():.0f}")
+        st.metric("Desviación Estándar", f"{stats['std']:.2f}")
+        st.metric("Varianza", f"{stats['var']:.2f}")
+        st.metric("Rango", f"{stats['range']:.0f}")
     
     with col3:
         st.markdown("""
@@ -125,55 +159,61 @@ def render_statistical_summary(df: pd.DataFrame, data_loader: DataLoader):
         </div>
         """, unsafe_allow_html=True)
         
-        st.metric("Mínimo", f"{df['n_researchers'].min():.0f}")
-        st.metric("Máximo", f"{df['n_researchers'].max():.0f}")
-        st.metric("Q3 - Q1", f"{df['n_researchers'].quantile(0.75) - df['n_researchers'].quantile(0.25):.0f}")
+        st.metric("Mínimo", f"{stats['min']:.0f}")
+        st.metric("Máximo", f"{stats['max']:.0f}")
+        st.metric("Q3 - Q1", f"{stats['iqr']:.0f}")
     
     # Distribución de investigadores por ruta
     st.markdown("### 📈 Distribución de Investigadores por Ruta")
     
-    fig_dist = px.histogram(
-        df,
-        x='n_researchers',
-        nbins=50,
-        title='Distribución de Frecuencia',
-        labels={'n_researchers': 'Número de Investigadores', 'count': 'Frecuencia'},
-        color_discrete_sequence=[THEME_COLORS['primary']]
-    )
-    
-    fig_dist.update_layout(
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=400
-    )
-    
-    st.plotly_chart(fig_dist, use_container_width=True, config=PLOTLY_CONFIG)
-    
-    # Boxplot
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        fig_box = px.box(
-            df,
-            y='n_researchers',
-            title='Diagrama de Caja (Outliers)',
-            labels={'n_researchers': 'Investigadores'},
-            color_discrete_sequence=[THEME_COLORS['accent']]
+    def build_fig_dist():
+        fig_dist = histogram_figure(
+            df['n_researchers'],
+            nbins=50,
+            color=THEME_COLORS['primary']
         )
         
-        fig_box.update_layout(
+        fig_dist.update_layout(
+            title='Distribución de Frecuencia',
+            xaxis_title='Número de Investigadores',
+            yaxis_title='Frecuencia',
             template='plotly_dark',
             paper_bgcolor='rgba(0,0,0,0)',
             plot_bgcolor='rgba(0,0,0,0)',
             height=400
         )
         
-        st.plotly_chart(fig_box, use_container_width=True, config=PLOTLY_CONFIG)
+        return fig_dist
+    
+    render_cached_chart('eda_distribution', signature, build_fig_dist)
+    
+    # Boxplot
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        def build_fig_box():
+            fig_box = box_figure(
+                df['n_researchers'],
+                name='Investigadores',
+                color=THEME_COLORS['accent']
+            )
+            
+            fig_box.update_layout(
+                title='Diagrama de Caja (Outliers)',
+                yaxis_title='Investigadores',
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                height=400
+            )
+            
+            return fig_box
+        
+        render_cached_chart('eda_boxplot', signature, build_fig_box)
     
     with col2:
         # Tabla de percentiles
-        percentiles = df['n_researchers'].describe(percentiles=[.1, .25, .5, .75, .9, .95, .99])
+        percentiles = stats_to_describe(stats).rename('n_researchers')
         
         st.markdown("### 📊 Percentiles")
         st.dataframe(percentiles, use_container_width=True)
@@ -183,7 +223,7 @@ def render_statistical_summary(df: pd.DataFrame, data_loader: DataLoader):
 # TAB 2: EMISORES Y RECEPTORES
 # =============================================================================
 
-def render_emitters_receivers(df: pd.DataFrame, data_loader: DataLoader, filters: dict):
+def render_emitters_receivers(df: pd.DataFrame, data_loader: DataLoader, filters: dict, signature: tuple = ()):
     """Renderiza análisis de países emisores y receptores."""
     
     st.markdown('<div class="section-header">🌍 Países Emisores y Receptores</div>', unsafe_allow_html=True)
@@ -195,39 +235,49 @@ def render_emitters_receivers(df: pd.DataFrame, data_loader: DataLoader, filters
     top_receivers = data_loader.get_top_receivers(df, top_n)
     net_migration = data_loader.compute_net_migration(df)
     
+    # Centralidad en la red (PageRank, HITS, intermediación, reciprocidad)
+    centrality = get_network_centrality(df, signature, get_dataset_version())
+    top_emitters = top_emitters.merge(centrality, on='country', how='left')
+    top_receivers = top_receivers.merge(centrality, on='country', how='left')
+    net_migration = net_migration.merge(centrality, on='country', how='left')
+    
     # Visualizaciones lado a lado
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown(f"### 🔴 Top {top_n} Países Emisores")
         
-        fig_emitters = px.bar(
-            top_emitters,
-            x='total_emigrants',
-            y='country',
-            orientation='h',
-            title=f'Brain Drain: Top {top_n} Exportadores de Talento',
-            labels={'total_emigrants': 'Investigadores Emigrados', 'country': 'País'},
-            color='total_emigrants',
-            color_continuous_scale='Reds',
-            text='total_emigrants'
-        )
-        
-        fig_emitters.update_traces(
-            texttemplate='%{text:,.0f}',
-            textposition='outside'
-        )
-        
-        fig_emitters.update_layout(
-            height=600,
-            showlegend=False,
-            yaxis={'categoryorder': 'total ascending'},
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
+        def build_fig_emitters():
+            fig_emitters = px.bar(
+                top_emitters,
+                x='total_emigrants',
+                y='country',
+                orientation='h',
+                title=f'Brain Drain: Top {top_n} Exportadores de Talento',
+                labels={'total_emigrants': 'Investigadores Emigrados', 'country': 'País'},
+                color='total_emigrants',
+                color_continuous_scale='Reds',
+                text='total_emigrants',
+                hover_data={'pagerank': ':.4f', 'hub': ':.4f', 'reciprocity': ':.2f'}
+            )
+            
+            fig_emitters.update_traces(
+                texttemplate='%{text:,.0f}',
+                textposition='outside'
+            )
+            
+            fig_emitters.update_layout(
+                height=600,
+                showlegend=False,
+                yaxis={'categoryorder': 'total ascending'},
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_emitters
         
-        st.plotly_chart(fig_emitters, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_top_emitters', (signature, top_n), build_fig_emitters)
         
         # Tabla de datos
         with st.expander("📋 Ver datos detallados"):
@@ -236,33 +286,37 @@ def render_emitters_receivers(df: pd.DataFrame, data_loader: DataLoader, filters
     with col2:
         st.markdown(f"### 🟢 Top {top_n} Países Receptores")
         
-        fig_receivers = px.bar(
-            top_receivers,
-            x='total_immigrants',
-            y='country',
-            orientation='h',
-            title=f'Brain Gain: Top {top_n} Receptores de Talento',
-            labels={'total_immigrants': 'Investigadores Recibidos', 'country': 'País'},
-            color='total_immigrants',
-            color_continuous_scale='Greens',
-            text='total_immigrants'
-        )
-        
-        fig_receivers.update_traces(
-            texttemplate='%{text:,.0f}',
-            textposition='outside'
-        )
-        
-        fig_receivers.update_layout(
-            height=600,
-            showlegend=False,
-            yaxis={'categoryorder': 'total ascending'},
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
+        def build_fig_receivers():
+            fig_receivers = px.bar(
+                top_receivers,
+                x='total_immigrants',
+                y='country',
+                orientation='h',
+                title=f'Brain Gain: Top {top_n} Receptores de Talento',
+                labels={'total_immigrants': 'Investigadores Recibidos', 'country': 'País'},
+                color='total_immigrants',
+                color_continuous_scale='Greens',
+                text='total_immigrants',
+                hover_data={'pagerank': ':.4f', 'authority': ':.4f', 'reciprocity': ':.2f'}
+            )
+            
+            fig_receivers.update_traces(
+                texttemplate='%{text:,.0f}',
+                textposition='outside'
+            )
+            
+            fig_receivers.update_layout(
+                height=600,
+                showlegend=False,
+                yaxis={'categoryorder': 'total ascending'},
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_receivers
         
-        st.plotly_chart(fig_receivers, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_top_receivers', (signature, top_n), build_fig_receivers)
         
         # Tabla de datos
         with st.expander("📋 Ver datos detallados"):
@@ -276,30 +330,37 @@ def render_emitters_receivers(df: pd.DataFrame, data_loader: DataLoader, filters
     top_exporters = net_migration.tail(15)
     viz_data = pd.concat([top_attractors, top_exporters])
     
-    fig_net = px.bar(
-        viz_data,
-        x='net_balance',
-        y='country',
-        orientation='h',
-        title='Saldo Neto: Top Atractores y Exportadores',
-        labels={'net_balance': 'Saldo Neto (Inmigración - Emigración)', 'country': 'País'},
-        color='net_balance',
-        color_continuous_scale='RdYlGn',
-        color_continuous_midpoint=0,
-        text='net_balance'
-    )
+    def build_fig_net():
+        fig_net = px.bar(
+            viz_data,
+            x='net_balance',
+            y='country',
+            orientation='h',
+            title='Saldo Neto: Top Atractores y Exportadores',
+            labels={'net_balance': 'Saldo Neto (Inmigración - Emigración)', 'country': 'País'},
+            color='net_balance',
+            color_continuous_scale='RdYlGn',
+            color_continuous_midpoint=0,
+            text='net_balance',
+            hover_data={'pagerank': ':.4f', 'betweenness': ':.3f', 'reciprocity': ':.2f'}
+        )
+        
+        fig_net.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+        fig_net.update_layout(
+            height=700,
+            yaxis={'categoryorder': 'total ascending'},
+            showlegend=False,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_net
     
-    fig_net.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-    fig_net.update_layout(
-        height=700,
-        yaxis={'categoryorder': 'total ascending'},
-        showlegend=False,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    render_cached_chart('eda_net_balance', signature, build_fig_net)
     
-    st.plotly_chart(fig_net, use_container_width=True, config=PLOTLY_CONFIG)
+    # Rankings por centralidad en la red
+    render_centrality_ranking(net_migration, top_n, signature)
     
     # NUEVA MEJORA 1: Histogramas Superpuestos - Distribución de flujos
     st.markdown("### 📊 Comparación de Distribuciones: Emigración vs Inmigración")
@@ -312,58 +373,122 @@ def render_emitters_receivers(df: pd.DataFrame, data_loader: DataLoader, filters
     immigration_by_country = df.groupby('destination')['n_researchers'].sum().reset_index()
     immigration_by_country.columns = ['country', 'total']
     
-    # Crear histograma superpuesto
-    fig_overlay = go.Figure()
-    
-    fig_overlay.add_trace(go.Histogram(
-        x=emigration_by_country['total'],
-        name='Emigración',
-        marker_color=THEME_COLORS['warning'],
-        opacity=0.7,
-        nbinsx=30
-    ))
-    
-    fig_overlay.add_trace(go.Histogram(
-        x=immigration_by_country['total'],
-        name='Inmigración',
-        marker_color=THEME_COLORS['success'],
-        opacity=0.7,
-        nbinsx=30
-    ))
-    
-    fig_overlay.update_layout(
-        title='Distribución de Flujos Migratorios por País',
-        xaxis_title='Total de Investigadores',
-        yaxis_title='Número de Países',
-        barmode='overlay',
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=500,
-        legend=dict(x=0.7, y=0.95),
-        hovermode='x unified'
+    # Crear histograma superpuesto (bins comunes calculados en el servidor)
+    edges = compute_bin_edges(
+        np.concatenate([emigration_by_country['total'], immigration_by_country['total']]),
+        nbins=30
     )
+    emigration_counts, _ = compute_histogram(emigration_by_country['total'], bin_edges=edges)
+    immigration_counts, _ = compute_histogram(immigration_by_country['total'], bin_edges=edges)
     
-    fig_overlay.update_traces(marker_line_width=1, marker_line_color='rgba(255,255,255,0.3)')
+    def build_fig_overlay():
+        fig_overlay = go.Figure()
+        
+        fig_overlay.add_trace(histogram_trace(
+            emigration_counts,
+            edges,
+            name='Emigración',
+            color=THEME_COLORS['warning'],
+            opacity=0.7
+        ))
+        
+        fig_overlay.add_trace(histogram_trace(
+            immigration_counts,
+            edges,
+            name='Inmigración',
+            color=THEME_COLORS['success'],
+            opacity=0.7
+        ))
+        
+        fig_overlay.update_layout(
+            title='Distribución de Flujos Migratorios por País',
+            xaxis_title='Total de Investigadores',
+            yaxis_title='Número de Países',
+            barmode='overlay',
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            height=500,
+            legend=dict(x=0.7, y=0.95),
+            hovermode='x unified'
+        )
+        
+        fig_overlay.update_traces(marker_line_width=1, marker_line_color='rgba(255,255,255,0.3)')
+        
+        return fig_overlay
     
-    st.plotly_chart(fig_overlay, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('eda_flow_histograms', signature, build_fig_overlay)
     
     # Tabla completa de saldo migratorio
     with st.expander("📊 Ver tabla completa de saldos migratorios"):
         st.dataframe(
             net_migration[[
                 'country', 'immigration', 'emigration', 'net_balance', 
-                'migration_ratio', 'type'
+                'migration_ratio', 'type', *CENTRALITY_COLUMNS
             ]],
             use_container_width=True
         )
 
 
+@st.fragment
+def render_centrality_ranking(net_migration: pd.DataFrame, top_n: int, signature: tuple = ()):
+    """
+    Renderiza el ranking de países por una métrica de centralidad.
+    
+    Se ejecuta como fragmento: cambiar de métrica solo reordena la tabla
+    de centralidad ya calculada para estos filtros.
+    """
+    
+    st.markdown("### 🕸️ Centralidad en la Red de Migración")
+    
+    st.markdown("""
+    Más allá de los totales, la posición en la red: **PageRank** (recibe talento de países que a su 
+    vez lo reciben), **autoridad** y **hub** (HITS: destinos preferidos por los grandes emisores y 
+    emisores hacia los grandes destinos), **intermediación** (puente en las rutas más intensas) y 
+    **reciprocidad** (parte de los flujos compensada por el flujo inverso).
+    """)
+    
+    metric = st.selectbox(
+        "Métrica de centralidad:",
+        options=list(CENTRALITY_COLUMNS),
+        format_func=CENTRALITY_COLUMNS.get,
+        key="eda_centrality_metric"
+    )
+    
+    ranking = net_migration.nlargest(top_n, metric)
+    
+    def build_fig_centrality():
+        fig_centrality = px.bar(
+            ranking,
+            x=metric,
+            y='country',
+            orientation='h',
+            title=f'Top {top_n} Países por {CENTRALITY_COLUMNS[metric]}',
+            labels={metric: CENTRALITY_COLUMNS[metric], 'country': 'País'},
+            color='net_balance',
+            color_continuous_scale='RdYlGn',
+            color_continuous_midpoint=0,
+            hover_data=['immigration', 'emigration', 'net_balance']
+        )
+        
+        fig_centrality.update_layout(
+            height=600,
+            yaxis={'categoryorder': 'total ascending'},
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_centrality
+    
+    render_cached_chart('eda_centrality_ranking', (signature, top_n, metric), build_fig_centrality)
+
+
 # =============================================================================
 # TAB 3: CORREDORES MIGRATORIOS
 # =============================================================================
 
-def render_corridors(df: pd.DataFrame, data_loader: DataLoader, filters: dict):
+def render_corridors(df: pd.DataFrame, data_loader: DataLoader, filters: dict, signature: tuple = ()):
     """Renderiza análisis de corredores migratorios principales."""
     
     st.markdown('<div class="section-header">🛤️ Corredores Migratorios</div>', unsafe_allow_html=True)
@@ -377,33 +502,39 @@ def render_corridors(df: pd.DataFrame, data_loader: DataLoader, filters: dict):
     top_corridors = data_loader.get_top_corridors(df, top_n)
     
     # Visualización de corredores
-    fig_corridors = px.bar(
-        top_corridors,
-        x='n_researchers',
-        y='route',
-        orientation='h',
-        title=f'Top {top_n} Corredores Migratorios Más Transitados',
-        labels={'n_researchers': 'Número de Investigadores', 'route': 'Corredor'},
-        color='n_researchers',
-        color_continuous_scale='Blues',
-        text='n_researchers'
-    )
-    
-    fig_corridors.update_traces(
-        texttemplate='%{text:,.0f}',
-        textposition='outside'
-    )
+    def build_fig_corridors():
+        fig_corridors = px.bar(
+            top_corridors,
+            x='n_researchers',
+            y='route',
+            orientation='h',
+            title=f'Top {top_n} Corredores Migratorios Más Transitados',
+            labels={'n_researchers': 'Número de Investigadores', 'route': 'Corredor'},
+            color='n_researchers',
+            color_continuous_scale='Blues',
+            text='n_researchers'
+        )
+        
+        fig_corridors.update_traces(
+            texttemplate='%{text:,.0f}',
+            textposition='outside'
+        )
+        
+        fig_corridors.update_layout(
+            height=700,
+            showlegend=False,
+            yaxis={'categoryorder': 'total ascending'},
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_corridors
     
-    fig_corridors.update_layout(
-        height=700,
-        showlegend=False,
-        yaxis={'categoryorder': 'total ascending'},
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    render_cached_chart('eda_top_corridors', (signature, top_n), build_fig_corridors)
     
-    st.plotly_chart(fig_corridors, use_container_width=True, config=PLOTLY_CONFIG)
+    # Mapa geográfico de corredores (arcos de círculo máximo)
+    render_corridor_map(df, data_loader, signature)
     
     # Análisis de corredores principales
     st.markdown("### 🔍 Análisis de Corredores Principales")
@@ -470,51 +601,191 @@ def render_corridors(df: pd.DataFrame, data_loader: DataLoader, filters: dict):
             ]],
             use_container_width=True
         )
+    
+    # Redistribución a largo plazo (cadena de Markov)
+    render_markov_projection(df, signature)
+
+
+@st.fragment
+def render_corridor_map(df: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
+    """
+    Renderiza el mapa de corredores con arcos de círculo máximo.
+    
+    Se ejecuta como fragmento: el slider y la animación solo re-ejecutan
+    este bloque.
+    """
+    
+    st.markdown("### 🗺️ Mapa de Corredores")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        n_corridors = st.slider(
+            "Número de corredores en el mapa:",
+            min_value=10,
+            max_value=500,
+            value=100,
+            step=10,
+            key="corridor_map_n"
+        )
+    
+    with col2:
+        animated = st.checkbox(
+            "Animar por año",
+            value=False,
+            key="corridor_map_animated",
+            help="Top corredores de cada año de primera afiliación"
+        )
+    
+    centroids = data_loader.load_centroids()
+    
+    if animated:
+        def build_fig_flow_map():
+            yearly = filter_yearly_corridors(data_loader.load_yearly_corridors(), df)
+            keys = df[['origin', 'destination', 'origin_iso3', 'destination_iso3', 'route']].astype(str)
+            yearly = yearly.merge(keys, on=['origin', 'destination'], how='inner')
+            return create_animated_flow_map(yearly, centroids, n_corridors)
+    else:
+        def build_fig_flow_map():
+            return create_flow_map(data_loader.get_top_corridors(df, n_corridors), centroids)
+    
+    render_cached_chart('eda_corridor_map', (signature, n_corridors, animated), build_fig_flow_map)
+    
+    if animated and not data_loader.has_researcher_data():
+        st.caption(YEARLY_FALLBACK_NOTE)
+
+
+@st.fragment
+def render_markov_projection(df: pd.DataFrame, signature: tuple = ()):
+    """
+    Renderiza la proyección de la cadena de Markov de movilidad.
+    
+    Se ejecuta como fragmento: el slider de pasos solo elige una fila de la
+    proyección ya calculada para estos filtros.
+    """
+    
+    st.markdown("### 🔁 ¿Dónde Acaba el Talento? Cadena de Markov")
+    
+    st.markdown("""
+    Cada corredor se interpreta como una **probabilidad de transición**: un investigador de un 
+    país se mueve al destino con la misma frecuencia observada en los datos. Partiendo del 
+    reparto por país de origen, se proyecta el reparto tras varios movimientos y el 
+    **reparto a largo plazo** (distribución estacionaria del núcleo conectado de la red).
+    """)
+    
+    chain = get_markov_projection(df, signature, get_dataset_version())
+    
+    if not chain:
+        st.info("No hay flujos suficientes para construir la cadena con estos filtros.")
+        return
+    
+    steps = st.slider("Movimientos proyectados:", min_value=1, max_value=MARKOV_STEPS, value=1,
+                      key="eda_markov_steps")
+    
+    countries = chain['countries']
+    top = np.argsort(-np.maximum(chain['stationary'], chain['projection'][0]))[:15]
+    
+    shares = pd.DataFrame({
+        'country': np.tile(countries[top], 3),
+        'share': np.concatenate([chain['projection'][0][top], chain['projection'][steps][top],
+                                 chain['stationary'][top]]) * 100,
+        'stage': np.repeat(['Origen (actual)', f'Tras {steps} movimientos', 'Largo plazo'], top.size)
+    })
+    
+    def build_fig_markov():
+        fig_markov = px.bar(
+            shares,
+            x='country',
+            y='share',
+            color='stage',
+            barmode='group',
+            title='Reparto de Investigadores por País: Actual, Proyectado y Largo Plazo',
+            labels={'country': 'País', 'share': '% de investigadores', 'stage': ''},
+            color_discrete_sequence=[THEME_COLORS['secondary'], THEME_COLORS['accent'], THEME_COLORS['primary']]
+        )
+        
+        fig_markov.update_layout(
+            height=500,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_markov
+    
+    render_cached_chart('eda_markov_projection', (signature, steps), build_fig_markov)
+    
+    st.caption(
+        f"Núcleo conectado: {chain['n_core']} de {len(countries)} países · "
+        f"{chain['n_absorbing']} países sin emigración registrada retienen a sus investigadores · "
+        f"iteración de potencias {'convergida' if chain['converged'] else 'sin converger'} "
+        f"en {chain['n_iter']} iteraciones."
+    )
 
 
 # =============================================================================
 # TAB 4: ANÁLISIS REGIONAL
 # =============================================================================
 
-def render_regional_analysis(df: pd.DataFrame, data_loader: DataLoader):
+def render_regional_analysis(df: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
     """Renderiza análisis de flujos por región geográfica."""
     
     st.markdown('<div class="section-header">🌐 Análisis por Región Geográfica</div>', unsafe_allow_html=True)
     
+    # Agrupación de países: región del Banco Mundial, nivel de ingreso o comunidad de la red
+    groupings = available_groupings(df)
+    grouping = st.radio(
+        "Agrupar países por:",
+        options=groupings,
+        format_func=GROUPINGS.get,
+        horizontal=True,
+        key="eda_regional_grouping",
+        help="Las comunidades se detectan en los flujos (Louvain): agrupan países que intercambian más investigadores entre sí"
+    ) if len(groupings) > 1 else 'region'
+    
+    group_signature = (signature, grouping)
+    
     # Obtener flujos regionales
-    region_flows = data_loader.get_regional_flows(df)
+    region_flows = data_loader.get_regional_flows(df, grouping)
     
     # Top flujos inter-regionales
     st.markdown("### 🌍 Top Flujos Inter-Regionales")
     
     top_regional = region_flows.head(15)
     
-    fig_regional = px.bar(
-        top_regional,
-        x='n_researchers',
-        y=top_regional['origin_region'] + ' → ' + top_regional['destination_region'],
-        orientation='h',
-        title='Top 15 Flujos Entre Regiones',
-        labels={'n_researchers': 'Número de Investigadores', 'y': 'Flujo Regional'},
-        color='n_researchers',
-        color_continuous_scale='Viridis'
-    )
-    
-    fig_regional.update_layout(
-        height=500,
-        showlegend=False,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    def build_fig_regional():
+        fig_regional = px.bar(
+            top_regional,
+            x='n_researchers',
+            y=top_regional['origin_region'] + ' → ' + top_regional['destination_region'],
+            orientation='h',
+            title='Top 15 Flujos Entre Regiones',
+            labels={'n_researchers': 'Número de Investigadores', 'y': 'Flujo Regional'},
+            color='n_researchers',
+            color_continuous_scale='Viridis'
+        )
+        
+        fig_regional.update_layout(
+            height=500,
+            showlegend=False,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_regional
     
-    st.plotly_chart(fig_regional, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('eda_regional_flows', group_signature, build_fig_regional)
     
     # Sankey de regiones
     st.markdown("### 🌊 Diagrama de Flujos Regionales (Sankey)")
     
-    fig_sankey_regional = create_sankey_regional(region_flows.head(20))
-    st.plotly_chart(fig_sankey_regional, use_container_width=True, config=PLOTLY_CONFIG)
+    def build_fig_sankey_regional():
+        fig_sankey_regional = create_sankey_regional(region_flows, top_n=20, title=SANKEY_TITLES[grouping])
+        
+        return fig_sankey_regional
+    
+    render_cached_chart('eda_regional_sankey', group_signature, build_fig_sankey_regional)
     
     # Análisis por región de origen
     col1, col2 = st.columns(2)
@@ -522,46 +793,52 @@ def render_regional_analysis(df: pd.DataFrame, data_loader: DataLoader):
     with col1:
         st.markdown("### 📤 Emigración por Región")
         
-        emigration_by_region = df.groupby('origin_region')['n_researchers'].sum().sort_values(ascending=False).reset_index()
+        emigration_by_region = df.groupby(f'origin_{grouping}', observed=True)['n_researchers'].sum().sort_values(ascending=False).reset_index()
         emigration_by_region.columns = ['region', 'total_emigrants']
         
-        fig_em_region = px.pie(
-            emigration_by_region,
-            values='total_emigrants',
-            names='region',
-            title='Distribución de Emigración por Región',
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        
-        fig_em_region.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400
-        )
+        def build_fig_em_region():
+            fig_em_region = px.pie(
+                emigration_by_region,
+                values='total_emigrants',
+                names='region',
+                title='Distribución de Emigración por Región',
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
+            
+            fig_em_region.update_layout(
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=400
+            )
+            
+            return fig_em_region
         
-        st.plotly_chart(fig_em_region, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_emigration_by_region', group_signature, build_fig_em_region)
     
     with col2:
         st.markdown("### 📥 Inmigración por Región")
         
-        immigration_by_region = df.groupby('destination_region')['n_researchers'].sum().sort_values(ascending=False).reset_index()
+        immigration_by_region = df.groupby(f'destination_{grouping}', observed=True)['n_researchers'].sum().sort_values(ascending=False).reset_index()
         immigration_by_region.columns = ['region', 'total_immigrants']
         
-        fig_im_region = px.pie(
-            immigration_by_region,
-            values='total_immigrants',
-            names='region',
-            title='Distribución de Inmigración por Región',
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        
-        fig_im_region.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400
-        )
+        def build_fig_im_region():
+            fig_im_region = px.pie(
+                immigration_by_region,
+                values='total_immigrants',
+                names='region',
+                title='Distribución de Inmigración por Región',
+                color_discrete_sequence=px.colors.qualitative.Pastel
+            )
+            
+            fig_im_region.update_layout(
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=400
+            )
+            
+            return fig_im_region
         
-        st.plotly_chart(fig_im_region, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_immigration_by_region', group_signature, build_fig_im_region)
     
     # NUEVA MEJORA 2: Gráfico 3D - Emigración vs Inmigración vs Saldo Neto
     st.markdown("### 🌍 Análisis 3D: Emigración, Inmigración y Saldo Neto por País")
@@ -574,43 +851,47 @@ def render_regional_analysis(df: pd.DataFrame, data_loader: DataLoader):
     significant_countries = net_migration_full[net_migration_full['total_flow'] > 100].copy()
     
     # Crear scatter 3D
-    fig_3d = px.scatter_3d(
-        significant_countries,
-        x='emigration',
-        y='immigration',
-        z='net_balance',
-        color='type',
-        size='total_flow',
-        hover_name='country',
-        hover_data=['migration_ratio'],
-        color_discrete_map={'Atractor': THEME_COLORS['success'], 'Exportador': THEME_COLORS['warning']},
-        title='Espacio 3D: Emigración × Inmigración × Saldo Neto',
-        labels={
-            'emigration': 'Emigración Total',
-            'immigration': 'Inmigración Total',
-            'net_balance': 'Saldo Neto',
-            'total_flow': 'Flujo Total',
-            'type': 'Tipo de País'
-        }
-    )
-    
-    # Añadir plano de referencia (balance = 0)
-    fig_3d.update_layout(
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=700,
-        scene=dict(
-            xaxis=dict(title='Emigración', gridcolor='rgba(255,255,255,0.1)', showbackground=True, backgroundcolor='rgba(0,0,0,0.5)'),
-            yaxis=dict(title='Inmigración', gridcolor='rgba(255,255,255,0.1)', showbackground=True, backgroundcolor='rgba(0,0,0,0.5)'),
-            zaxis=dict(title='Saldo Neto', gridcolor='rgba(255,255,255,0.1)', showbackground=True, backgroundcolor='rgba(0,0,0,0.5)'),
-            camera=dict(
-                eye=dict(x=1.5, y=1.5, z=1.3)
+    def build_fig_3d():
+        fig_3d = scatter_figure(
+            significant_countries,
+            x='emigration',
+            y='immigration',
+            z='net_balance',
+            priority='total_flow',
+            color='type',
+            size='total_flow',
+            hover_name='country',
+            hover_data=['migration_ratio'],
+            color_discrete_map={'Atractor': THEME_COLORS['success'], 'Exportador': THEME_COLORS['warning']},
+            title='Espacio 3D: Emigración × Inmigración × Saldo Neto',
+            labels={
+                'emigration': 'Emigración Total',
+                'immigration': 'Inmigración Total',
+                'net_balance': 'Saldo Neto',
+                'total_flow': 'Flujo Total',
+                'type': 'Tipo de País'
+            }
+        )
+        
+        # Añadir plano de referencia (balance = 0)
+        fig_3d.update_layout(
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            height=700,
+            scene=dict(
+                xaxis=dict(title='Emigración', gridcolor='rgba(255,255,255,0.1)', showbackground=True, backgroundcolor='rgba(0,0,0,0.5)'),
+                yaxis=dict(title='Inmigración', gridcolor='rgba(255,255,255,0.1)', showbackground=True, backgroundcolor='rgba(0,0,0,0.5)'),
+                zaxis=dict(title='Saldo Neto', gridcolor='rgba(255,255,255,0.1)', showbackground=True, backgroundcolor='rgba(0,0,0,0.5)'),
+                camera=dict(
+                    eye=dict(x=1.5, y=1.5, z=1.3)
+                )
             )
         )
-    )
+        
+        return fig_3d
     
-    st.plotly_chart(fig_3d, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('eda_scatter_3d', signature, build_fig_3d)
     
     st.markdown("""
     <div class="alert-info">
@@ -632,7 +913,38 @@ def render_regional_analysis(df: pd.DataFrame, data_loader: DataLoader):
 # TAB 5: CORRELACIÓN ECONÓMICA
 # =============================================================================
 
-def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, data_loader: DataLoader):
+def complete_wdi_gaps(wdi_pivot: pd.DataFrame, filled: pd.DataFrame, features: list) -> pd.DataFrame:
+    """
+    Completa los indicadores sin dato con la media del panel rellenado.
+    
+    Args:
+        wdi_pivot: Indicadores por país (columna country = iso3)
+        filled: Panel WDI rellenado (ver DataLoader.load_wdi_filled)
+        features: Nombres de features WDI (claves de WDI_FEATURES)
+    
+    Returns:
+        wdi_pivot completado, con wdi_source = 'Imputado' en los países con
+        algún indicador imputado
+    """
+    names = {WDI_FEATURES[name]: name for name in features}
+    filled = filled[filled['IndicatorCode'].isin(list(names))]
+    
+    imputed = filled.assign(feature=filled['IndicatorCode'].map(names)).pivot_table(
+        index='iso3', columns='feature', values='Value', aggfunc='mean'
+    )
+    
+    completed = wdi_pivot.set_index('country')
+    imputed = imputed.reindex(index=completed.index, columns=features)
+    gaps = completed[features].isna() & imputed.notna()
+    
+    completed[features] = completed[features].fillna(imputed)
+    completed.loc[gaps.any(axis=1), 'wdi_source'] = 'Imputado'
+    
+    return completed.reset_index()
+
+
+def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, data_loader: DataLoader,
+                                signature: tuple = ()):
     """Renderiza análisis de correlación con indicadores económicos."""
     
     st.markdown('<div class="section-header">💰 Correlación con Desarrollo Económico</div>', unsafe_allow_html=True)
@@ -646,25 +958,26 @@ def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, da
     y el **saldo migratorio neto** de países.
     """)
     
-    # Preparar datos WDI
-    wdi_recent = df_wdi[df_wdi['Year'].between(2014, 2016)].copy()
-    
-    wdi_pivot = wdi_recent.pivot_table(
-        index='iso3',
-        columns='IndicatorCode',
-        values='Value',
-        aggfunc='mean'
-    ).reset_index()
-    
-    if wdi_pivot.shape[1] >= 5:
-        wdi_pivot.columns = [
-            'country',
-            'gdp_per_capita',
-            'rd_expenditure_pct',
-            'population',
-            'researchers_per_million'
-        ]
-    else:
+    # Indicadores WDI por nombre desde el feature store (media de los años recientes)
+    wdi_features = list(WDI_FEATURES)
+    wdi_pivot = data_loader.load_features(tuple(wdi_features), *RECENT_YEARS)
+    wdi_pivot = wdi_pivot.groupby('iso3', observed=True)[wdi_features].mean().reset_index()
+    wdi_pivot = wdi_pivot.rename(columns={'iso3': 'country'})
+    
+    # Huecos WDI: completar con el panel rellenado en el preprocesamiento
+    fill_wdi_gaps = st.checkbox(
+        "Completar huecos de WDI con valores imputados",
+        value=True,
+        key='eda_wdi_fill_gaps',
+        help="Interpolación lineal, arrastre del último valor o mediana regional. "
+             "Sin imputación, los países sin dato quedan fuera de cada gráfico."
+    )
+    wdi_pivot['wdi_source'] = 'Observado'
+    if fill_wdi_gaps:
+        wdi_pivot = complete_wdi_gaps(wdi_pivot, data_loader.load_wdi_filled(*RECENT_YEARS), wdi_features)
+    wdi_signature = (*signature, fill_wdi_gaps)
+    
+    if wdi_pivot.empty or wdi_pivot[wdi_features].isna().all().any():
         st.warning("⚠️ Datos WDI incompletos. Algunas visualizaciones no estarán disponibles.")
         return
     
@@ -700,6 +1013,11 @@ def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, da
         st.warning("⚠️ No se pudo hacer el merge con datos WDI.")
         return
     
+    if fill_wdi_gaps:
+        n_imputed = int((migration_wdi['wdi_source'] == 'Imputado').sum())
+        st.caption(f"🧩 {n_imputed} de {len(migration_wdi)} países usan algún indicador WDI imputado "
+                   f"(ver 'wdi_source' en el tooltip).")
+    
     # Inicializar variables de correlación
     corr_gdp = 0.0
     corr_rd = 0.0
@@ -713,43 +1031,57 @@ def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, da
         (migration_wdi['total_flow'] > 50)
     ].copy()
     
-    fig_gdp = px.scatter(
-        viz_data,
-        x='gdp_per_capita',
-        y='net_balance',
-        size='total_flow',
-        color='type',
-        hover_name='country_x',
-        hover_data=['immigration', 'emigration', 'population'],
-        title='Correlación: PIB per Cápita vs. Saldo Migratorio Neto',
-        labels={
-            'gdp_per_capita': 'PIB per Cápita (USD)',
-            'net_balance': 'Saldo Migratorio Neto',
-            'total_flow': 'Flujo Total',
-            'type': 'Tipo de País'
-        },
-        color_discrete_map={'Atractor': THEME_COLORS['success'], 'Exportador': THEME_COLORS['warning']},
-        log_x=True,
-        trendline="ols"
+    # Tendencia en log10(PIB), coherente con el eje logarítmico
+    fit_gdp = fit_trendline(
+        viz_data['gdp_per_capita'].to_numpy(dtype='float64'),
+        viz_data['net_balance'].to_numpy(dtype='float64'),
+        'ols', log_x=True
     )
     
-    fig_gdp.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Balance = 0")
-    fig_gdp.update_layout(
-        height=600,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    def build_fig_gdp():
+        fig_gdp = scatter_figure(
+            viz_data,
+            x='gdp_per_capita',
+            y='net_balance',
+            priority='total_flow',
+            size='total_flow',
+            color='type',
+            hover_name='country_x',
+            hover_data=['immigration', 'emigration', 'population', 'wdi_source'],
+            title='Correlación: PIB per Cápita vs. Saldo Migratorio Neto',
+            labels={
+                'gdp_per_capita': 'PIB per Cápita (USD)',
+                'net_balance': 'Saldo Migratorio Neto',
+                'total_flow': 'Flujo Total',
+                'type': 'Tipo de País'
+            },
+            color_discrete_map={'Atractor': THEME_COLORS['success'], 'Exportador': THEME_COLORS['warning']},
+            log_x=True
+        )
+        
+        add_trendline(fig_gdp, fit_gdp)
+        fig_gdp.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Balance = 0")
+        fig_gdp.update_layout(
+            height=600,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_gdp
     
-    st.plotly_chart(fig_gdp, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('eda_gdp_vs_balance', wdi_signature, build_fig_gdp)
+    st.caption(format_trendline_summary(fit_gdp))
     
     # Calcular correlación
     if len(viz_data) > 2:
-        corr_gdp = viz_data[['gdp_per_capita', 'net_balance']].corr().iloc[0, 1]
+        corr_gdp_result = bootstrap_correlation_ci(viz_data['gdp_per_capita'], viz_data['net_balance'])
+        corr_gdp = corr_gdp_result['r']
         
         st.markdown(f"""
         <div class="alert-info">
             <h4>📊 Correlación de Pearson: {corr_gdp:.3f}</h4>
+            <p>{format_correlation(corr_gdp_result)}</p>
             <p>Existe una <strong>correlación positiva {'fuerte' if abs(corr_gdp) > 0.7 else 'moderada'}</strong> 
             entre PIB per cápita y saldo migratorio neto.</p>
             <ul>
@@ -770,41 +1102,53 @@ def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, da
     ].copy()
     
     if len(viz_data_rd) > 10:
-        fig_rd = px.scatter(
-            viz_data_rd,
-            x='rd_expenditure_pct',
-            y='net_balance',
-            size='total_flow',
-            color='type',
-            hover_name='country_x',
-            hover_data=['immigration', 'emigration', 'gdp_per_capita'],
-            title='Correlación: Gasto en I+D (% PIB) vs. Saldo Migratorio Neto',
-            labels={
-                'rd_expenditure_pct': 'Gasto I+D (% del PIB)',
-                'net_balance': 'Saldo Migratorio Neto',
-                'total_flow': 'Flujo Total',
-                'type': 'Tipo de País'
-            },
-            color_discrete_map={'Atractor': THEME_COLORS['success'], 'Exportador': THEME_COLORS['warning']},
-            trendline="ols"
+        fit_rd = fit_trendline(
+            viz_data_rd['rd_expenditure_pct'].to_numpy(dtype='float64'),
+            viz_data_rd['net_balance'].to_numpy(dtype='float64')
         )
         
-        fig_rd.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig_rd.update_layout(
-            height=600,
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
+        def build_fig_rd():
+            fig_rd = scatter_figure(
+                viz_data_rd,
+                x='rd_expenditure_pct',
+                y='net_balance',
+                priority='total_flow',
+                size='total_flow',
+                color='type',
+                hover_name='country_x',
+                hover_data=['immigration', 'emigration', 'gdp_per_capita', 'wdi_source'],
+                title='Correlación: Gasto en I+D (% PIB) vs. Saldo Migratorio Neto',
+                labels={
+                    'rd_expenditure_pct': 'Gasto I+D (% del PIB)',
+                    'net_balance': 'Saldo Migratorio Neto',
+                    'total_flow': 'Flujo Total',
+                    'type': 'Tipo de País'
+                },
+                color_discrete_map={'Atractor': THEME_COLORS['success'], 'Exportador': THEME_COLORS['warning']}
+            )
+            
+            add_trendline(fig_rd, fit_rd)
+            fig_rd.add_hline(y=0, line_dash="dash", line_color="gray")
+            fig_rd.update_layout(
+                height=600,
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_rd
         
-        st.plotly_chart(fig_rd, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_rd_vs_balance', wdi_signature, build_fig_rd)
+        st.caption(format_trendline_summary(fit_rd))
         
         # Correlación
-        corr_rd = viz_data_rd[['rd_expenditure_pct', 'net_balance']].corr().iloc[0, 1]
+        corr_rd_result = bootstrap_correlation_ci(viz_data_rd['rd_expenditure_pct'], viz_data_rd['net_balance'])
+        corr_rd = corr_rd_result['r']
         
         st.markdown(f"""
         <div class="alert-success">
             <h4>📊 Correlación de Pearson: {corr_rd:.3f}</h4>
+            <p>{format_correlation(corr_rd_result)}</p>
             <p>La correlación con gasto en I+D es <strong>{'más fuerte' if abs(corr_rd) > abs(corr_gdp) else 'similar'}</strong> 
             que con PIB per cápita.</p>
             <p><strong>Insight clave:</strong> El gasto en I+D es mejor predictor que PIB porque señala 
@@ -834,37 +1178,40 @@ def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, da
     else:
         parallel_sample = parallel_data
     
-    fig_parallel = px.parallel_coordinates(
-        parallel_sample,
-        dimensions=['gdp_per_capita', 'rd_expenditure_pct', 'net_balance_scaled', 
-                   'immigration', 'emigration', 'population_millions'],
-        color='type_numeric',
-        color_continuous_scale=[(0, THEME_COLORS['warning']), (1, THEME_COLORS['success'])],
-        labels={
-            'gdp_per_capita': 'PIB per Cápita',
-            'rd_expenditure_pct': 'I+D (% PIB)',
-            'net_balance_scaled': 'Saldo Neto (miles)',
-            'immigration': 'Inmigración',
-            'emigration': 'Emigración',
-            'population_millions': 'Población (M)',
-            'type_numeric': 'Tipo'
-        },
-        title='Análisis Multidimensional: Variables Económicas y Migratorias'
-    )
-    
-    fig_parallel.update_layout(
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=600,
-        coloraxis_colorbar=dict(
-            title="Tipo",
-            tickvals=[0, 1],
-            ticktext=["Exportador", "Atractor"]
+    def build_fig_parallel():
+        fig_parallel = px.parallel_coordinates(
+            parallel_sample,
+            dimensions=['gdp_per_capita', 'rd_expenditure_pct', 'net_balance_scaled', 
+                       'immigration', 'emigration', 'population_millions'],
+            color='type_numeric',
+            color_continuous_scale=[(0, THEME_COLORS['warning']), (1, THEME_COLORS['success'])],
+            labels={
+                'gdp_per_capita': 'PIB per Cápita',
+                'rd_expenditure_pct': 'I+D (% PIB)',
+                'net_balance_scaled': 'Saldo Neto (miles)',
+                'immigration': 'Inmigración',
+                'emigration': 'Emigración',
+                'population_millions': 'Población (M)',
+                'type_numeric': 'Tipo'
+            },
+            title='Análisis Multidimensional: Variables Económicas y Migratorias'
         )
-    )
+        
+        fig_parallel.update_layout(
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            height=600,
+            coloraxis_colorbar=dict(
+                title="Tipo",
+                tickvals=[0, 1],
+                ticktext=["Exportador", "Atractor"]
+            )
+        )
+        
+        return fig_parallel
     
-    st.plotly_chart(fig_parallel, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('eda_parallel_coordinates', wdi_signature, build_fig_parallel)
     
     st.markdown("""
     <div class="alert-info">
@@ -877,13 +1224,205 @@ def render_economic_correlation(df_flows: pd.DataFrame, df_wdi: pd.DataFrame, da
         </ul>
     </div>
     """, unsafe_allow_html=True)
+    
+    render_asof_economic_gap(df_flows, data_loader, signature)
+    
+    render_indicator_screening(df_flows, data_loader, signature)
+
+
+def render_asof_economic_gap(df_flows: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
+    """Renderiza la brecha de PIB origen-destino as-of del año de doctorado de cada corredor."""
+    
+    st.markdown("### ⏱️ Brecha Económica en el Momento de la Migración")
+    st.markdown(f"""
+    Cada corredor se cruza con el PIB per cápita de origen y destino **del año de doctorado**
+    (último dato WDI publicado hasta ese año), en lugar de los valores de {RECENT_YEARS[0]}-{RECENT_YEARS[1]}
+    para todos los años.
+    """)
+    
+    if not data_loader.has_researcher_data():
+        dropped = int(data_loader.load_flows()['phd_year_mean'].isna().sum())
+        st.caption(PHD_YEAR_FALLBACK_NOTE.format(dropped=dropped))
+    
+    version = get_dataset_version()
+    features = ('gdp_per_capita',)
+    asof = get_corridor_indicators(data_loader, df_flows, signature, version, features)
+    static = get_corridor_indicators(data_loader, df_flows, signature, version, features,
+                                     fixed_year=RECENT_YEARS[1])
+    
+    def gdp_gap_by_year(corridors: pd.DataFrame) -> pd.DataFrame:
+        """Brecha log10(PIB destino / PIB origen) media ponderada por investigadores y año."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap = np.log10(corridors['destination_gdp_per_capita'] / corridors['origin_gdp_per_capita']).to_numpy()
+        valid = np.isfinite(gap)
+        
+        years, year_idx = np.unique(corridors['year'].to_numpy()[valid], return_inverse=True)
+        weights = corridors['n_researchers'].to_numpy(dtype=np.float64)[valid]
+        total = np.bincount(year_idx, weights)
+        
+        return pd.DataFrame({
+            'year': years,
+            'gap': np.bincount(year_idx, weights * gap[valid]) / total,
+            'share_richer': np.bincount(year_idx, weights * (gap[valid] > 0)) / total,
+            'n_researchers': total
+        })
+    
+    gap_asof = gdp_gap_by_year(asof)
+    gap_static = gdp_gap_by_year(static)
+    
+    if gap_asof.empty:
+        st.info("No hay corredores con PIB de origen y destino para los filtros actuales.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        share = np.average(gap_asof['share_richer'], weights=gap_asof['n_researchers'])
+        st.metric("Hacia países más ricos (año de doctorado)", f"{share:.1%}",
+                  help="Investigadores cuyo destino tenía mayor PIB per cápita que su origen en su año de doctorado")
+    with col2:
+        if gap_static.empty:
+            st.metric(f"Con PIB de {RECENT_YEARS[1]}", "–")
+        else:
+            share_static = np.average(gap_static['share_richer'], weights=gap_static['n_researchers'])
+            st.metric(f"Con PIB de {RECENT_YEARS[1]}", f"{share_static:.1%}",
+                      delta=f"{(share_static - share) * 100:+.1f} pp", delta_color="off")
+    
+    def build_fig_gap():
+        fig_gap = go.Figure()
+        fig_gap.add_trace(go.Scatter(
+            x=gap_asof['year'], y=gap_asof['gap'], mode='lines+markers',
+            name='As-of año de doctorado', line=dict(color=THEME_COLORS['primary'])
+        ))
+        fig_gap.add_trace(go.Scatter(
+            x=gap_static['year'], y=gap_static['gap'], mode='lines',
+            name=f'PIB de {RECENT_YEARS[1]}', line=dict(color=THEME_COLORS['accent'], dash='dash')
+        ))
+        fig_gap.add_hline(y=0, line_dash="dot", line_color="gray")
+        fig_gap.update_layout(
+            title='Brecha de PIB per Cápita Destino / Origen por Año de Doctorado',
+            xaxis_title='Año de Doctorado',
+            yaxis_title='log₁₀(PIB destino / PIB origen)',
+            height=450,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_gap
+    
+    render_cached_chart('eda_asof_gdp_gap', signature, build_fig_gap)
+
+
+@st.fragment
+def render_indicator_screening(df_flows: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
+    """
+    Renderiza el cribado de todas las series WDI frente a una variable migratoria.
+    
+    Se ejecuta como fragmento: cambiar variable, método o umbral solo
+    re-ejecuta este bloque (el cribado está cacheado por filtros).
+    """
+    
+    st.markdown("### 🔎 Cribado de Indicadores WDI")
+    st.markdown(f"""
+    Correlación de **todas las series WDI disponibles** (media {SCREENING_YEARS[0]}-{SCREENING_YEARS[1]})
+    con la variable migratoria elegida. Los indicadores se ordenan por q-valor
+    (Benjamini-Hochberg), que corrige el gran número de contrastes simultáneos.
+    """)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        target = st.selectbox(
+            "Variable migratoria:",
+            options=list(SCREENING_TARGETS),
+            format_func=SCREENING_TARGETS.get,
+            key="screening_target"
+        )
+    
+    with col2:
+        method = st.radio(
+            "Método:",
+            options=['pearson', 'spearman'],
+            format_func=str.capitalize,
+            horizontal=True,
+            key="screening_method"
+        )
+    
+    with col3:
+        min_obs = st.slider(
+            "Países mínimos por indicador:",
+            min_value=10,
+            max_value=100,
+            value=MIN_COUNTRIES,
+            step=5,
+            key="screening_min_obs"
+        )
+    
+    screening = get_indicator_screening(
+        data_loader, df_flows, signature, get_dataset_version(), target, method, min_obs
+    )
+    
+    if screening.empty:
+        st.info("No hay indicadores con países suficientes para el cribado.")
+        return
+    
+    n_significant = int(screening['significant'].sum())
+    st.caption(
+        f"{len(screening):,} indicadores evaluados · {n_significant:,} significativos "
+        f"(q < {FDR_ALPHA})"
+    )
+    
+    top_n = min(20, len(screening))
+    
+    def build_fig_screening():
+        top = screening.head(top_n).iloc[::-1]
+        fig_screening = go.Figure(go.Bar(
+            x=top['r'],
+            y=top['IndicatorName'].str.slice(0, 60),
+            orientation='h',
+            marker_color=np.where(top['significant'], THEME_COLORS['success'], THEME_COLORS['warning']),
+            customdata=np.column_stack([top['IndicatorCode'], top['n'], top['q_value']]),
+            hovertemplate='<b>%{y}</b><br>%{customdata[0]}<br>r = %{x:.3f}<br>'
+                          'n = %{customdata[1]}<br>q = %{customdata[2]:.2g}<extra></extra>'
+        ))
+        
+        fig_screening.update_layout(
+            title=f'Top {top_n} Indicadores Asociados ({SCREENING_TARGETS[target]})',
+            xaxis_title='Correlación',
+            xaxis_range=[-1, 1],
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            height=max(400, 28 * top_n)
+        )
+        
+        return fig_screening
+    
+    render_cached_chart('eda_indicator_screening', (signature, target, method, min_obs), build_fig_screening)
+    
+    st.dataframe(
+        screening,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'IndicatorCode': 'Código',
+            'IndicatorName': 'Indicador',
+            'Topic': 'Tema',
+            'r': st.column_config.NumberColumn('Correlación', format='%.3f'),
+            'n': 'Países',
+            'p_value': st.column_config.NumberColumn('p-valor', format='%.2e'),
+            'q_value': st.column_config.NumberColumn('q-valor', format='%.2e'),
+            'significant': 'Significativo'
+        }
+    )
 
 
 # =============================================================================
 # TAB 6: EVOLUCIÓN TEMPORAL
 # =============================================================================
 
-def render_temporal_evolution(df_flows: pd.DataFrame, df_migrations: pd.DataFrame):
+def render_temporal_evolution(df_flows: pd.DataFrame, df_migrations: pd.DataFrame,
+                              data_loader: DataLoader, signature: tuple = ()):
     """Renderiza análisis de evolución temporal de migraciones."""
     
     st.markdown('<div class="section-header">📅 Evolución Temporal</div>', unsafe_allow_html=True)
@@ -898,24 +1437,27 @@ def render_temporal_evolution(df_flows: pd.DataFrame, df_migrations: pd.DataFram
         flows_by_decade = df_flows.groupby('phd_decade')['n_researchers'].sum().reset_index()
         flows_by_decade = flows_by_decade[flows_by_decade['phd_decade'] >= 1960]
         
-        fig_decade = px.bar(
-            flows_by_decade,
-            x='phd_decade',
-            y='n_researchers',
-            title='Volumen de Migraciones por Década (Año de PhD)',
-            labels={'phd_decade': 'Década', 'n_researchers': 'Número de Investigadores'},
-            color='n_researchers',
-            color_continuous_scale='Blues'
-        )
-        
-        fig_decade.update_layout(
-            height=400,
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
+        def build_fig_decade():
+            fig_decade = px.bar(
+                flows_by_decade,
+                x='phd_decade',
+                y='n_researchers',
+                title='Volumen de Migraciones por Década (Año de PhD)',
+                labels={'phd_decade': 'Década', 'n_researchers': 'Número de Investigadores'},
+                color='n_researchers',
+                color_continuous_scale='Blues'
+            )
+            
+            fig_decade.update_layout(
+                height=400,
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_decade
         
-        st.plotly_chart(fig_decade, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_flows_by_decade', signature, build_fig_decade)
     
     # Si tenemos datos individuales de migraciones
     if not df_migrations.empty and 'origin_year' in df_migrations.columns:
@@ -928,24 +1470,27 @@ def render_temporal_evolution(df_flows: pd.DataFrame, df_migrations: pd.DataFram
         ]['origin_year'].value_counts().sort_index().reset_index()
         migration_year_dist.columns = ['year', 'count']
         
-        fig_year = px.line(
-            migration_year_dist,
-            x='year',
-            y='count',
-            title='Evolución Temporal de Migraciones Científicas (1970-2020)',
-            labels={'year': 'Año de Primera Afiliación', 'count': 'Número de Investigadores'},
-            markers=True
-        )
-        
-        fig_year.update_traces(line_color=THEME_COLORS['primary'], marker=dict(size=6))
-        fig_year.update_layout(
-            height=500,
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
+        def build_fig_year():
+            fig_year = px.line(
+                migration_year_dist,
+                x='year',
+                y='count',
+                title='Evolución Temporal de Migraciones Científicas (1970-2020)',
+                labels={'year': 'Año de Primera Afiliación', 'count': 'Número de Investigadores'},
+                markers=True
+            )
+            
+            fig_year.update_traces(line_color=THEME_COLORS['primary'], marker=dict(size=6))
+            fig_year.update_layout(
+                height=500,
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_year
         
-        st.plotly_chart(fig_year, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('eda_migrations_by_year', (), build_fig_year)
         
         # Identificar pico
         if not migration_year_dist.empty:
@@ -958,14 +1503,55 @@ def render_temporal_evolution(df_flows: pd.DataFrame, df_migrations: pd.DataFram
                 <p>El año con mayor volumen registró <strong>{int(peak_count):,} investigadores</strong> migrando.</p>
             </div>
             """, unsafe_allow_html=True)
+    
+    # Mapa animado por año (cubo año × país precalculado)
+    render_animated_map(df_flows, data_loader, signature)
+
+
+@st.fragment
+def render_animated_map(df_flows: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
+    """
+    Renderiza el mapa animado del saldo migratorio por año.
+    
+    Cada fotograma es una fila del cubo (años × países) cacheado por firma
+    de filtros; cambiar a la vista acumulada solo re-ejecuta este fragmento.
+    """
+    
+    st.markdown("### 🗺️ Saldo Migratorio Año a Año")
+    
+    cumulative = st.checkbox(
+        "Mostrar saldo acumulado",
+        value=False,
+        key="temporal_map_cumulative",
+        help="Suma los flujos de todos los años anteriores en cada fotograma"
+    )
+    
+    cube = get_year_country_cube(data_loader, df_flows, signature, get_dataset_version())
+    
+    if trim_cube_years(cube) == (0, 0):
+        st.info("ℹ️ No hay flujos con año de primera afiliación para los filtros seleccionados")
+        return
+    
+    st.plotly_chart(create_animated_map(cube, cumulative), use_container_width=True, config=PLOTLY_CONFIG)
+    if data_loader.has_researcher_data():
+        st.caption("Año de primera afiliación del investigador; los corredores siguen los filtros del sidebar.")
+    else:
+        st.caption(YEARLY_FALLBACK_NOTE)
 
 
 # =============================================================================
 # TAB 7: DIAGRAMA DE FLUJOS (SANKEY)
 # =============================================================================
 
-def render_flow_diagram(df: pd.DataFrame, filters: dict):
-    """Renderiza diagrama de flujos Sankey."""
+@st.fragment
+def render_flow_diagram(df: pd.DataFrame, data_loader: DataLoader, signature: tuple = ()):
+    """
+    Renderiza diagrama de flujos Sankey.
+    
+    Se ejecuta como fragmento: mover el slider o el selector solo re-ejecuta
+    esta función con el DataFrame ya filtrado en la última ejecución completa,
+    sin recargar el sidebar ni reconstruir el resto de la página.
+    """
     
     st.markdown('<div class="section-header">🌊 Diagrama de Flujos (Sankey)</div>', unsafe_allow_html=True)
     
@@ -975,13 +1561,13 @@ def render_flow_diagram(df: pd.DataFrame, filters: dict):
     """)
     
     # Control de visualización
-    col1, col2 = st.columns([2, 1])
+    col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
         n_flows = st.slider(
             "Número de flujos a visualizar",
             min_value=10,
-            max_value=50,
+            max_value=200,
             value=30,
             step=5,
             help="Más flujos = diagrama más complejo"
@@ -990,20 +1576,22 @@ def render_flow_diagram(df: pd.DataFrame, filters: dict):
     with col2:
         flow_type = st.selectbox(
             "Tipo de flujo",
-            ["País a País", "Región a Región"],
+            ["País a País", *(SANKEY_LEVELS[grouping] for grouping in available_groupings(df))],
             help="Selecciona nivel de agregación"
         )
     
-    # Crear Sankey
-    if flow_type == "País a País":
-        fig_sankey = create_sankey_countries(df, n_flows)
-    else:
-        from components.data_loader import DataLoader
-        data_loader = DataLoader()
-        region_flows = data_loader.get_regional_flows(df)
-        fig_sankey = create_sankey_regional(region_flows.head(n_flows))
+    with col3:
+        aggregate_tail = st.checkbox(
+            "Agrupar resto en 'Otros flujos'",
+            value=False,
+            help="Suma los flujos fuera del top N en un nodo 'Otros flujos'"
+        )
+    
+    # Crear Sankey (especificación cacheada por nivel, N y filtros)
+    level = next((grouping for grouping, label in SANKEY_LEVELS.items() if label == flow_type), 'country')
+    sankey_spec = get_sankey_spec(level, n_flows, signature, get_dataset_version(), df, data_loader, aggregate_tail)
     
-    st.plotly_chart(fig_sankey, use_container_width=True, config=PLOTLY_CONFIG)
+    st.plotly_chart(figure_from_spec(sankey_spec), use_container_width=True, config=PLOTLY_CONFIG)
     
     # Información sobre el diagrama
     with st.expander("ℹ️ Cómo interpretar el diagrama Sankey"):
@@ -1021,113 +1609,6 @@ def render_flow_diagram(df: pd.DataFrame, filters: dict):
         - 🇪🇺 **Europa** tiene red compleja de flujos internos
         
         **Limitaciones:**
-        - Solo muestra top N flujos (diagrama se satura con muchos nodos)
+        - Solo muestra top N flujos (el resto puede agruparse en el nodo 'Otros flujos')
         - No representa temporalidad (visión estática del período completo)
         """)
-
-
-# =============================================================================
-# FUNCIONES AUXILIARES
-# =============================================================================
-
-def create_sankey_countries(df: pd.DataFrame, top_n: int = 30) -> go.Figure:
-    """Crea diagrama Sankey de flujos entre países."""
-    
-    df_top = df.nlargest(top_n, 'n_researchers').copy()
-    
-    # Crear mapeo de nodos únicos
-    all_countries = list(set(df_top['origin_iso3'].tolist() + df_top['destination_iso3'].tolist()))
-    country_to_idx = {country: idx for idx, country in enumerate(all_countries)}
-    
-    # Crear listas para Sankey
-    sources = [country_to_idx[origin] for origin in df_top['origin_iso3']]
-    targets = [country_to_idx[dest] for dest in df_top['destination_iso3']]
-    values = df_top['n_researchers'].tolist()
-    
-    # Colores
-    node_colors = [f'rgba({hash(c) % 200 + 50}, {hash(c[::-1]) % 200 + 50}, 180, 0.8)' 
-                   for c in all_countries]
-    link_colors = ['rgba(100, 150, 200, 0.3)'] * len(values)
-    
-    # Crear diagrama
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=15,
-            thickness=20,
-            line=dict(color="white", width=0.5),
-            label=all_countries,
-            color=node_colors
-        ),
-        link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=link_colors
-        )
-    )])
-    
-    fig.update_layout(
-        title=f"Top {top_n} Flujos Migratorios: País a País",
-        font=dict(size=12),
-        height=700,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    
-    return fig
-
-
-def create_sankey_regional(region_flows: pd.DataFrame) -> go.Figure:
-    """Crea diagrama Sankey de flujos entre regiones."""
-    
-    # Crear mapeo de regiones
-    all_regions = list(set(region_flows['origin_region'].tolist() + 
-                           region_flows['destination_region'].tolist()))
-    region_to_idx = {region: idx for idx, region in enumerate(all_regions)}
-    
-    # Crear listas
-    sources = [region_to_idx[r] for r in region_flows['origin_region']]
-    targets = [region_to_idx[r] for r in region_flows['destination_region']]
-    values = region_flows['n_researchers'].tolist()
-    
-    # Colores por región
-    region_colors = {
-        'Europa': 'rgba(46, 134, 171, 0.8)',
-        'Norteamérica': 'rgba(241, 143, 1, 0.8)',
-        'Asia': 'rgba(162, 59, 114, 0.8)',
-        'Sudamérica': 'rgba(6, 167, 125, 0.8)',
-        'Oceanía': 'rgba(108, 117, 125, 0.8)',
-        'África': 'rgba(208, 0, 0, 0.8)',
-        'Otros': 'rgba(200, 200, 200, 0.8)'
-    }
-    
-    node_colors = [region_colors.get(r, 'rgba(200, 200, 200, 0.8)') for r in all_regions]
-    link_colors = ['rgba(100, 150, 200, 0.3)'] * len(values)
-    
-    fig = go.Figure(data=[go.Sankey(
-        node=dict(
-            pad=15,
-            thickness=20,
-            line=dict(color="white", width=0.5),
-            label=all_regions,
-            color=node_colors
-        ),
-        link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=link_colors
-        )
-    )])
-    
-    fig.update_layout(
-        title="Flujos Migratorios por Región Geográfica",
-        font=dict(size=14),
-        height=600,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    
-    return fig
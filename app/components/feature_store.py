@@ -0,0 +1,337 @@
+"""
+Feature Store País × Año
+========================
+
+Tabla país × año con los flujos de investigadores (inmigración, emigración,
+saldo neto y flujo total) y los indicadores WDI unidos as-of (último valor
+publicado hasta ese año). Se guarda como Parquet tipado indexado por
+(iso3, year) y se actualiza de forma incremental: solo se recalculan los
+años cuyos flujos cambian o aparecen, y las columnas de indicadores nuevos
+o modificados; si cambia el conjunto de países se reconstruye entera. Si
+no se puede escribir, compute_feature_table calcula la misma tabla en
+memoria. Las páginas leen las features por nombre.
+"""
+
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+from config.settings import FEATURES_DIR
+
+
+STORE_FILE = 'country_year.parquet'
+MANIFEST_FILE = 'country_year.json'
+
+# Cambiar si cambia el esquema de la tabla (fuerza una reconstrucción)
+SCHEMA_VERSION = 1
+
+# Features de flujos por país y año
+FLOW_FEATURES = ('immigration', 'emigration', 'net_balance', 'total_flow')
+
+# Antigüedad máxima (años) del valor WDI usado en la unión as-of
+ASOF_TOLERANCE = 5
+
+# Ventana de años "recientes" usada por las vistas de corte transversal
+RECENT_YEARS = (2014, 2016)
+
+
+def compute_flow_features(yearly: pd.DataFrame, years: Tuple[int, int]) -> pd.DataFrame:
+    """
+    Flujos por país y año en una rejilla densa (años sin flujos = 0).
+    
+    Args:
+        yearly: Recuentos por corredor y año con origin_iso3, destination_iso3,
+            year y n_researchers
+        years: Rango de años de la rejilla (inclusivo)
+    
+    Returns:
+        DataFrame con iso3, year y FLOW_FEATURES, ordenado por (iso3, year)
+    """
+    countries = pd.Index(
+        np.union1d(yearly['origin_iso3'].astype(str).unique(), yearly['destination_iso3'].astype(str).unique())
+    )
+    year_grid = np.arange(years[0], years[1] + 1)
+    
+    in_range = yearly['year'].between(*years).to_numpy()
+    year_idx = yearly['year'].to_numpy()[in_range] - years[0]
+    counts = yearly['n_researchers'].to_numpy(dtype=np.int64)[in_range]
+    
+    immigration = np.zeros((len(countries), len(year_grid)), dtype=np.int64)
+    emigration = np.zeros_like(immigration)
+    np.add.at(immigration, (countries.get_indexer(yearly['destination_iso3'].astype(str)[in_range]), year_idx), counts)
+    np.add.at(emigration, (countries.get_indexer(yearly['origin_iso3'].astype(str)[in_range]), year_idx), counts)
+    
+    return pd.DataFrame({
+        'iso3': np.repeat(countries.to_numpy(dtype=object), len(year_grid)),
+        'year': np.tile(year_grid, len(countries)).astype(np.int16),
+        'immigration': immigration.ravel().astype(np.int32),
+        'emigration': emigration.ravel().astype(np.int32),
+        'net_balance': (immigration - emigration).ravel().astype(np.int32),
+        'total_flow': (immigration + emigration).ravel().astype(np.int32)
+    })
+
+
+def feature_years(yearly: pd.DataFrame, wdi_panel: pd.DataFrame) -> Tuple[int, int]:
+    """Rejilla de años: desde el primer flujo hasta el último dato de flujos o WDI."""
+    year_min = int(yearly['year'].min())
+    year_max = max(int(yearly['year'].max()), int(wdi_panel['Year'].max()) if not wdi_panel.empty else 0)
+    return year_min, year_max
+
+
+def asof_join(keys: pd.DataFrame, series: pd.DataFrame, tolerance: int = ASOF_TOLERANCE) -> np.ndarray:
+    """
+    Valor de una serie WDI as-of (último año <= year) para cada fila de keys.
+    
+    Args:
+        keys: DataFrame con iso3 y year
+        series: Serie larga con iso3, Year y Value
+        tolerance: Antigüedad máxima del valor en años
+    
+    Returns:
+        Array float64 alineado con las filas de keys (NaN sin valor)
+    """
+    if series.empty or keys.empty:
+        return np.full(len(keys), np.nan)
+    
+    left = pd.DataFrame({
+        'row': np.arange(len(keys)),
+        'iso3': keys['iso3'].astype(str).to_numpy(),
+        'year': keys['year'].to_numpy(dtype=np.int64)
+    }).sort_values('year', kind='stable')
+    
+    right = pd.DataFrame({
+        'iso3': series['iso3'].astype(str).to_numpy(),
+        'year': series['Year'].to_numpy(dtype=np.int64),
+        'value': series['Value'].to_numpy(dtype=np.float64)
+    }).dropna(subset=['value']).sort_values('year', kind='stable')
+    
+    joined = pd.merge_asof(left, right, on='year', by='iso3', direction='backward', tolerance=tolerance)
+    
+    values = np.full(len(keys), np.nan)
+    values[joined['row'].to_numpy()] = joined['value'].to_numpy(dtype=np.float64)
+    return values
+
+
+def _digest(df: pd.DataFrame) -> str:
+    """Huella del contenido de un DataFrame (independiente del orden de filas)."""
+    if df.empty:
+        return '0'
+    return format(int(pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype=np.uint64)), 'x')
+
+
+def year_digests(flows: pd.DataFrame) -> Dict[str, str]:
+    """Huella de las features de flujos de cada año."""
+    hashes = pd.util.hash_pandas_object(flows.astype({'iso3': str}), index=False).to_numpy()
+    sums = pd.Series(hashes).groupby(flows['year'].to_numpy()).sum()
+    return {str(year): format(int(value) % 2 ** 64, 'x') for year, value in sums.items()}
+
+
+def load_store(store_dir: Optional[Path] = None) -> Tuple[Optional[pd.DataFrame], dict]:
+    """
+    Carga la tabla y el manifiesto del feature store.
+    
+    Args:
+        store_dir: Directorio del feature store (usa default si None)
+    
+    Returns:
+        Tupla (tabla o None, manifiesto); vacío si el esquema no coincide
+    """
+    store_dir = store_dir or FEATURES_DIR
+    store_path, manifest_path = store_dir / STORE_FILE, store_dir / MANIFEST_FILE
+    
+    if not (store_path.exists() and manifest_path.exists()):
+        return None, {}
+    
+    try:
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get('schema') != SCHEMA_VERSION:
+            return None, {}
+        return pd.read_parquet(store_path).reset_index(), manifest
+    except Exception:
+        # Store ilegible: se reconstruye
+        return None, {}
+
+
+def _atomic_write(path: Path, write) -> None:
+    """Escribe un fichero vía temporal + os.replace (lectores nunca ven medio fichero)."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(fd)
+    
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def update_feature_store(
+    yearly: pd.DataFrame,
+    wdi_panel: pd.DataFrame,
+    indicators: Dict[str, str],
+    store_dir: Optional[Path] = None
+) -> dict:
+    """
+    Actualiza el feature store con los flujos e indicadores actuales.
+    
+    Solo se recalculan las filas de los años nuevos o con flujos distintos
+    y las columnas de indicadores nuevos o con datos distintos; si no hay
+    cambios no se escribe nada. Si cambia el conjunto de países la tabla
+    se reconstruye entera.
+    
+    Args:
+        yearly: Recuentos por corredor y año (ver compute_flow_features)
+        wdi_panel: Panel WDI largo con iso3, IndicatorCode, Year y Value
+        indicators: Features WDI a mantener {nombre: código de serie}
+        store_dir: Directorio del feature store (usa default si None)
+    
+    Returns:
+        Manifiesto actualizado, con updated_years y updated_features de
+        esta actualización
+    """
+    store_dir = store_dir or FEATURES_DIR
+    store_dir.mkdir(parents=True, exist_ok=True)
+    table, manifest = load_store(store_dir)
+    
+    flows = compute_flow_features(yearly, feature_years(yearly, wdi_panel))
+    countries = _digest(flows[['iso3']].drop_duplicates())
+    
+    # Otro conjunto de países: los años sin cambios ya no tendrían la
+    # rejilla densa, así que se reconstruye la tabla entera
+    if table is not None and manifest.get('countries') != countries:
+        table = None
+    
+    stored_years = manifest.get('years', {}) if table is not None else {}
+    new_years = year_digests(flows)
+    changed_years = {year for year, digest in new_years.items() if stored_years.get(year) != digest}
+    removed_years = set(stored_years) - set(new_years)
+    
+    # Indicadores a mantener: los ya guardados y los pedidos
+    features = {name: spec['code'] for name, spec in manifest.get('features', {}).items()}
+    features.update(indicators)
+    
+    series = {name: wdi_panel[wdi_panel['IndicatorCode'] == code] for name, code in features.items()}
+    digests = {name: _digest(frame[['iso3', 'Year', 'Value']]) for name, frame in series.items()}
+    
+    stored_features = manifest.get('features', {})
+    stale_features = [
+        name for name, code in features.items()
+        if table is None or stored_features.get(name) != {'code': code, 'digest': digests[name]}
+    ]
+    
+    if table is not None and not changed_years and not removed_years and not stale_features:
+        return {**manifest, 'updated_years': [], 'updated_features': []}
+    
+    # Filas: años sin cambios del store + años nuevos o modificados
+    fresh = flows[flows['year'].astype(str).isin(changed_years)].reset_index(drop=True)
+    for name in features:
+        if name not in stale_features:
+            fresh[name] = asof_join(fresh, series[name])
+    
+    if table is not None:
+        keep = ~table['year'].astype(str).isin(changed_years | removed_years)
+        table = pd.concat([table[keep], fresh], ignore_index=True)
+    else:
+        table = fresh
+    
+    # Columnas: indicadores nuevos o con datos distintos, para todas las filas
+    for name in stale_features:
+        table[name] = asof_join(table, series[name])
+    
+    table = _typed_table(table, features)
+    
+    manifest = {
+        'schema': SCHEMA_VERSION,
+        'countries': countries,
+        'years': new_years,
+        'features': {name: {'code': code, 'digest': digests[name]} for name, code in features.items()}
+    }
+    
+    _atomic_write(store_dir / STORE_FILE, lambda path: table.to_parquet(
+        path, engine='pyarrow', compression='snappy', index=True
+    ))
+    _atomic_write(store_dir / MANIFEST_FILE, lambda path: Path(path).write_text(json.dumps(manifest, indent=1)))
+    
+    return {**manifest, 'updated_years': sorted(changed_years), 'updated_features': stale_features}
+
+
+def _typed_table(table: pd.DataFrame, features: Sequence[str]) -> pd.DataFrame:
+    """Tipos compactos e índice (iso3, year) de la tabla del feature store."""
+    table = table.astype({
+        'iso3': 'category', 'year': 'int16',
+        **{column: 'int32' for column in FLOW_FEATURES},
+        **{name: 'float64' for name in features}
+    })
+    return table.set_index(['iso3', 'year']).sort_index()
+
+
+def compute_feature_table(
+    yearly: pd.DataFrame,
+    wdi_panel: pd.DataFrame,
+    indicators: Dict[str, str]
+) -> pd.DataFrame:
+    """
+    Tabla completa del feature store calculada en memoria, sin escribirla.
+    
+    Args:
+        yearly: Recuentos por corredor y año (ver compute_flow_features)
+        wdi_panel: Panel WDI largo con iso3, IndicatorCode, Year y Value
+        indicators: Features WDI {nombre: código de serie}
+    
+    Returns:
+        DataFrame indexado por (iso3, year), como el guardado en disco
+    """
+    table = compute_flow_features(yearly, feature_years(yearly, wdi_panel))
+    for name, code in indicators.items():
+        table[name] = asof_join(table, wdi_panel[wdi_panel['IndicatorCode'] == code])
+    
+    return _typed_table(table, indicators)
+
+
+def select_features(
+    table: pd.DataFrame,
+    features: Sequence[str],
+    years: Optional[Tuple[int, int]] = None
+) -> pd.DataFrame:
+    """
+    Features por nombre de una tabla en memoria (mismo resultado que read_features).
+    
+    Args:
+        table: Tabla de compute_feature_table
+        features: Nombres de features (FLOW_FEATURES o claves de WDI_FEATURES)
+        years: Rango de años (inclusivo); todos si None
+    
+    Returns:
+        DataFrame con iso3, year y las features pedidas
+    """
+    if years:
+        table = table[table.index.get_level_values('year').to_series().between(*years).to_numpy()]
+    return table[list(features)].reset_index()
+
+
+def read_features(
+    features: Sequence[str],
+    years: Optional[Tuple[int, int]] = None,
+    store_dir: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Lee features por nombre (solo esas columnas) del feature store.
+    
+    Args:
+        features: Nombres de features (FLOW_FEATURES o claves de WDI_FEATURES)
+        years: Rango de años (inclusivo); todos si None
+        store_dir: Directorio del feature store (usa default si None)
+    
+    Returns:
+        DataFrame con iso3, year y las features pedidas
+    """
+    store_path = (store_dir or FEATURES_DIR) / STORE_FILE
+    filters = [('year', '>=', years[0]), ('year', '<=', years[1])] if years else None
+    
+    df = pd.read_parquet(store_path, engine='pyarrow', columns=list(features), filters=filters)
+    return df.reset_index()
@@ -0,0 +1,105 @@
+"""
+Caché de Figuras Plotly
+=======================
+
+Cachea la especificación JSON de cada figura por (identificador del gráfico,
+clave de filtros/parámetros, versión del dataset), de modo que una vista
+repetida no vuelve a construir ni validar la figura con Plotly Express.
+"""
+
+import json
+import streamlit as st
+import plotly.io as pio
+import plotly.graph_objects as go
+from typing import Callable, Optional
+
+from components.data_loader import get_dataset_version
+from config.settings import PLOTLY_CONFIG
+
+# orjson es opcional: si no está instalado se usa el módulo json estándar
+try:
+    import orjson
+    JSON_ENGINE = 'orjson'
+except ImportError:
+    orjson = None
+    JSON_ENGINE = 'json'
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _get_figure_json(chart_id: str, key: tuple, version: tuple, _builder: Callable[[], go.Figure]) -> str:
+    """
+    Construye la figura (solo en caso de fallo de caché) y la serializa a JSON.
+    
+    Args:
+        chart_id: Identificador único del gráfico
+        key: Clave hashable con los filtros/parámetros de los que depende
+        version: Versión del dataset (ver get_dataset_version)
+        _builder: Función sin argumentos que construye la figura (no se hashea)
+    
+    Returns:
+        Especificación de la figura serializada como JSON
+    """
+    return pio.to_json(_builder(), validate=False, engine=JSON_ENGINE)
+
+
+def figure_from_json(figure_json: str) -> go.Figure:
+    """
+    Reconstruye una figura a partir de su JSON sin re-validar la especificación.
+    
+    Args:
+        figure_json: Especificación serializada por _get_figure_json
+    
+    Returns:
+        Figura Plotly lista para st.plotly_chart
+    """
+    spec = orjson.loads(figure_json) if orjson is not None else json.loads(figure_json)
+    return figure_from_spec(spec)
+
+
+def figure_from_spec(spec: dict) -> go.Figure:
+    """Envuelve una especificación ya válida en un Figure sin validarla."""
+    return go.Figure(spec, _validate=False)
+
+
+def get_cached_figure(chart_id: str, key: tuple, builder: Callable[[], go.Figure]) -> go.Figure:
+    """
+    Devuelve la figura desde la caché, construyéndola solo si no existe.
+    
+    Args:
+        chart_id: Identificador único del gráfico
+        key: Clave hashable con los filtros/parámetros de los que depende
+        builder: Función sin argumentos que construye la figura
+    
+    Returns:
+        Figura Plotly (sin validar de nuevo)
+    """
+    return figure_from_json(_get_figure_json(chart_id, key, get_dataset_version(), builder))
+
+
+def render_cached_chart(
+    chart_id: str,
+    key: tuple,
+    builder: Callable[[], go.Figure],
+    config: Optional[dict] = None,
+    **kwargs
+):
+    """
+    Sustituto de st.plotly_chart con caché de la especificación de la figura.
+    
+    Uso:
+        render_cached_chart('eda_corridors', (signature, top_n), lambda: build_fig(df))
+    
+    La clave debe incluir todo aquello de lo que depende la figura además
+    del dataset (firma de filtros, top N, controles de la página...).
+    
+    Args:
+        chart_id: Identificador único del gráfico
+        key: Clave hashable con los filtros/parámetros de los que depende
+        builder: Función sin argumentos que construye la figura
+        config: Configuración de Plotly (por defecto PLOTLY_CONFIG)
+        **kwargs: Argumentos adicionales para st.plotly_chart
+    """
+    fig = get_cached_figure(chart_id, key, builder)
+    
+    kwargs.setdefault('use_container_width', True)
+    st.plotly_chart(fig, config=config or PLOTLY_CONFIG, **kwargs)
@@ -0,0 +1,297 @@
+"""
+Mapa de Corredores (Arcos de Círculo Máximo)
+============================================
+
+Dibuja los corredores migratorios como arcos de círculo máximo entre los
+centroides de los países. Todos los arcos se interpolan a la vez con NumPy
+y se empaquetan en unas pocas trazas separadas por NaN (una por clase de
+grosor), en lugar de una traza por corredor.
+"""
+
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from typing import Dict, Tuple
+
+from components.figure_cache import figure_from_spec
+from config.settings import THEME_COLORS
+
+
+# Puntos interpolados por arco
+ARC_POINTS = 32
+
+# Grosor de línea por clase de volumen (cuantiles del top mostrado)
+WIDTH_CLASSES = (1.0, 2.0, 3.5, 5.5)
+
+LINE_COLOR = 'rgba(46, 134, 171, 0.6)'
+
+# Duración de cada fotograma de la animación (ms)
+FRAME_DURATION = 500
+
+
+def great_circle_arcs(
+    lat1: np.ndarray,
+    lon1: np.ndarray,
+    lat2: np.ndarray,
+    lon2: np.ndarray,
+    n_points: int = ARC_POINTS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpola arcos de círculo máximo entre pares de puntos (vectorizado).
+    
+    Interpolación esférica (slerp) entre los vectores unitarios de ambos
+    extremos, para todos los arcos a la vez.
+    
+    Args:
+        lat1, lon1: Coordenadas de origen en grados (n,)
+        lat2, lon2: Coordenadas de destino en grados (n,)
+        n_points: Puntos por arco (incluidos los extremos)
+    
+    Returns:
+        Tupla (lat, lon) de arrays (n, n_points) en grados
+    """
+    phi1, lam1 = np.radians(lat1)[:, None], np.radians(lon1)[:, None]
+    phi2, lam2 = np.radians(lat2)[:, None], np.radians(lon2)[:, None]
+    
+    # Vectores unitarios (n, 1, 3)
+    p1 = np.stack([np.cos(phi1) * np.cos(lam1), np.cos(phi1) * np.sin(lam1), np.sin(phi1)], axis=-1)
+    p2 = np.stack([np.cos(phi2) * np.cos(lam2), np.cos(phi2) * np.sin(lam2), np.sin(phi2)], axis=-1)
+    
+    omega = np.arccos(np.clip(np.sum(p1 * p2, axis=-1, keepdims=True), -1.0, 1.0))
+    sin_omega = np.sin(omega)
+    t = np.linspace(0.0, 1.0, n_points)[None, :, None]
+    
+    # Extremos (casi) coincidentes: interpolación lineal para evitar dividir por 0
+    degenerate = sin_omega < 1e-9
+    safe_sin = np.where(degenerate, 1.0, sin_omega)
+    w1 = np.where(degenerate, 1.0 - t, np.sin((1.0 - t) * omega) / safe_sin)
+    w2 = np.where(degenerate, t, np.sin(t * omega) / safe_sin)
+    
+    points = w1 * p1 + w2 * p2
+    
+    lat = np.degrees(np.arctan2(points[..., 2], np.hypot(points[..., 0], points[..., 1])))
+    lon = np.degrees(np.arctan2(points[..., 1], points[..., 0]))
+    return lat, lon
+
+
+def pack_arcs(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatena arcos (n, k) en una sola polilínea separada por NaN.
+    
+    Args:
+        lat: Latitudes de los arcos (n, k)
+        lon: Longitudes de los arcos (n, k)
+    
+    Returns:
+        Tupla (lat, lon) de arrays 1D de longitud n * (k + 1)
+    """
+    separator = np.full((lat.shape[0], 1), np.nan)
+    return (
+        np.hstack([lat, separator]).ravel(),
+        np.hstack([lon, separator]).ravel()
+    )
+
+
+def compute_corridor_arcs(corridors: pd.DataFrame, centroids: pd.DataFrame,
+                          n_points: int = ARC_POINTS) -> Dict[str, np.ndarray]:
+    """
+    Arcos de los corredores con centroides conocidos.
+    
+    Args:
+        corridors: DataFrame con origin_iso3 y destination_iso3
+        centroids: Tabla de centroides (lat, lon) indexada por iso3
+        n_points: Puntos por arco
+    
+    Returns:
+        Diccionario con lat/lon (n, n_points), mask (corredores dibujados)
+        sobre las filas de corridors
+    """
+    origin = centroids.reindex(corridors['origin_iso3'].astype(str))
+    destination = centroids.reindex(corridors['destination_iso3'].astype(str))
+    
+    mask = origin['lat'].notna().to_numpy() & destination['lat'].notna().to_numpy()
+    
+    lat, lon = great_circle_arcs(
+        origin['lat'].to_numpy(dtype=np.float64)[mask],
+        origin['lon'].to_numpy(dtype=np.float64)[mask],
+        destination['lat'].to_numpy(dtype=np.float64)[mask],
+        destination['lon'].to_numpy(dtype=np.float64)[mask],
+        n_points
+    )
+    
+    return {'lat': lat, 'lon': lon, 'mask': mask}
+
+
+def _arc_traces(lat: np.ndarray, lon: np.ndarray, values: np.ndarray, labels: np.ndarray,
+                width_classes: Tuple[float, ...] = WIDTH_CLASSES) -> list:
+    """Trazas de líneas (una por clase de grosor) y de puntos medios con hover."""
+    traces = []
+    
+    if len(values):
+        edges = np.quantile(values, np.linspace(0, 1, len(width_classes) + 1)[1:-1])
+        classes = np.searchsorted(edges, values, side='right')
+    else:
+        classes = np.zeros(0, dtype=np.int64)
+    
+    for cls, width in enumerate(width_classes):
+        selected = classes == cls
+        packed_lat, packed_lon = pack_arcs(lat[selected], lon[selected])
+        traces.append({
+            'type': 'scattergeo',
+            'mode': 'lines',
+            'lat': packed_lat.tolist(),
+            'lon': packed_lon.tolist(),
+            'line': {'width': width, 'color': LINE_COLOR},
+            'hoverinfo': 'skip',
+            'showlegend': False
+        })
+    
+    # Puntos medios de cada arco: hover por corredor sin trazas adicionales
+    middle = lat.shape[1] // 2 if lat.size else 0
+    traces.append({
+        'type': 'scattergeo',
+        'mode': 'markers',
+        'lat': lat[:, middle].tolist() if lat.size else [],
+        'lon': lon[:, middle].tolist() if lon.size else [],
+        'marker': {'size': 4, 'color': THEME_COLORS['accent']},
+        'customdata': np.column_stack([labels, values]).tolist() if len(values) else [],
+        'hovertemplate': '<b>%{customdata[0]}</b><br>Investigadores: %{customdata[1]:,}<extra></extra>',
+        'showlegend': False
+    })
+    
+    return traces
+
+
+def _flow_map_layout(title: str) -> dict:
+    """Layout común de los mapas de corredores."""
+    return {
+        'title': {'text': title},
+        'height': 600,
+        'template': 'plotly_dark',
+        'paper_bgcolor': 'rgba(0,0,0,0)',
+        'plot_bgcolor': 'rgba(0,0,0,0)',
+        'margin': {'l': 0, 'r': 0, 't': 40, 'b': 0},
+        'geo': {
+            'projection': {'type': 'natural earth'},
+            'showland': True,
+            'landcolor': 'rgba(255,255,255,0.05)',
+            'showcountries': True,
+            'countrycolor': 'rgba(255,255,255,0.1)',
+            'bgcolor': 'rgba(0,0,0,0)'
+        }
+    }
+
+
+def create_flow_map(corridors: pd.DataFrame, centroids: pd.DataFrame) -> go.Figure:
+    """
+    Mapa de corredores (p. ej. salida de DataLoader.get_top_corridors).
+    
+    Args:
+        corridors: DataFrame con origin_iso3, destination_iso3, route y n_researchers
+        centroids: Tabla de centroides (lat, lon) indexada por iso3
+    
+    Returns:
+        Figura Plotly con los arcos agrupados por clase de grosor
+    """
+    arcs = compute_corridor_arcs(corridors, centroids)
+    mask = arcs['mask']
+    
+    traces = _arc_traces(
+        arcs['lat'], arcs['lon'],
+        corridors['n_researchers'].to_numpy(dtype=np.float64)[mask],
+        corridors['route'].to_numpy(dtype=object)[mask]
+    )
+    
+    return figure_from_spec({
+        'data': traces,
+        'layout': _flow_map_layout(f'Mapa de los {int(mask.sum())} Corredores Principales')
+    })
+
+
+def create_animated_flow_map(yearly: pd.DataFrame, centroids: pd.DataFrame, top_n: int = 50) -> go.Figure:
+    """
+    Mapa de corredores animado por año (top N corredores de cada año).
+    
+    Los arcos de todos los corredores se interpolan una sola vez; cada
+    fotograma selecciona filas de esos arrays.
+    
+    Args:
+        yearly: Recuentos por corredor y año con origin_iso3, destination_iso3,
+            route, year y n_researchers
+        centroids: Tabla de centroides (lat, lon) indexada por iso3
+        top_n: Corredores por fotograma
+    
+    Returns:
+        Figura Plotly con fotogramas, botón de reproducción y slider
+    """
+    corridors = yearly[['origin_iso3', 'destination_iso3', 'route']].drop_duplicates().reset_index(drop=True)
+    arcs = compute_corridor_arcs(corridors, centroids)
+    
+    # Posición de cada corredor dibujable dentro de los arrays de arcos
+    arc_position = np.full(len(corridors), -1, dtype=np.int64)
+    arc_position[arcs['mask']] = np.arange(arcs['mask'].sum())
+    
+    corridor_idx = pd.MultiIndex.from_frame(corridors[['origin_iso3', 'destination_iso3']]).get_indexer(
+        pd.MultiIndex.from_frame(yearly[['origin_iso3', 'destination_iso3']])
+    )
+    yearly = yearly.assign(arc=arc_position[corridor_idx])
+    yearly = yearly[yearly['arc'] >= 0]
+    
+    # Top N por año: una ordenación global y head por grupo
+    yearly = yearly.sort_values(['year', 'n_researchers'], ascending=[True, False])
+    yearly = yearly.groupby('year', sort=True).head(top_n)
+    
+    frames = []
+    for year, group in yearly.groupby('year', sort=True):
+        rows = group['arc'].to_numpy()
+        frames.append({
+            'name': str(year),
+            'data': _arc_traces(
+                arcs['lat'][rows], arcs['lon'][rows],
+                group['n_researchers'].to_numpy(dtype=np.float64),
+                group['route'].to_numpy(dtype=object)
+            )
+        })
+    
+    layout = _flow_map_layout(f'Top {top_n} Corredores por Año')
+    years = [frame['name'] for frame in frames]
+    layout['updatemenus'] = [{
+        'type': 'buttons',
+        'showactive': False,
+        'x': 0.05, 'y': 0.05,
+        'buttons': [
+            {
+                'label': '▶',
+                'method': 'animate',
+                'args': [None, {
+                    'frame': {'duration': FRAME_DURATION, 'redraw': True},
+                    'transition': {'duration': 0},
+                    'fromcurrent': True
+                }]
+            },
+            {
+                'label': '⏸',
+                'method': 'animate',
+                'args': [[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}]
+            }
+        ]
+    }]
+    layout['sliders'] = [{
+        'active': 0,
+        'x': 0.15, 'len': 0.8, 'y': 0.05,
+        'currentvalue': {'prefix': 'Año: '},
+        'steps': [
+            {
+                'label': year,
+                'method': 'animate',
+                'args': [[year], {'frame': {'duration': 0, 'redraw': True}, 'mode': 'immediate'}]
+            }
+            for year in years
+        ]
+    }]
+    
+    data = frames[0]['data'] if frames else _arc_traces(
+        np.empty((0, ARC_POINTS)), np.empty((0, ARC_POINTS)), np.empty(0), np.empty(0, dtype=object)
+    )
+    
+    return figure_from_spec({'data': data, 'layout': layout, 'frames': frames})
@@ -0,0 +1,285 @@
+"""
+Pronóstico de Corredores en Lote
+================================
+
+Construye la matriz corredor × año de investigadores y ajusta a la vez,
+para todos los corredores, tres modelos sencillos y robustos: suavizado
+exponencial simple, tendencia amortiguada (Holt) y tendencia log-lineal.
+Las recursiones recorren los años (decenas) y operan sobre todos los
+corredores y valores de los parámetros en una sola operación de arrays;
+ningún bucle recorre corredores. Cada corredor usa el modelo con menor
+error en los últimos años reservados, y los pronósticos se persisten como
+artefacto que la página de ML recorta por origen, destino y modelo.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+from components.data_loader import DataLoader
+from components.model_store import get_or_fit
+
+
+FORECAST_MODELS = {
+    'ses': 'Suavizado exponencial',
+    'damped': 'Tendencia amortiguada',
+    'loglinear': 'Tendencia log-lineal'
+}
+
+# Años de historia usados en el ajuste y último año pronosticado
+HISTORY_YEARS = 25
+FORECAST_YEAR_MAX = 2030
+
+# Últimos años reservados para elegir el modelo de cada corredor
+VALIDATION_YEARS = 3
+
+# Rejillas de parámetros (se evalúan todas a la vez)
+ALPHA_GRID = np.linspace(0.1, 0.9, 9)
+BETA_GRID = np.array([0.05, 0.1, 0.2, 0.3])
+DAMPING = 0.9
+
+# Años con flujo mínimos para que un corredor tenga una serie informativa
+MIN_ACTIVE_YEARS = 3
+
+# Fracción mínima de corredores informativos para mostrar pronósticos
+MIN_INFORMATIVE_SHARE = 0.5
+
+
+def build_corridor_matrix(yearly: pd.DataFrame, history: int = HISTORY_YEARS) -> Dict[str, np.ndarray]:
+    """
+    Matriz densa corredor × año con los últimos años de historia.
+    
+    Args:
+        yearly: Recuentos con origin, destination, year y n_researchers
+        history: Número de años (hasta el último año con datos)
+    
+    Returns:
+        Diccionario con origin y destination (N,), years (T,) y Y (N × T)
+    """
+    year_max = int(yearly['year'].max())
+    years = np.arange(year_max - history + 1, year_max + 1)
+    
+    corridors = pd.MultiIndex.from_arrays(
+        [yearly['origin'].astype(str), yearly['destination'].astype(str)]
+    )
+    codes, uniques = corridors.factorize()
+    
+    Y = np.zeros((len(uniques), len(years)))
+    in_range = yearly['year'].between(years[0], years[-1]).to_numpy()
+    np.add.at(
+        Y,
+        (codes[in_range], yearly['year'].to_numpy()[in_range] - years[0]),
+        yearly['n_researchers'].to_numpy(dtype=np.float64)[in_range]
+    )
+    
+    return {
+        'origin': uniques.get_level_values(0).to_numpy(dtype=object),
+        'destination': uniques.get_level_values(1).to_numpy(dtype=object),
+        'years': years,
+        'Y': Y
+    }
+
+
+def forecast_ses(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Suavizado exponencial simple con el alfa de menor error a un paso por corredor.
+    
+    Args:
+        Y: Matriz N × T
+        horizon: Años a pronosticar
+    
+    Returns:
+        Pronósticos N × horizon (nivel final constante)
+    """
+    alphas = ALPHA_GRID[:, None]
+    level = np.broadcast_to(Y[:, 0], (len(ALPHA_GRID), Y.shape[0])).copy()
+    sse = np.zeros_like(level)
+    
+    for t in range(1, Y.shape[1]):
+        error = Y[:, t] - level
+        sse += error ** 2
+        level += alphas * error
+    
+    best = np.argmin(sse, axis=0)
+    final = level[best, np.arange(Y.shape[0])]
+    
+    return np.repeat(final[:, None], horizon, axis=1)
+
+
+def forecast_damped(Y: np.ndarray, horizon: int, phi: float = DAMPING) -> np.ndarray:
+    """
+    Tendencia amortiguada de Holt con el (alfa, beta) de menor error por corredor.
+    
+    Args:
+        Y: Matriz N × T (T >= 2)
+        horizon: Años a pronosticar
+        phi: Factor de amortiguación de la tendencia
+    
+    Returns:
+        Pronósticos N × horizon
+    """
+    alpha, beta = (grid.ravel()[:, None] for grid in np.meshgrid(ALPHA_GRID, BETA_GRID))
+    shape = (alpha.shape[0], Y.shape[0])
+    
+    level = np.broadcast_to(Y[:, 0], shape).copy()
+    trend = np.broadcast_to(Y[:, 1] - Y[:, 0], shape).copy()
+    sse = np.zeros(shape)
+    
+    for t in range(1, Y.shape[1]):
+        predicted = level + phi * trend
+        error = Y[:, t] - predicted
+        sse += error ** 2
+        level = predicted + alpha * error
+        trend = phi * trend + alpha * beta * error
+    
+    best = np.argmin(sse, axis=0)
+    rows = np.arange(Y.shape[0])
+    
+    # Suma de la tendencia amortiguada: φ + φ² + ... + φ^h
+    damping = np.cumsum(phi ** np.arange(1, horizon + 1))
+    
+    return level[best, rows][:, None] + trend[best, rows][:, None] * damping[None, :]
+
+
+def forecast_loglinear(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Tendencia lineal de log(1 + y) por mínimos cuadrados, en forma cerrada.
+    
+    Args:
+        Y: Matriz N × T
+        horizon: Años a pronosticar
+    
+    Returns:
+        Pronósticos N × horizon
+    """
+    t = np.arange(Y.shape[1], dtype=np.float64)
+    t_centered = t - t.mean()
+    Z = np.log1p(Y)
+    
+    slope = (Z - Z.mean(axis=1, keepdims=True)) @ t_centered / (t_centered @ t_centered)
+    intercept = Z.mean(axis=1) - slope * t.mean()
+    
+    t_future = np.arange(Y.shape[1], Y.shape[1] + horizon, dtype=np.float64)
+    
+    return np.expm1(intercept[:, None] + slope[:, None] * t_future[None, :])
+
+
+def forecast_all(Y: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Pronósticos de todos los modelos, no negativos.
+    
+    Returns:
+        Array M × N × horizon en el orden de FORECAST_MODELS
+    """
+    forecasts = np.stack([forecast_ses(Y, horizon), forecast_damped(Y, horizon), forecast_loglinear(Y, horizon)])
+    return np.clip(forecasts, 0.0, None)
+
+
+def fit_forecasts(Y: np.ndarray, horizon: int, validation: int = VALIDATION_YEARS) -> Dict[str, np.ndarray]:
+    """
+    Elige el modelo de cada corredor en los últimos años y pronostica con todos.
+    
+    Args:
+        Y: Matriz N × T
+        horizon: Años a pronosticar
+        validation: Años finales reservados para comparar modelos
+    
+    Returns:
+        Diccionario con forecasts (M × N × horizon), validation_mae (M × N)
+        y best (índice del modelo elegido por corredor; 0 = suavizado exponencial)
+    """
+    n_models = len(FORECAST_MODELS)
+    
+    if Y.shape[1] > validation + 2:
+        holdout = forecast_all(Y[:, :-validation], validation)
+        mae = np.abs(holdout - Y[None, :, -validation:]).mean(axis=2)
+        best = np.argmin(mae, axis=0)
+    else:
+        mae = np.full((n_models, Y.shape[0]), np.nan)
+        best = np.zeros(Y.shape[0], dtype=np.int64)
+    
+    return {
+        'forecasts': forecast_all(Y, horizon).astype(np.float32),
+        'validation_mae': mae.astype(np.float32),
+        'best': best.astype(np.int8)
+    }
+
+
+@st.cache_data(ttl=3600, show_spinner="Ajustando pronósticos de corredores...")
+def get_corridor_forecasts(_data_loader: DataLoader, version: tuple,
+                           year_column: str = 'origin_year') -> Dict[str, np.ndarray]:
+    """
+    Pronósticos de todos los corredores hasta FORECAST_YEAR_MAX.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        version: Versión del dataset (ver get_dataset_version)
+        year_column: Columna de año de las series (ver load_yearly_corridors)
+    
+    Returns:
+        Diccionario con origin, destination, years, history (N × T),
+        horizon_years, forecasts (M × N × H), validation_mae, best y
+        active_years (años con flujo de cada corredor); vacío si no hay datos
+    """
+    yearly = _data_loader.load_yearly_corridors(year_column)
+    
+    if yearly.empty:
+        return {}
+    
+    matrix = build_corridor_matrix(yearly)
+    horizon_years = np.arange(matrix['years'][-1] + 1, FORECAST_YEAR_MAX + 1)
+    
+    if horizon_years.size == 0:
+        return {}
+    
+    params = {
+        'history': HISTORY_YEARS, 'horizon': int(horizon_years.size), 'validation': VALIDATION_YEARS,
+        'alpha': ALPHA_GRID.tolist(), 'beta': BETA_GRID.tolist(), 'damping': DAMPING
+    }
+    fit = get_or_fit('forecast', matrix['Y'], params,
+                     lambda: fit_forecasts(matrix['Y'], int(horizon_years.size)))
+    
+    return {
+        'origin': matrix['origin'],
+        'destination': matrix['destination'],
+        'years': matrix['years'],
+        'history': matrix['Y'],
+        'horizon_years': horizon_years,
+        'forecasts': np.asarray(fit['forecasts']),
+        'validation_mae': np.asarray(fit['validation_mae']),
+        'best': np.asarray(fit['best']),
+        'active_years': (matrix['Y'] > 0).sum(axis=1)
+    }
+
+
+def slice_forecasts(result: Dict[str, np.ndarray], origin: Optional[str] = None,
+                    destination: Optional[str] = None, model: Optional[str] = None) -> pd.DataFrame:
+    """
+    Serie histórica y pronóstico agregados sobre los corredores seleccionados.
+    
+    Args:
+        result: Resultado de get_corridor_forecasts
+        origin: País de origen (todos si None)
+        destination: País de destino (todos si None)
+        model: Clave de FORECAST_MODELS (el mejor de cada corredor si None)
+    
+    Returns:
+        DataFrame con year, n_researchers y kind ('Histórico' o 'Pronóstico')
+    """
+    mask = np.ones(len(result['origin']), dtype=bool)
+    if origin is not None:
+        mask &= result['origin'] == origin
+    if destination is not None:
+        mask &= result['destination'] == destination
+    
+    if model is None:
+        forecasts = result['forecasts'][result['best'], np.arange(mask.size)]
+    else:
+        forecasts = result['forecasts'][list(FORECAST_MODELS).index(model)]
+    
+    return pd.DataFrame({
+        'year': np.concatenate([result['years'], result['horizon_years']]),
+        'n_researchers': np.concatenate([result['history'][mask].sum(axis=0), forecasts[mask].sum(axis=0)]),
+        'kind': ['Histórico'] * len(result['years']) + ['Pronóstico'] * len(result['horizon_years'])
+    })
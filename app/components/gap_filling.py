@@ -0,0 +1,189 @@
+"""
+Relleno de Huecos WDI
+=====================
+
+Completa los valores país × año que faltan en las series WDI sobre el cubo
+(serie × país × año) completo, sin bucles por país: interpolación lineal
+en huecos interiores, arrastre del último valor hacia delante y mediana
+regional para lo que quede. Cada valor lleva un código de procedencia.
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+# Códigos de procedencia (columna source)
+OBSERVED = 0
+INTERPOLATED = 1
+CARRIED_FORWARD = 2
+REGION_MEDIAN = 3
+
+FILL_SOURCES = {
+    OBSERVED: 'Observado',
+    INTERPOLATED: 'Interpolado',
+    CARRIED_FORWARD: 'Arrastrado',
+    REGION_MEDIAN: 'Mediana regional'
+}
+
+# Hueco interior máximo (años) que se interpola
+INTERPOLATION_MAX_GAP = 10
+
+# Años máximos que se arrastra el último valor observado
+CARRY_FORWARD_LIMIT = 5
+
+# Países observados mínimos de la región para usar su mediana
+REGION_MIN_COUNTRIES = 3
+
+
+def panel_to_cube(panel: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Pasa el panel largo a un cubo denso (serie, país, año).
+    
+    Args:
+        panel: Panel WDI largo con iso3, IndicatorCode, Year y Value
+    
+    Returns:
+        Diccionario con codes (F,), iso3 (C,), years (Y,) y values (F, C, Y)
+    """
+    codes = pd.Categorical(panel['IndicatorCode'].astype(str))
+    iso3 = pd.Categorical(panel['iso3'].astype(str))
+    years = np.arange(int(panel['Year'].min()), int(panel['Year'].max()) + 1)
+    
+    values = np.full((len(codes.categories), len(iso3.categories), len(years)), np.nan)
+    values[codes.codes, iso3.codes, panel['Year'].to_numpy(dtype=np.int64) - years[0]] = (
+        panel['Value'].to_numpy(dtype=np.float64)
+    )
+    
+    return {
+        'codes': codes.categories.to_numpy(dtype=object),
+        'iso3': iso3.categories.to_numpy(dtype=object),
+        'years': years,
+        'values': values
+    }
+
+
+def fill_time_gaps(
+    values: np.ndarray,
+    max_gap: int = INTERPOLATION_MAX_GAP,
+    carry_limit: int = CARRY_FORWARD_LIMIT
+) -> Dict[str, np.ndarray]:
+    """
+    Interpolación lineal y arrastre hacia delante a lo largo del eje de años.
+    
+    Para cada celda se localizan el último y el siguiente año observados de
+    su serie con acumulados máximo/mínimo sobre índices, de modo que todo
+    el cubo se rellena con operaciones de arrays.
+    
+    Args:
+        values: Cubo (..., Y) con NaN en los huecos
+        max_gap: Hueco interior máximo (años consecutivos) que se interpola
+        carry_limit: Años máximos de arrastre tras el último valor
+    
+    Returns:
+        Diccionario con values rellenados y source (int8, -1 = sin valor)
+    """
+    shape = values.shape
+    X = values.reshape(-1, shape[-1])
+    n_years = shape[-1]
+    
+    observed = np.isfinite(X)
+    year_idx = np.arange(n_years)
+    
+    prev_idx = np.maximum.accumulate(np.where(observed, year_idx, -1), axis=1)
+    next_idx = np.minimum.accumulate(np.where(observed, year_idx, n_years)[:, ::-1], axis=1)[:, ::-1]
+    
+    rows = np.arange(X.shape[0])[:, None]
+    prev_val = X[rows, np.clip(prev_idx, 0, None)]
+    next_val = X[rows, np.clip(next_idx, None, n_years - 1)]
+    
+    interior = ~observed & (prev_idx >= 0) & (next_idx < n_years) & (next_idx - prev_idx - 1 <= max_gap)
+    carried = ~observed & ~interior & (prev_idx >= 0) & (year_idx - prev_idx <= carry_limit)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = (year_idx - prev_idx) / (next_idx - prev_idx)
+    interpolated = prev_val + weight * (next_val - prev_val)
+    
+    filled = np.where(interior, interpolated, np.where(carried, prev_val, X))
+    source = np.select([observed, interior, carried], [OBSERVED, INTERPOLATED, CARRIED_FORWARD], -1)
+    
+    return {'values': filled.reshape(shape), 'source': source.astype(np.int8).reshape(shape)}
+
+
+def region_medians(values: np.ndarray, region_idx: np.ndarray, n_regions: int,
+                   min_countries: int = REGION_MIN_COUNTRIES) -> np.ndarray:
+    """
+    Mediana por región, serie y año de los valores de un cubo (F, C, Y).
+    
+    Args:
+        values: Cubo (F, C, Y)
+        region_idx: Región de cada país (C,), -1 si no tiene
+        n_regions: Número de regiones
+        min_countries: Países con dato mínimos (si no, NaN)
+    
+    Returns:
+        Array (F, R, Y) de medianas
+    """
+    medians = np.full((values.shape[0], n_regions, values.shape[2]), np.nan)
+    
+    for region in range(n_regions):
+        members = values[:, region_idx == region, :]
+        enough = np.isfinite(members).sum(axis=1) >= min_countries
+        if enough.any():
+            with warnings.catch_warnings():
+                # Serie-año sin ningún dato en la región: NaN esperado
+                warnings.simplefilter('ignore', RuntimeWarning)
+                medians[:, region, :] = np.where(enough, np.nanmedian(members, axis=1), np.nan)
+    
+    return medians
+
+
+def fill_gaps(panel: pd.DataFrame, regions: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Rellena los huecos del panel WDI y registra la procedencia de cada valor.
+    
+    Orden de estrategias: valor observado, interpolación lineal (huecos
+    interiores), arrastre hacia delante y mediana de la región (calculada
+    solo con valores observados).
+    
+    Args:
+        panel: Panel WDI largo con iso3, IndicatorCode, Year y Value
+        regions: Región de cada país indexada por iso3 (sin mediana regional si None)
+    
+    Returns:
+        DataFrame largo con iso3, IndicatorCode, Year, Value y source (int8,
+        ver FILL_SOURCES)
+    """
+    columns = ['iso3', 'IndicatorCode', 'Year', 'Value', 'source']
+    panel = panel.dropna(subset=['Value'])
+    if panel.empty:
+        return pd.DataFrame(columns=columns)
+    
+    cube = panel_to_cube(panel)
+    filled = fill_time_gaps(cube['values'])
+    values, source = filled['values'], filled['source']
+    
+    if regions is not None:
+        region_labels = pd.Series(cube['iso3']).map(regions)
+        region_idx, region_names = pd.factorize(region_labels)
+        medians = region_medians(cube['values'], region_idx, len(region_names))
+        
+        # Mediana de la región de cada país (países sin región: NaN)
+        by_country = medians[:, np.clip(region_idx, 0, None), :]
+        by_country[:, region_idx < 0, :] = np.nan
+        
+        use_median = (source < 0) & np.isfinite(by_country)
+        values = np.where(use_median, by_country, values)
+        source = np.where(use_median, np.int8(REGION_MEDIAN), source)
+    
+    f, c, y = np.nonzero(source >= 0)
+    
+    return pd.DataFrame({
+        'iso3': cube['iso3'][c],
+        'IndicatorCode': cube['codes'][f],
+        'Year': cube['years'][y].astype(np.int16),
+        'Value': values[f, c, y],
+        'source': source[f, c, y].astype(np.int8)
+    })
+
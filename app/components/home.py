@@ -11,6 +11,8 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from components.data_loader import DataLoader
+from components.figure_cache import render_cached_chart
+from components.choropleth import create_net_migration_map
 from config.settings import THEME_COLORS, PLOTLY_CONFIG, DATA_INFO_TEXT
 
 
@@ -40,6 +42,7 @@ def render_home(data_loader: DataLoader, filters: dict):
     
     # Aplicar filtros
     df_filtered = apply_filters(df_flows, filters)
+    signature = get_filter_signature(filters)
     
     # =================================================================
     # SECCIÓN 1: MÉTRICAS CLAVE
@@ -97,54 +100,8 @@ def render_home(data_loader: DataLoader, filters: dict):
     # Calcular saldo migratorio neto
     net_migration = data_loader.compute_net_migration(df_filtered)
     
-    # Agregar ISO3 para el mapa
-    # Crear mapeo desde flows
-    iso_map_origin = df_filtered[['origin', 'origin_iso3']].drop_duplicates().rename(
-        columns={'origin': 'country', 'origin_iso3': 'iso3'}
-    )
-    iso_map_dest = df_filtered[['destination', 'destination_iso3']].drop_duplicates().rename(
-        columns={'destination': 'country', 'destination_iso3': 'iso3'}
-    )
-    iso_map = pd.concat([iso_map_origin, iso_map_dest]).drop_duplicates(subset='country')
-    
-    map_data = net_migration.merge(iso_map, on='country', how='left')
-    
-    # Crear mapa coroplético
-    fig_map = px.choropleth(
-        map_data,
-        locations='iso3',
-        color='net_balance',
-        hover_name='country',
-        hover_data={
-            'immigration': ':,',
-            'emigration': ':,',
-            'net_balance': ':,',
-            'iso3': False
-        },
-        title='Saldo Migratorio Neto por País',
-        color_continuous_scale='RdYlGn',
-        color_continuous_midpoint=0,
-        labels={
-            'net_balance': 'Saldo Neto',
-            'immigration': 'Inmigración',
-            'emigration': 'Emigración'
-        }
-    )
-    
-    fig_map.update_geos(
-        showcountries=True, 
-        countrycolor="rgba(255,255,255,0.1)",
-        bgcolor='rgba(0,0,0,0)'
-    )
-    
-    fig_map.update_layout(
-        height=500,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=0, r=0, t=40, b=0)
-    )
-    
+    # Mapa coroplético: figura base cacheada, solo se actualizan los valores
+    fig_map = create_net_migration_map(df_filtered, data_loader)
     st.plotly_chart(fig_map, use_container_width=True, config=PLOTLY_CONFIG)
     
     # Interpretación
@@ -181,66 +138,72 @@ def render_home(data_loader: DataLoader, filters: dict):
         
         top_attractors = net_migration.head(10)
         
-        fig_attractors = px.bar(
-            top_attractors,
-            x='net_balance',
-            y='country',
-            orientation='h',
-            title='Top 10 Receptores de Talento (Brain Gain)',
-            labels={'net_balance': 'Saldo Neto', 'country': 'País'},
-            color='net_balance',
-            color_continuous_scale='Greens'
-        )
-        
-        fig_attractors.update_traces(
-            texttemplate='%{x:,.0f}',
-            textposition='outside',
-            hovertemplate='<b>%{y}</b><br>Saldo Neto: %{x:,.0f}<extra></extra>'
-        )
+        def build_fig_attractors():
+            fig_attractors = px.bar(
+                top_attractors,
+                x='net_balance',
+                y='country',
+                orientation='h',
+                title='Top 10 Receptores de Talento (Brain Gain)',
+                labels={'net_balance': 'Saldo Neto', 'country': 'País'},
+                color='net_balance',
+                color_continuous_scale='Greens'
+            )
+            
+            fig_attractors.update_traces(
+                texttemplate='%{x:,.0f}',
+                textposition='outside',
+                hovertemplate='<b>%{y}</b><br>Saldo Neto: %{x:,.0f}<extra></extra>'
+            )
+            
+            fig_attractors.update_layout(
+                height=400,
+                showlegend=False,
+                yaxis={'categoryorder': 'total ascending'},
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_attractors
         
-        fig_attractors.update_layout(
-            height=400,
-            showlegend=False,
-            yaxis={'categoryorder': 'total ascending'},
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        
-        st.plotly_chart(fig_attractors, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('home_attractors', signature, build_fig_attractors)
     
     with col2:
         st.markdown("### 🔴 Top Países Exportadores")
         
         top_exporters = net_migration.tail(10).sort_values('net_balance')
         
-        fig_exporters = px.bar(
-            top_exporters,
-            x='net_balance',
-            y='country',
-            orientation='h',
-            title='Top 10 Exportadores de Talento (Brain Drain)',
-            labels={'net_balance': 'Saldo Neto', 'country': 'País'},
-            color='net_balance',
-            color_continuous_scale='Reds'
-        )
+        def build_fig_exporters():
+            fig_exporters = px.bar(
+                top_exporters,
+                x='net_balance',
+                y='country',
+                orientation='h',
+                title='Top 10 Exportadores de Talento (Brain Drain)',
+                labels={'net_balance': 'Saldo Neto', 'country': 'País'},
+                color='net_balance',
+                color_continuous_scale='Reds'
+            )
+            
+            fig_exporters.update_traces(
+                texttemplate='%{x:,.0f}',
+                textposition='outside',
+                hovertemplate='<b>%{y}</b><br>Saldo Neto: %{x:,.0f}<extra></extra>'
+            )
+            
+            fig_exporters.update_layout(
+                height=400,
+                showlegend=False,
+                yaxis={'categoryorder': 'total ascending'},
+                template='plotly_dark',
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)'
+            )
+            
+            return fig_exporters
         
-        fig_exporters.update_traces(
-            texttemplate='%{x:,.0f}',
-            textposition='outside',
-            hovertemplate='<b>%{y}</b><br>Saldo Neto: %{x:,.0f}<extra></extra>'
-        )
-        
-        fig_exporters.update_layout(
-            height=400,
-            showlegend=False,
-            yaxis={'categoryorder': 'total ascending'},
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-        
-        st.plotly_chart(fig_exporters, use_container_width=True, config=PLOTLY_CONFIG)
+        render_cached_chart('home_exporters', signature, build_fig_exporters)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -348,3 +311,24 @@ def apply_filters(df: 'pd.DataFrame', filters: dict) -> 'pd.DataFrame':
         df_filtered = df_filtered[df_filtered['n_researchers'] >= filters['min_researchers']]
     
     return df_filtered
+
+
+def get_filter_signature(filters: dict) -> tuple:
+    """
+    Construye una firma hashable de los filtros que afectan a apply_filters.
+    
+    Sirve como clave de caché de los cálculos que dependen del subconjunto
+    filtrado (la página y el top N no alteran los datos).
+    
+    Args:
+        filters: Diccionario con filtros seleccionados
+        
+    Returns:
+        Tupla inmutable que identifica el subconjunto filtrado
+    """
+    return (
+        tuple(sorted(filters.get('origin_regions') or [])),
+        tuple(sorted(filters.get('dest_regions') or [])),
+        tuple(filters.get('year_range') or ()),
+        filters.get('min_researchers')
+    )
@@ -0,0 +1,172 @@
+"""
+Cadena de Markov de Movilidad Científica
+========================================
+
+Normaliza por filas la matriz origen × destino de investigadores en una
+matriz estocástica dispersa (CSR) y proyecta cómo se redistribuyen los
+investigadores tras varios movimientos, además de la distribución límite
+por iteración de potencias. Solo se usan productos matriz dispersa ×
+vector: la matriz nunca se densifica.
+
+En la proyección paso a paso, los países sin emigración registrada (filas
+vacías) retienen a sus investigadores: son estados absorbentes. La
+distribución límite se calcula sobre el núcleo de la red (la mayor
+componente fuertemente conexa), donde es única; si no, acabaría
+concentrada en esos sumideros, casi siempre países muy pequeños.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from typing import Dict
+
+from components.network import flow_adjacency
+
+
+# Pasos de movilidad proyectados
+MARKOV_STEPS = 10
+
+# Convergencia de la iteración de potencias (norma L1 entre iteraciones)
+POWER_TOL = 1e-12
+POWER_MAX_ITER = 10_000
+
+
+def transition_matrix(df_flows: pd.DataFrame) -> Dict[str, object]:
+    """
+    Matriz de transición dispersa a partir de los flujos por corredor.
+    
+    Args:
+        df_flows: Flujos con origin, destination y n_researchers
+    
+    Returns:
+        Diccionario con countries (C,), counts (CSR C × C), P (CSR, filas
+        que suman 1), outflow (emigración por país), absorbing (máscara de
+        países sin emigración, con lazo propio) y core (máscara de la mayor
+        componente fuertemente conexa)
+    """
+    countries, counts = flow_adjacency(df_flows)
+    
+    outflow = np.asarray(counts.sum(axis=1)).ravel()
+    absorbing = outflow == 0
+    
+    with np.errstate(divide='ignore'):
+        inverse = np.where(absorbing, 0.0, 1.0 / outflow)
+    P = (sparse.diags(inverse) @ counts + sparse.diags(absorbing.astype(np.float64))).tocsr()
+    
+    _, components = connected_components(counts, directed=True, connection='strong')
+    core = components == np.bincount(components).argmax()
+    
+    return {
+        'countries': countries, 'counts': counts, 'P': P,
+        'outflow': outflow, 'absorbing': absorbing, 'core': core
+    }
+
+
+def normalize_rows(counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Normaliza por filas una matriz dispersa sin filas vacías."""
+    return (sparse.diags(1.0 / np.asarray(counts.sum(axis=1)).ravel()) @ counts).tocsr()
+
+
+def project_distribution(P: sparse.csr_matrix, initial: np.ndarray, steps: int) -> np.ndarray:
+    """
+    Distribución tras 0..steps movimientos: π_k = π_0 · P^k.
+    
+    Args:
+        P: Matriz de transición (CSR)
+        initial: Distribución inicial (suma 1)
+        steps: Número de movimientos
+    
+    Returns:
+        Array (steps + 1) × C
+    """
+    PT = P.T.tocsr()
+    distributions = np.empty((steps + 1, initial.size))
+    distributions[0] = initial
+    
+    for k in range(1, steps + 1):
+        distributions[k] = PT @ distributions[k - 1]
+    
+    return distributions
+
+
+def stationary_distribution(P: sparse.csr_matrix, initial: np.ndarray,
+                            tol: float = POWER_TOL, max_iter: int = POWER_MAX_ITER) -> Dict[str, object]:
+    """
+    Distribución estacionaria por iteración de potencias.
+    
+    Itera la cadena perezosa (I + P) / 2, que tiene las mismas
+    distribuciones estacionarias que P pero es aperiódica, de modo que la
+    iteración converge aunque haya ciclos. Si P es irreducible el límite
+    no depende de initial (solo acelera la convergencia).
+    
+    Args:
+        P: Matriz de transición (CSR)
+        initial: Distribución inicial (suma 1)
+        tol: Tolerancia (norma L1 entre iteraciones)
+        max_iter: Iteraciones máximas
+    
+    Returns:
+        Diccionario con distribution, n_iter y converged
+    """
+    PT = P.T.tocsr()
+    pi = initial.copy()
+    
+    for n_iter in range(1, max_iter + 1):
+        new_pi = 0.5 * (pi + PT @ pi)
+        delta = np.abs(new_pi - pi).sum()
+        pi = new_pi
+        if delta < tol:
+            return {'distribution': pi / pi.sum(), 'n_iter': n_iter, 'converged': True}
+    
+    return {'distribution': pi / pi.sum(), 'n_iter': max_iter, 'converged': False}
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_markov_projection(_df_flows: pd.DataFrame, signature: tuple, version: tuple,
+                          steps: int = MARKOV_STEPS) -> Dict[str, object]:
+    """
+    Proyección de la cadena de Markov, cacheada por firma de filtros y versión del dataset.
+    
+    La distribución inicial es el reparto de investigadores por país de
+    origen; tras un paso coincide con el reparto por destino observado.
+    La distribución estacionaria es la de la cadena restringida al núcleo
+    (0 fuera de él).
+    
+    Args:
+        _df_flows: Flujos ya filtrados (no se hashea)
+        signature: Firma de los filtros aplicados
+        version: Versión del dataset (ver get_dataset_version)
+        steps: Número de movimientos proyectados
+    
+    Returns:
+        Diccionario con countries, projection ((steps + 1) × C),
+        stationary, n_iter, converged, n_absorbing y n_core; vacío sin flujos
+    """
+    if _df_flows.empty or _df_flows['n_researchers'].sum() == 0:
+        return {}
+    
+    chain = transition_matrix(_df_flows)
+    initial = chain['outflow'] / chain['outflow'].sum()
+    
+    core = chain['core']
+    stationary = np.zeros(core.size)
+    if core.sum() > 1:
+        core_initial = initial[core] + 1.0 / core.sum()
+        core_result = stationary_distribution(
+            normalize_rows(chain['counts'][core][:, core]), core_initial / core_initial.sum()
+        )
+        stationary[core] = core_result['distribution']
+    else:
+        core_result = {'n_iter': 0, 'converged': False}
+    
+    return {
+        'countries': chain['countries'],
+        'projection': project_distribution(chain['P'], initial, steps),
+        'stationary': stationary,
+        'n_iter': core_result['n_iter'],
+        'converged': core_result['converged'],
+        'n_absorbing': int(chain['absorbing'].sum()),
+        'n_core': int(core.sum())
+    }
@@ -10,13 +10,28 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score, mean_absolute_error
-from components.data_loader import DataLoader
-from config.settings import THEME_COLORS, PLOTLY_CONFIG
+from plotly.subplots import make_subplots
+from components.data_loader import DataLoader, get_dataset_version
+from components.clustering import (
+    CLUSTER_FEATURES, K_MIN, K_MAX, get_clustering_model, get_model_selection_table
+)
+from components.charts import histogram_figure, scatter_figure
+from components.figure_cache import render_cached_chart
+from components.correlation import (
+    correlation_matrix, upper_triangle_pairs, bootstrap_correlation_ci, format_correlation
+)
+from components.trendlines import TRENDLINE_METHODS, fit_trendline, add_trendline, format_trendline_summary
+from components.feature_store import RECENT_YEARS
+from components.choropleth import get_country_index
+from components.gravity import get_gravity_model
+from components.forecasting import (
+    FORECAST_MODELS, FORECAST_YEAR_MAX, MIN_ACTIVE_YEARS, MIN_INFORMATIVE_SHARE,
+    get_corridor_forecasts, slice_forecasts
+)
+from components.similarity import (
+    PROFILE_BLOCKS, NEIGHBORS_DEFAULT, NEIGHBORS_MAX, MIN_TOTAL_FLOW, get_similarity_index, query_similar
+)
+from config.settings import THEME_COLORS, WDI_FEATURES
 
 
 def render_ml(data_loader: DataLoader, filters: dict):
@@ -47,11 +62,10 @@ Esta sección aplica técnicas de ML sobre los datos de migración científica d
 - **Variables:** Inmigración, emigración, saldo neto, volumen total
 - **Cobertura:** Investigadores con PhD 2000-2016
 
-**⚠️ Limitaciones actuales:**
-- Los **indicadores económicos** (PIB, I+D) del World Bank requieren procesamiento adicional para ser integrados en estos análisis.
-- Por ahora, los modelos se enfocan en **patrones migratorios puros** sin variables económicas.
+**📦 Indicadores económicos:**
+- Los **indicadores WDI** (PIB per cápita, gasto en I+D, población, investigadores) se leen por nombre del feature store país × año, unidos as-of a cada año.
 
-**🎯 Análisis disponibles:** Clustering de países por similitud migratoria, análisis de correlaciones entre variables migratorias, y estadísticas descriptivas avanzadas.
+**🎯 Análisis disponibles:** Clustering de países por similitud migratoria, análisis de correlaciones entre variables migratorias y económicas, estadísticas descriptivas avanzadas, un modelo de gravedad (PPML) de los corredores, pronósticos por corredor hasta 2030 y búsqueda de países con perfil migratorio similar.
     """)
     
     # =================================================================
@@ -60,10 +74,13 @@ Esta sección aplica técnicas de ML sobre los datos de migración científica d
     
     st.markdown('<div class="section-header">🔬 Análisis de Machine Learning</div>', unsafe_allow_html=True)
     
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "📊 Correlaciones",
         "🎯 Clustering",
-        "� Distribuciones"
+        "� Distribuciones",
+        "🌐 Modelo de Gravedad",
+        "🔮 Pronósticos",
+        "🧭 Países Similares"
     ])
     
     with tab1:
@@ -75,6 +92,15 @@ Esta sección aplica técnicas de ML sobre los datos de migración científica d
     with tab3:
         render_prediction_demo(data_loader)
     
+    with tab4:
+        render_gravity_demo(data_loader)
+    
+    with tab5:
+        render_forecast_demo(data_loader)
+    
+    with tab6:
+        render_similarity_demo(data_loader)
+    
     st.markdown("<br><br>", unsafe_allow_html=True)
     
     # =================================================================
@@ -208,8 +234,8 @@ def render_correlation_demo(data_loader: DataLoader):
     st.markdown("### 📊 Análisis de Correlaciones Migratorias")
     
     st.markdown("""
-    Explora las relaciones entre variables migratorias: inmigración, emigración, 
-    saldo neto y flujo total de investigadores entre países.
+    Explora las relaciones entre variables migratorias (inmigración, emigración, 
+    saldo neto y flujo total de investigadores) e indicadores económicos WDI.
     """)
     
     # Cargar datos
@@ -222,6 +248,16 @@ def render_correlation_demo(data_loader: DataLoader):
     # Usar datos de migración agregados por país
     correlation_data = data_loader.compute_net_migration(df_flows)
     
+    # Indicadores económicos por nombre desde el feature store (media de los años recientes)
+    wdi_features = list(WDI_FEATURES)
+    economic = data_loader.load_features(tuple(wdi_features), *RECENT_YEARS)
+    economic = economic.groupby('iso3', observed=True)[wdi_features].mean()
+    
+    countries, iso3 = get_country_index(data_loader, get_dataset_version())
+    correlation_data = correlation_data.assign(
+        iso3=correlation_data['country'].astype(str).map(dict(zip(countries, iso3)))
+    ).merge(economic, left_on='iso3', right_index=True, how='left').drop(columns='iso3')
+    
     # Seleccionar columnas numéricas para correlación
     numeric_cols = correlation_data.select_dtypes(include=[np.number]).columns.tolist()
     
@@ -246,46 +282,47 @@ def render_correlation_demo(data_loader: DataLoader):
                 )
         return
     
-    # Calcular matriz de correlación
-    corr_matrix = correlation_data[valid_cols].corr()
-    
-    # Crear heatmap
-    fig = px.imshow(
-        corr_matrix,
-        text_auto='.2f',
-        aspect='auto',
-        color_continuous_scale='RdBu_r',
-        zmin=-1,
-        zmax=1,
-        title='Matriz de Correlación de Pearson',
-        labels=dict(color="Correlación")
+    method = st.radio(
+        "Método de correlación:",
+        options=['pearson', 'spearman'],
+        format_func={'pearson': 'Pearson', 'spearman': 'Spearman (rangos)'}.get,
+        horizontal=True,
+        key="ml_correlation_method"
     )
     
-    fig.update_layout(
-        height=600,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    # Matriz de correlación por pares con p-valores
+    corr_result = correlation_matrix(correlation_data[valid_cols], method)
+    corr_matrix = pd.DataFrame(corr_result['r'], index=valid_cols, columns=valid_cols)
+    
+    # Crear heatmap
+    def build_fig_corr():
+        fig_corr = px.imshow(
+            corr_matrix,
+            text_auto='.2f',
+            aspect='auto',
+            color_continuous_scale='RdBu_r',
+            zmin=-1,
+            zmax=1,
+            title=f"Matriz de Correlación de {method.capitalize()}",
+            labels=dict(color="Correlación")
+        )
+        
+        fig_corr.update_layout(
+            height=600,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_corr
     
-    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('ml_correlation_matrix', (method,), build_fig_corr)
     
     # Encontrar correlaciones más fuertes
     st.markdown("### 🔍 Correlaciones Más Fuertes")
     
-    # Crear dataframe de correlaciones
-    corr_pairs = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            corr_pairs.append({
-                'Variable 1': corr_matrix.columns[i],
-                'Variable 2': corr_matrix.columns[j],
-                'Correlación': corr_matrix.iloc[i, j]
-            })
-    
-    corr_df = pd.DataFrame(corr_pairs)
-    corr_df['Abs_Corr'] = corr_df['Correlación'].abs()
-    corr_df = corr_df.sort_values('Abs_Corr', ascending=False)
+    # Triángulo superior en formato largo, ordenado por |r|
+    corr_df = upper_triangle_pairs(corr_result)
     
     # Mostrar top correlaciones
     col1, col2 = st.columns(2)
@@ -294,13 +331,25 @@ def render_correlation_demo(data_loader: DataLoader):
         st.markdown("**🔴 Correlaciones Positivas Más Fuertes:**")
         top_positive = corr_df[corr_df['Correlación'] > 0].head(5)
         for _, row in top_positive.iterrows():
-            st.markdown(f"- **{row['Variable 1']}** ↔ **{row['Variable 2']}**: {row['Correlación']:.3f}")
+            st.markdown(f"- **{row['Variable 1']}** ↔ **{row['Variable 2']}**: {row['Correlación']:.3f} (p = {row['p-valor']:.2g})")
     
     with col2:
         st.markdown("**🔵 Correlaciones Negativas Más Fuertes:**")
         top_negative = corr_df[corr_df['Correlación'] < 0].head(5)
         for _, row in top_negative.iterrows():
-            st.markdown(f"- **{row['Variable 1']}** ↔ **{row['Variable 2']}**: {row['Correlación']:.3f}")
+            st.markdown(f"- **{row['Variable 1']}** ↔ **{row['Variable 2']}**: {row['Correlación']:.3f} (p = {row['p-valor']:.2g})")
+    
+    # Intervalo bootstrap del par más fuerte
+    if not corr_df.empty:
+        strongest = corr_df.iloc[0]
+        boot = bootstrap_correlation_ci(
+            correlation_data[strongest['Variable 1']], correlation_data[strongest['Variable 2']], method
+        )
+        st.caption(
+            f"Par más fuerte ({strongest['Variable 1']} ↔ {strongest['Variable 2']}): "
+            f"{format_correlation(boot, 'r' if method == 'pearson' else 'ρ')}, "
+            f"IC por bootstrap con {boot['n_boot']:,} remuestras."
+        )
     
     # Interpretación
     st.markdown("""
@@ -328,70 +377,103 @@ def render_clustering_demo(data_loader: DataLoader):
     para visualización en 2D.
     """)
     
-    # Cargar datos
-    df_flows = data_loader.load_flows()
-    if df_flows.empty:
-        st.warning("No hay datos disponibles para clustering.")
+    # Features, PCA y K-Means para todos los k (cacheado por versión del dataset)
+    model = get_clustering_model(data_loader, get_dataset_version())
+    
+    if model['data'].empty:
+        st.warning("Datos insuficientes para clustering (mínimo 10 países con datos completos).")
         return
     
-    # Calcular características por país
-    country_features = data_loader.compute_net_migration(df_flows)
+    # Selección del número de clusters: codo (inercia) y silhouette
+    selection = get_model_selection_table(model['fits'])
     
-    # Preparar features para clustering (solo variables migratorias)
-    feature_cols = ['immigration', 'emigration', 'net_balance', 'total_flow']
+    def build_fig_elbow():
+        fig_elbow = make_subplots(specs=[[{"secondary_y": True}]])
+        
+        fig_elbow.add_trace(
+            go.Scatter(x=selection['k'], y=selection['inertia'], mode='lines+markers',
+                       name='Inercia', line=dict(color=THEME_COLORS['primary'])),
+            secondary_y=False
+        )
+        fig_elbow.add_trace(
+            go.Scatter(x=selection['k'], y=selection['silhouette'], mode='lines+markers',
+                       name='Silhouette', line=dict(color=THEME_COLORS['accent'])),
+            secondary_y=True
+        )
+        
+        fig_elbow.update_xaxes(title_text='Número de Clusters (k)', dtick=1)
+        fig_elbow.update_yaxes(title_text='Inercia', secondary_y=False)
+        fig_elbow.update_yaxes(title_text='Silhouette', secondary_y=True)
+        fig_elbow.update_layout(
+            title='Selección de k: Método del Codo y Silhouette',
+            height=400,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_elbow
     
-    # Filtrar países con datos completos
-    clustering_data = country_features[['country'] + feature_cols].dropna()
+    render_cached_chart('ml_elbow_silhouette', (), build_fig_elbow)
     
-    if len(clustering_data) < 10:
-        st.warning("Datos insuficientes para clustering (mínimo 10 países con datos completos).")
-        return
+    best_k = int(selection.loc[selection['silhouette'].idxmax(), 'k'])
+    st.caption(f"Mejor silhouette con k = {best_k}.")
+    
+    render_clustering_results(model, list(CLUSTER_FEATURES))
+
+
+@st.fragment
+def render_clustering_results(model: dict, feature_cols: list):
+    """
+    Muestra los clusters de K-Means sobre la proyección PCA.
+    
+    Se ejecuta como fragmento y no ajusta ningún modelo: el slider de
+    número de clusters consulta las etiquetas ya calculadas para ese k.
+    
+    Args:
+        model: Resultado de get_clustering_model
+        feature_cols: Columnas usadas como features
+    """
     
     # Número de clusters
     col1, col2 = st.columns([1, 3])
     with col1:
-        n_clusters = st.slider("Número de Clusters", min_value=2, max_value=7, value=4)
-    
-    # Normalizar datos
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(clustering_data[feature_cols])
+        n_clusters = st.slider("Número de Clusters", min_value=K_MIN, max_value=K_MAX, value=4)
     
-    # Aplicar K-Means
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-    clustering_data['cluster'] = kmeans.fit_predict(X_scaled)
-    
-    # PCA para visualización 2D
-    pca = PCA(n_components=2, random_state=42)
-    X_pca = pca.fit_transform(X_scaled)
-    clustering_data['PC1'] = X_pca[:, 0]
-    clustering_data['PC2'] = X_pca[:, 1]
+    clustering_data = model['data'].copy()
+    clustering_data['cluster'] = model['fits'][n_clusters]['labels']
+    explained_variance = model['explained_variance']
     
     # Visualización
-    fig = px.scatter(
-        clustering_data,
-        x='PC1',
-        y='PC2',
-        color='cluster',
-        hover_name='country',
-        hover_data=feature_cols,
-        title=f'Clustering de Países en {n_clusters} Grupos (K-Means + PCA)',
-        labels={
-            'PC1': f'Componente Principal 1 ({pca.explained_variance_ratio_[0]:.1%} varianza)',
-            'PC2': f'Componente Principal 2 ({pca.explained_variance_ratio_[1]:.1%} varianza)',
-            'cluster': 'Cluster'
-        },
-        color_continuous_scale='Viridis'
-    )
-    
-    fig.update_traces(marker=dict(size=12, line=dict(width=0.5, color='white')))
-    fig.update_layout(
-        height=600,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    def build_fig_clusters():
+        fig_clusters = scatter_figure(
+            clustering_data,
+            x='PC1',
+            y='PC2',
+            priority='total_flow',
+            color='cluster',
+            hover_name='country',
+            hover_data=feature_cols,
+            title=f'Clustering de Países en {n_clusters} Grupos (K-Means + PCA)',
+            labels={
+                'PC1': f'Componente Principal 1 ({explained_variance[0]:.1%} varianza)',
+                'PC2': f'Componente Principal 2 ({explained_variance[1]:.1%} varianza)',
+                'cluster': 'Cluster'
+            },
+            color_continuous_scale='Viridis'
+        )
+        
+        fig_clusters.update_traces(marker=dict(size=12, line=dict(width=0.5, color='white')))
+        fig_clusters.update_layout(
+            height=600,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_clusters
     
-    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('ml_clusters_pca', (n_clusters,), build_fig_clusters)
     
     # Interpretación de clusters
     st.markdown("### 📋 Perfil de cada Cluster")
@@ -458,24 +540,27 @@ def render_prediction_demo(data_loader: DataLoader):
         st.metric("Total Países", len(net_migration))
     
     # Histograma de saldos
-    fig_hist = px.histogram(
-        net_migration,
-        x='net_balance',
-        nbins=50,
-        title='Distribución de Saldos Migratorios por País',
-        labels={'net_balance': 'Saldo Migratorio Neto', 'count': 'Frecuencia'},
-        color_discrete_sequence=[THEME_COLORS['primary']]
-    )
-    
-    fig_hist.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Balance = 0")
-    fig_hist.update_layout(
-        height=400,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    def build_fig_hist():
+        fig_hist = histogram_figure(
+            net_migration['net_balance'],
+            nbins=50,
+            color=THEME_COLORS['primary']
+        )
+        
+        fig_hist.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Balance = 0")
+        fig_hist.update_layout(
+            title='Distribución de Saldos Migratorios por País',
+            xaxis_title='Saldo Migratorio Neto',
+            yaxis_title='Frecuencia',
+            height=400,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_hist
     
-    st.plotly_chart(fig_hist, use_container_width=True, config=PLOTLY_CONFIG)
+    render_cached_chart('ml_net_balance_histogram', (), build_fig_hist)
     
     # Top atractores y exportadores
     st.markdown("### 🏆 Rankings")
@@ -504,39 +589,62 @@ def render_prediction_demo(data_loader: DataLoader):
     (ej: países que atraen mucho también pierden mucho, o viceversa).
     """)
     
-    # Scatter plot
-    fig_scatter = px.scatter(
-        net_migration,
-        x='emigration',
-        y='immigration',
-        size='total_flow',
-        hover_name='country',
-        title='Relación entre Emigración e Inmigración',
-        labels={
-            'emigration': 'Emigración (investigadores)',
-            'immigration': 'Inmigración (investigadores)',
-            'total_flow': 'Flujo Total'
-        },
-        trendline="ols",
-        color='net_balance',
-        color_continuous_scale='RdYlGn'
+    trend_method = st.radio(
+        "Línea de tendencia:",
+        options=list(TRENDLINE_METHODS),
+        format_func=TRENDLINE_METHODS.get,
+        horizontal=True,
+        key="ml_trendline_method"
     )
     
-    fig_scatter.update_layout(
-        height=500,
-        template='plotly_dark',
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
+    fit_scatter = fit_trendline(
+        net_migration['emigration'].to_numpy(dtype='float64'),
+        net_migration['immigration'].to_numpy(dtype='float64'),
+        trend_method
     )
     
-    st.plotly_chart(fig_scatter, use_container_width=True, config=PLOTLY_CONFIG)
+    # Scatter plot
+    def build_fig_scatter():
+        fig_scatter = scatter_figure(
+            net_migration,
+            x='emigration',
+            y='immigration',
+            priority='total_flow',
+            size='total_flow',
+            hover_name='country',
+            title='Relación entre Emigración e Inmigración',
+            labels={
+                'emigration': 'Emigración (investigadores)',
+                'immigration': 'Inmigración (investigadores)',
+                'total_flow': 'Flujo Total'
+            },
+            color='net_balance',
+            color_continuous_scale='RdYlGn',
+            log_x=trend_method == 'loglog',
+            log_y=trend_method == 'loglog'
+        )
+        
+        add_trendline(fig_scatter, fit_scatter)
+        fig_scatter.update_layout(
+            height=500,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_scatter
+    
+    render_cached_chart('ml_immigration_vs_emigration', (trend_method,), build_fig_scatter)
+    st.caption(format_trendline_summary(fit_scatter))
     
     # Correlación
-    corr = net_migration[['immigration', 'emigration']].corr().iloc[0, 1]
+    corr_boot = bootstrap_correlation_ci(net_migration['immigration'], net_migration['emigration'])
+    corr = corr_boot['r']
     
     st.markdown(f"""
     <div class="alert-info">
         <h4>� Correlación: {corr:.3f}</h4>
+        <p>{format_correlation(corr_boot)}</p>
         <p>{'Existe una correlación positiva moderada' if corr > 0.5 else 'La correlación es débil'} 
         entre inmigración y emigración. Esto sugiere que países con alta movilidad tienden a 
         tener flujos en ambas direcciones.</p>
@@ -544,6 +652,337 @@ def render_prediction_demo(data_loader: DataLoader):
     """, unsafe_allow_html=True)
 
 
+def render_gravity_demo(data_loader: DataLoader):
+    """Modelo de gravedad PPML: flujo esperado y residuos por corredor."""
+    
+    st.markdown("### 🌐 Modelo de Gravedad de Corredores")
+    
+    st.markdown("""
+    Regresión de Poisson (**PPML**) del número de investigadores de cada par origen → destino 
+    sobre **todos los pares posibles** (también los que no tienen flujos), con efectos fijos de 
+    origen y destino, distancia, misma región y brecha de PIB per cápita. Los residuos señalan 
+    corredores por encima o por debajo de lo que explica la geografía y la economía.
+    """)
+    
+    model = get_gravity_model(data_loader, get_dataset_version())
+    
+    if model['pairs'].empty:
+        st.warning("No hay datos disponibles.")
+        return
+    
+    model_stats = model['stats']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Pares Ajustados", f"{model_stats['n_pairs']:,}",
+                 help="Pares de países con todas las covariables disponibles")
+    with col2:
+        st.metric("Pares sin Flujo", f"{model_stats['n_zero'] / model_stats['n_pairs']:.1%}")
+    with col3:
+        st.metric("Pseudo-R²", f"{model_stats['pseudo_r2']:.3f}",
+                 help="Correlación al cuadrado entre flujo observado y predicho")
+    with col4:
+        st.metric("Iteraciones IRLS", model_stats['n_iter'],
+                 delta="Convergido" if model_stats['converged'] else "Sin converger",
+                 delta_color="normal" if model_stats['converged'] else "inverse")
+    
+    st.markdown("**Coeficientes** (errores estándar robustos; efecto = cambio % del flujo esperado por unidad):")
+    st.dataframe(
+        model['coefficients'].rename(columns={
+            'term': 'Variable', 'coef': 'Coeficiente', 'effect_pct': 'Efecto (%)',
+            'std_err': 'Error Estándar', 'z': 'z', 'p_value': 'p-valor'
+        }).style.format({
+            'Coeficiente': '{:.3f}', 'Efecto (%)': '{:+.1f}', 'Error Estándar': '{:.3f}',
+            'z': '{:.2f}', 'p-valor': '{:.2e}'
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Observado vs predicho (corredores con flujo, escala logarítmica)
+    fitted = model['pairs'][(model['pairs']['n_researchers'] > 0) & (model['pairs']['predicted'] > 0)].copy()
+    fitted['corridor'] = fitted['origin'].astype(str) + ' → ' + fitted['destination'].astype(str)
+    
+    def build_fig_gravity():
+        fig_gravity = scatter_figure(
+            fitted,
+            x='predicted',
+            y='n_researchers',
+            priority='n_researchers',
+            color='pearson_residual',
+            hover_name='corridor',
+            title='Flujo Observado vs. Predicho por el Modelo de Gravedad',
+            labels={
+                'predicted': 'Investigadores Predichos',
+                'n_researchers': 'Investigadores Observados',
+                'pearson_residual': 'Residuo de Pearson'
+            },
+            color_continuous_scale='RdBu',
+            color_continuous_midpoint=0,
+            range_color=(-10, 10),
+            log_x=True,
+            log_y=True
+        )
+        
+        bounds = [fitted[['predicted', 'n_researchers']].min().min(), fitted[['predicted', 'n_researchers']].max().max()]
+        fig_gravity.add_trace(go.Scatter(
+            x=bounds, y=bounds, mode='lines', name='Predicho = Observado',
+            line=dict(color='gray', dash='dash')
+        ))
+        fig_gravity.update_layout(
+            height=550,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_gravity
+    
+    render_cached_chart('ml_gravity_fit', (), build_fig_gravity)
+    
+    # Corredores más alejados de lo esperado
+    residual_columns = {
+        'origin': 'Origen', 'destination': 'Destino', 'n_researchers': 'Observado',
+        'predicted': 'Predicho', 'pearson_residual': 'Residuo'
+    }
+    residual_format = {'Observado': '{:,.0f}', 'Predicho': '{:,.1f}', 'Residuo': '{:+.1f}'}
+    ranked = model['pairs'].dropna(subset=['pearson_residual'])[list(residual_columns)]
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**Corredores por encima de lo esperado:**")
+        st.dataframe(ranked.nlargest(10, 'pearson_residual').rename(columns=residual_columns)
+                     .style.format(residual_format), hide_index=True, use_container_width=True)
+    
+    with col2:
+        st.markdown("**Corredores por debajo de lo esperado:**")
+        st.dataframe(ranked.nsmallest(10, 'pearson_residual').rename(columns=residual_columns)
+                     .style.format(residual_format), hide_index=True, use_container_width=True)
+
+
+def render_forecast_demo(data_loader: DataLoader):
+    """Pronósticos por corredor hasta FORECAST_YEAR_MAX (ajustados en lote)."""
+    
+    st.markdown("### 🔮 Pronóstico de Corredores")
+    
+    st.markdown(f"""
+    Cada corredor se pronostica hasta **{FORECAST_YEAR_MAX}** con tres modelos ajustados a la vez 
+    para todos los corredores: **suavizado exponencial**, **tendencia amortiguada** y 
+    **tendencia log-lineal**. Por defecto cada corredor usa el modelo con menor error en los 
+    últimos años observados.
+    """)
+    
+    result = get_corridor_forecasts(data_loader, get_dataset_version())
+    
+    if not result:
+        st.warning("No hay datos disponibles.")
+        return
+    
+    # Sin series de varios años los modelos extrapolan picos de un solo año
+    informative = float((result['active_years'] >= MIN_ACTIVE_YEARS).mean())
+    if informative < MIN_INFORMATIVE_SHARE:
+        st.warning(
+            f"⚠️ Solo el {informative:.0%} de los corredores tiene flujos en {MIN_ACTIVE_YEARS} o más años "
+            f"(se necesita al menos el {MIN_INFORMATIVE_SHARE:.0%}). Sin migraciones individuales "
+            "(migrations_clean) cada corredor se asigna entero a su año medio, de modo que las series "
+            "son picos aislados y cualquier pronóstico sería una extrapolación sin sentido. "
+            "Los pronósticos se mostrarán cuando haya datos por investigador."
+        )
+        return
+    
+    model_share = np.bincount(result['best'], minlength=len(FORECAST_MODELS)) / len(result['best'])
+    st.caption("Modelo elegido por corredor: " + " · ".join(
+        f"{label} {share:.0%}" for label, share in zip(FORECAST_MODELS.values(), model_share)
+    ))
+    
+    render_forecast_slice(result)
+
+
+@st.fragment
+def render_forecast_slice(result: dict):
+    """
+    Recorta los pronósticos por origen, destino y modelo.
+    
+    Se ejecuta como fragmento y no ajusta ningún modelo: los selectores
+    suman filas del artefacto de pronósticos ya calculado.
+    
+    Args:
+        result: Resultado de get_corridor_forecasts
+    """
+    all_label = 'Todos'
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        origin = st.selectbox("Origen", [all_label] + sorted(set(result['origin'])), key="ml_forecast_origin")
+    with col2:
+        destination = st.selectbox("Destino", [all_label] + sorted(set(result['destination'])),
+                                   key="ml_forecast_destination")
+    with col3:
+        model = st.selectbox(
+            "Modelo",
+            options=[None] + list(FORECAST_MODELS),
+            format_func=lambda key: 'Mejor por corredor' if key is None else FORECAST_MODELS[key],
+            key="ml_forecast_model"
+        )
+    
+    series = slice_forecasts(
+        result,
+        origin=None if origin == all_label else origin,
+        destination=None if destination == all_label else destination,
+        model=model
+    )
+    
+    if series.loc[series['kind'] == 'Histórico', 'n_researchers'].sum() == 0:
+        st.info("No hay flujos históricos para esta selección.")
+        return
+    
+    def build_fig_forecast():
+        fig_forecast = px.line(
+            series,
+            x='year',
+            y='n_researchers',
+            color='kind',
+            markers=True,
+            title=f'Investigadores por Año: {origin} → {destination}',
+            labels={'year': 'Año', 'n_researchers': 'Investigadores', 'kind': ''},
+            color_discrete_map={'Histórico': THEME_COLORS['primary'], 'Pronóstico': THEME_COLORS['accent']}
+        )
+        
+        fig_forecast.update_traces(selector=dict(name='Pronóstico'), line=dict(dash='dash'))
+        fig_forecast.update_layout(
+            height=450,
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_forecast
+    
+    render_cached_chart('ml_corridor_forecast', (origin, destination, model), build_fig_forecast)
+    
+    last = series[series['kind'] == 'Histórico'].iloc[-1]
+    final = series.iloc[-1]
+    st.caption(
+        f"Último año observado ({last['year']}): {last['n_researchers']:,.0f} investigadores · "
+        f"Pronóstico {final['year']}: {final['n_researchers']:,.1f}"
+    )
+
+
+def render_similarity_demo(data_loader: DataLoader):
+    """Búsqueda de países con perfil migratorio similar (KD-tree)."""
+    
+    st.markdown("### 🧭 Países con Perfil Migratorio Similar")
+    
+    st.markdown(f"""
+    Cada país se describe por su **mezcla de inmigración y emigración**, su **reparto de destinos** 
+    y de **orígenes** y sus **indicadores WDI**; cada bloque se normaliza para pesar lo mismo. 
+    Los vecinos más cercanos se buscan en un **KD-tree** construido una vez por versión del 
+    dataset. Solo se indexan países con al menos {MIN_TOTAL_FLOW} investigadores de flujo total.
+    """)
+    
+    render_similar_countries(data_loader)
+
+
+@st.fragment
+def render_similar_countries(data_loader: DataLoader):
+    """
+    Vecinos más cercanos del país seleccionado.
+    
+    Se ejecuta como fragmento: cambiar de país o de número de vecinos es
+    una consulta al índice ya construido; cambiar de bloques usa el índice
+    cacheado para esa combinación.
+    
+    Args:
+        data_loader: Cargador de datos compartido
+    """
+    blocks = st.multiselect(
+        "Comparar por:",
+        options=list(PROFILE_BLOCKS),
+        default=list(PROFILE_BLOCKS),
+        format_func=PROFILE_BLOCKS.get,
+        key="ml_similarity_blocks"
+    )
+    
+    if not blocks:
+        st.info("Selecciona al menos un bloque del perfil.")
+        return
+    
+    index = get_similarity_index(data_loader, get_dataset_version(), tuple(blocks))
+    
+    if not index:
+        st.warning("No hay datos disponibles.")
+        return
+    
+    profiles = index['profiles']
+    countries = profiles.sort_values('immigration', ascending=False)['country'].tolist()
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        country = st.selectbox("País", countries, key="ml_similarity_country")
+    with col2:
+        k = st.slider("Número de vecinos", min_value=3, max_value=NEIGHBORS_MAX,
+                      value=NEIGHBORS_DEFAULT, key="ml_similarity_k")
+    
+    result = query_similar(index, country, k)
+    neighbors = result['neighbors']
+    
+    st.caption(
+        f"{len(profiles)} países indexados · {index['X'].shape[1]} dimensiones · "
+        f"consulta en {result['query_ms']:.3f} ms"
+    )
+    
+    # Distancia al cuadrado desglosada por bloque
+    contributions = neighbors.melt(
+        id_vars='country',
+        value_vars=[f'distance_{name}' for name in blocks],
+        var_name='block',
+        value_name='squared_distance'
+    )
+    contributions['block'] = contributions['block'].str.removeprefix('distance_').map(PROFILE_BLOCKS)
+    
+    def build_fig_similarity():
+        fig_similarity = px.bar(
+            contributions,
+            x='squared_distance',
+            y='country',
+            color='block',
+            orientation='h',
+            title=f'Países más Parecidos a {country}',
+            labels={'squared_distance': 'Distancia al cuadrado', 'country': 'País', 'block': 'Bloque'},
+            category_orders={'country': neighbors['country'].tolist(), 'block': [PROFILE_BLOCKS[name] for name in blocks]}
+        )
+        
+        fig_similarity.update_layout(
+            height=max(350, 35 * len(neighbors)),
+            template='plotly_dark',
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig_similarity
+    
+    render_cached_chart('ml_similar_countries', (tuple(blocks), country, k), build_fig_similarity)
+    
+    # Perfil del país consultado y de sus vecinos
+    profile_columns = {
+        'country': 'País', 'distance': 'Distancia', 'immigration': 'Inmigración',
+        'emigration': 'Emigración', 'net_balance': 'Saldo Neto', 'top_destination': 'Destino Principal',
+        'top_origin': 'Origen Principal', 'gdp_per_capita': 'PIB per cápita',
+        'rd_expenditure_pct': 'I+D (% PIB)'
+    }
+    selected = profiles[profiles['country'] == country].assign(distance=0.0)
+    
+    st.dataframe(
+        pd.concat([selected, neighbors])[list(profile_columns)].rename(columns=profile_columns).style.format({
+            'Distancia': '{:.3f}', 'Inmigración': '{:,.0f}', 'Emigración': '{:,.0f}', 'Saldo Neto': '{:+,.0f}',
+            'PIB per cápita': '{:,.0f}', 'I+D (% PIB)': '{:.2f}'
+        }, na_rep='–'),
+        hide_index=True,
+        use_container_width=True
+    )
+
+
 # =============================================================================
 # RECURSOS ADICIONALES
 # =============================================================================
@@ -0,0 +1,143 @@
+"""
+Almacén de Artefactos de Modelos
+================================
+
+Persiste en disco los modelos ajustados (escaladores, PCA, clusterers,
+regresiones...) con una clave derivada del hash de las features de entrada
+y de los hiperparámetros. Los artefactos se guardan sin comprimir y se
+cargan con memory-mapping (joblib, mmap_mode='r'), de modo que un worker
+recién arrancado sirve la página de ML sin ajustar nada.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import joblib
+import numpy as np
+import sklearn
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from config.settings import MODELS_DIR
+
+
+def artifact_key(name: str, X, params: Optional[dict] = None) -> str:
+    """
+    Clave de un artefacto: hash de las features y de los hiperparámetros.
+    
+    Incluye la versión de scikit-learn para no cargar modelos serializados
+    con una versión incompatible.
+    
+    Args:
+        name: Nombre lógico del modelo (p. ej. 'clustering')
+        X: Matriz de features de entrada
+        params: Hiperparámetros (serializables a JSON)
+    
+    Returns:
+        Clave '<name>-<sha256 truncado>'
+    """
+    X = np.ascontiguousarray(X)
+    
+    digest = hashlib.sha256()
+    digest.update(str((X.shape, X.dtype.str)).encode())
+    digest.update(X.tobytes())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    digest.update(sklearn.__version__.encode())
+    
+    return f"{name}-{digest.hexdigest()[:16]}"
+
+
+def artifact_path(key: str, models_dir: Optional[Path] = None) -> Path:
+    """Ruta del fichero de un artefacto."""
+    return (models_dir or MODELS_DIR) / f"{key}.joblib"
+
+
+def load_artifact(key: str, models_dir: Optional[Path] = None) -> Optional[Any]:
+    """
+    Carga un artefacto con memory-mapping de sus arrays.
+    
+    Args:
+        key: Clave devuelta por artifact_key
+        models_dir: Directorio de artefactos (usa default si None)
+    
+    Returns:
+        Objeto guardado, o None si no existe o no se puede leer
+    """
+    path = artifact_path(key, models_dir)
+    
+    if not path.exists():
+        return None
+    
+    try:
+        return joblib.load(path, mmap_mode='r')
+    except Exception:
+        # Artefacto corrupto o de una versión incompatible: se reajusta
+        return None
+
+
+def save_artifact(key: str, artifact: Any, models_dir: Optional[Path] = None) -> Path:
+    """
+    Guarda un artefacto sin comprimir (requisito para memory-mapping).
+    
+    La escritura es atómica (fichero temporal + os.replace), de modo que
+    varios workers pueden competir por la misma clave sin leer ficheros
+    a medio escribir.
+    
+    Args:
+        key: Clave devuelta por artifact_key
+        artifact: Objeto a guardar (modelo o diccionario de modelos)
+        models_dir: Directorio de artefactos (usa default si None)
+    
+    Returns:
+        Ruta del artefacto guardado
+    """
+    path = artifact_path(key, models_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(fd)
+    
+    try:
+        joblib.dump(artifact, tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    return path
+
+
+def get_or_fit(name: str, X, params: Optional[dict], fit: Callable[[], Any],
+               models_dir: Optional[Path] = None) -> Any:
+    """
+    Devuelve el artefacto persistido o lo ajusta y lo guarda.
+    
+    Si el directorio no es escribible el modelo se usa igualmente, solo
+    que sin persistir.
+    
+    Args:
+        name: Nombre lógico del modelo
+        X: Matriz de features de entrada (parte de la clave)
+        params: Hiperparámetros (parte de la clave)
+        fit: Función sin argumentos que ajusta y devuelve el artefacto
+        models_dir: Directorio de artefactos (usa default si None)
+    
+    Returns:
+        Artefacto cargado (memory-mapped) o recién ajustado
+    """
+    key = artifact_key(name, X, params)
+    
+    artifact = load_artifact(key, models_dir)
+    if artifact is not None:
+        return artifact
+    
+    artifact = fit()
+    
+    try:
+        save_artifact(key, artifact, models_dir)
+    except OSError:
+        pass
+    
+    return artifact
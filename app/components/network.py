@@ -0,0 +1,349 @@
+"""
+Centralidad en la Red de Migración
+==================================
+
+Métricas de red sobre la matriz de adyacencia dispersa (CSR) de los flujos
+origen → destino, ponderada por número de investigadores: PageRank
+ponderado, hubs y autoridades (HITS), intermediación aproximada con
+pivotes y reciprocidad. PageRank y HITS son iteraciones de potencias con
+productos matriz dispersa × vector; la intermediación acumula los árboles
+de caminos mínimos de todos los pivotes a la vez.
+
+Incluye además la detección de comunidades (Louvain, maximizando la
+modularidad del grafo no dirigido de flujos) que usa el preprocesamiento
+para agrupar países por sus patrones de movilidad.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import shortest_path
+from typing import Dict, Optional, Tuple
+
+
+# Factor de amortiguación de PageRank
+DAMPING = 0.85
+
+# Convergencia de las iteraciones de potencias (norma L1)
+POWER_TOL = 1e-10
+POWER_MAX_ITER = 1000
+
+# Pivotes (orígenes de caminos) de la intermediación aproximada
+BETWEENNESS_PIVOTS = 100
+RANDOM_STATE = 42
+
+# Resolución de la modularidad (> 1 favorece comunidades más pequeñas)
+LOUVAIN_RESOLUTION = 1.0
+LOUVAIN_MAX_LEVELS = 10
+
+CENTRALITY_COLUMNS = {
+    'pagerank': 'PageRank',
+    'authority': 'Autoridad (HITS)',
+    'hub': 'Hub (HITS)',
+    'betweenness': 'Intermediación',
+    'reciprocity': 'Reciprocidad'
+}
+
+
+def flow_adjacency(df_flows: pd.DataFrame) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    """
+    Matriz de adyacencia ponderada (investigadores) de los flujos.
+    
+    Args:
+        df_flows: Flujos con origin, destination y n_researchers
+    
+    Returns:
+        Tupla (países ordenados, W CSR con W[i, j] = flujo i → j)
+    """
+    origin = df_flows['origin'].astype(str).to_numpy()
+    destination = df_flows['destination'].astype(str).to_numpy()
+    countries = np.union1d(origin, destination)
+    
+    W = sparse.csr_matrix(
+        (df_flows['n_researchers'].to_numpy(dtype=np.float64),
+         (np.searchsorted(countries, origin), np.searchsorted(countries, destination))),
+        shape=(len(countries), len(countries))
+    )
+    W.eliminate_zeros()
+    
+    return countries, W
+
+
+def pagerank(W: sparse.csr_matrix, damping: float = DAMPING, tol: float = POWER_TOL,
+             max_iter: int = POWER_MAX_ITER) -> np.ndarray:
+    """
+    PageRank ponderado: un investigador sigue los flujos salientes en
+    proporción a su peso y, con probabilidad 1 - damping (o desde países
+    sin emigración), salta a un país al azar.
+    
+    Args:
+        W: Adyacencia ponderada (CSR)
+        damping: Factor de amortiguación
+        tol: Tolerancia (norma L1 entre iteraciones)
+        max_iter: Iteraciones máximas
+    
+    Returns:
+        Puntuaciones (suman 1)
+    """
+    n = W.shape[0]
+    outflow = np.asarray(W.sum(axis=1)).ravel()
+    dangling = outflow == 0
+    inverse = np.divide(1.0, outflow, out=np.zeros(n), where=~dangling)
+    WT = W.T.tocsr()
+    
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new_x = damping * (WT @ (x * inverse)) + (damping * x[dangling].sum() + 1 - damping) / n
+        if np.abs(new_x - x).sum() < tol:
+            return new_x
+        x = new_x
+    
+    return x
+
+
+def hits(W: sparse.csr_matrix, tol: float = POWER_TOL, max_iter: int = POWER_MAX_ITER) -> Dict[str, np.ndarray]:
+    """
+    Hubs y autoridades ponderados (HITS) por iteración de potencias.
+    
+    Un hub envía investigadores a buenas autoridades; una autoridad los
+    recibe de buenos hubs.
+    
+    Args:
+        W: Adyacencia ponderada (CSR)
+        tol: Tolerancia (norma L1 entre iteraciones de los hubs)
+        max_iter: Iteraciones máximas
+    
+    Returns:
+        Diccionario con hub y authority (cada uno suma 1)
+    """
+    WT = W.T.tocsr()
+    hub = np.full(W.shape[0], 1.0 / W.shape[0])
+    
+    for _ in range(max_iter):
+        authority = WT @ hub
+        authority /= authority.sum()
+        new_hub = W @ authority
+        new_hub /= new_hub.sum()
+        if np.abs(new_hub - hub).sum() < tol:
+            hub = new_hub
+            break
+        hub = new_hub
+    
+    return {'hub': hub, 'authority': authority}
+
+
+def approximate_betweenness(W: sparse.csr_matrix, n_pivots: int = BETWEENNESS_PIVOTS,
+                            seed: Optional[int] = RANDOM_STATE) -> np.ndarray:
+    """
+    Intermediación aproximada con caminos mínimos desde una muestra de pivotes.
+    
+    La longitud de cada arista es 1 / flujo (los corredores intensos son
+    "cortos"). Para cada pivote, la intermediación de un país es el número
+    de destinos de su subárbol en el árbol de caminos mínimos; los
+    subárboles de todos los pivotes se acumulan a la vez, recorriendo los
+    países por distancia decreciente. Se reescala por n / pivotes y se
+    normaliza por (n - 1)(n - 2).
+    
+    Args:
+        W: Adyacencia ponderada (CSR)
+        n_pivots: Número de pivotes (exacta si >= número de países)
+        seed: Semilla de la muestra de pivotes
+    
+    Returns:
+        Intermediación normalizada por país (0 a 1)
+    """
+    n = W.shape[0]
+    if n < 3:
+        return np.zeros(n)
+    
+    pivots = np.arange(n) if n_pivots >= n else np.sort(
+        np.random.default_rng(seed).choice(n, size=n_pivots, replace=False)
+    )
+    
+    lengths = W.copy()
+    lengths.data = 1.0 / lengths.data
+    distance, predecessor = shortest_path(lengths, method='D', directed=True, indices=pivots,
+                                          return_predecessors=True)
+    
+    reachable = np.isfinite(distance)
+    descendants = reachable.astype(np.float64)
+    rows = np.arange(pivots.size)
+    
+    # Más lejanos primero: cada país suma su subárbol al de su predecesor
+    order = np.argsort(np.where(reachable, -distance, np.inf), axis=1, kind='stable')
+    for position in range(n):
+        node = order[:, position]
+        parent = predecessor[rows, node]
+        valid = parent >= 0
+        descendants[rows[valid], parent[valid]] += descendants[rows[valid], node[valid]]
+    
+    # Cada país intermedia los caminos hacia los destinos de su subárbol (sin él mismo)
+    through = np.where(reachable, descendants - 1, 0.0)
+    through[rows, pivots] = 0.0
+    
+    return through.sum(axis=0) * (n / pivots.size) / ((n - 1) * (n - 2))
+
+
+def reciprocity(W: sparse.csr_matrix) -> np.ndarray:
+    """
+    Reciprocidad ponderada por país: parte de sus flujos compensada por el
+    flujo inverso, 2 Σ_j min(w_ij, w_ji) / (emigración + inmigración).
+    
+    Args:
+        W: Adyacencia ponderada (CSR)
+    
+    Returns:
+        Reciprocidad por país (0 = flujos en un solo sentido, 1 = equilibrados)
+    """
+    mutual = np.asarray(W.minimum(W.T).sum(axis=1)).ravel()
+    volume = np.asarray(W.sum(axis=1)).ravel() + np.asarray(W.sum(axis=0)).ravel()
+    
+    return np.divide(2 * mutual, volume, out=np.zeros_like(mutual), where=volume > 0)
+
+
+def modularity(A: sparse.csr_matrix, labels: np.ndarray, resolution: float = LOUVAIN_RESOLUTION) -> float:
+    """
+    Modularidad de una partición de un grafo no dirigido ponderado.
+    
+    Args:
+        A: Adyacencia simétrica (CSR)
+        labels: Comunidad de cada nodo (0..K-1)
+        resolution: Resolución de la modularidad
+    
+    Returns:
+        Q = Σ_c [w_c / 2m - resolution · (k_c / 2m)²]
+    """
+    membership = sparse.csr_matrix(
+        (np.ones(labels.size), (np.arange(labels.size), labels)), shape=(labels.size, labels.max() + 1)
+    )
+    internal = (membership.T @ A @ membership).diagonal()
+    degree = np.asarray(membership.T @ A.sum(axis=1)).ravel()
+    two_m = degree.sum()
+    
+    return float((internal / two_m - resolution * (degree / two_m) ** 2).sum())
+
+
+def _local_moving(A: sparse.csr_matrix, resolution: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Fase local de Louvain: mueve cada nodo a la comunidad vecina con mayor
+    ganancia de modularidad hasta que ningún movimiento mejora.
+    
+    Returns:
+        Comunidad de cada nodo, renumerada 0..K-1
+    """
+    n = A.shape[0]
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    two_m = degree.sum()
+    community = np.arange(n)
+    total = degree.copy()
+    
+    moved = True
+    while moved:
+        moved = False
+        for node in rng.permutation(n):
+            neighbors = A.indices[A.indptr[node]:A.indptr[node + 1]]
+            weights = A.data[A.indptr[node]:A.indptr[node + 1]]
+            others = neighbors != node
+            
+            own = community[node]
+            total[own] -= degree[node]
+            
+            # Peso hacia cada comunidad vecina (más la propia, aunque no haya enlaces)
+            candidates, inverse = np.unique(
+                np.append(community[neighbors[others]], own), return_inverse=True
+            )
+            links = np.bincount(inverse, np.append(weights[others], 0.0), minlength=candidates.size)
+            gain = links - resolution * total[candidates] * degree[node] / two_m
+            
+            best = candidates[np.argmax(gain)]
+            if best != own and gain.max() > gain[np.searchsorted(candidates, own)] + 1e-12:
+                community[node] = best
+                moved = True
+            total[community[node]] += degree[node]
+    
+    return np.unique(community, return_inverse=True)[1]
+
+
+def louvain_communities(W: sparse.csr_matrix, resolution: float = LOUVAIN_RESOLUTION,
+                        seed: Optional[int] = RANDOM_STATE, max_levels: int = LOUVAIN_MAX_LEVELS) -> np.ndarray:
+    """
+    Comunidades de Louvain del grafo de flujos (sin dirección: w_ij + w_ji).
+    
+    Alterna la fase local con la agregación de cada comunidad en un nodo
+    (S^T A S, con S la matriz dispersa de pertenencia) hasta que la
+    partición no cambia.
+    
+    Args:
+        W: Adyacencia ponderada (CSR)
+        resolution: Resolución de la modularidad
+        seed: Semilla del orden de visita de los nodos
+        max_levels: Niveles de agregación máximos
+    
+    Returns:
+        Comunidad de cada país (0..K-1)
+    """
+    A = (W + W.T).tocsr()
+    labels = np.arange(A.shape[0])
+    
+    if A.nnz == 0:
+        return labels
+    
+    rng = np.random.default_rng(seed)
+    for _ in range(max_levels):
+        partition = _local_moving(A, resolution, rng)
+        n_communities = partition.max() + 1
+        if n_communities == A.shape[0]:
+            break
+        
+        labels = partition[labels]
+        membership = sparse.csr_matrix(
+            (np.ones(partition.size), (np.arange(partition.size), partition)),
+            shape=(partition.size, n_communities)
+        )
+        A = (membership.T @ A @ membership).tocsr()
+    
+    return labels
+
+
+def compute_centrality(df_flows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Métricas de centralidad de todos los países de los flujos.
+    
+    Args:
+        df_flows: Flujos con origin, destination y n_researchers
+    
+    Returns:
+        DataFrame con country y las columnas de CENTRALITY_COLUMNS
+    """
+    countries, W = flow_adjacency(df_flows)
+    
+    if W.nnz == 0:
+        return pd.DataFrame(columns=['country', *CENTRALITY_COLUMNS])
+    
+    hubs_authorities = hits(W)
+    
+    return pd.DataFrame({
+        'country': countries,
+        'pagerank': pagerank(W),
+        'authority': hubs_authorities['authority'],
+        'hub': hubs_authorities['hub'],
+        'betweenness': approximate_betweenness(W),
+        'reciprocity': reciprocity(W)
+    })
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_network_centrality(_df_flows: pd.DataFrame, signature: tuple, version: tuple) -> pd.DataFrame:
+    """
+    Centralidad de los países, cacheada por firma de filtros y versión del dataset.
+    
+    Args:
+        _df_flows: Flujos ya filtrados (no se hashea)
+        signature: Firma de los filtros aplicados
+        version: Versión del dataset (ver get_dataset_version)
+    
+    Returns:
+        DataFrame de compute_centrality
+    """
+    return compute_centrality(_df_flows)
@@ -0,0 +1,264 @@
+"""
+Constructor de Diagramas Sankey
+===============================
+
+Construye diagramas Sankey de flujos migratorios indexando nodos de forma
+vectorizada (pd.factorize) y cachea la especificación final de la figura
+por nivel de agregación, número de flujos y firma de filtros.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from typing import Dict, Optional
+
+from components.data_loader import DataLoader
+
+
+# Etiqueta del nodo que agrupa los flujos fuera del top N
+OTHER_NODE_LABEL = 'Otros flujos'  # Distinto de la región 'Otros'
+
+# Colores por región
+REGION_COLORS = {
+    'Europa': 'rgba(46, 134, 171, 0.8)',
+    'Norteamérica': 'rgba(241, 143, 1, 0.8)',
+    'Asia': 'rgba(162, 59, 114, 0.8)',
+    'Sudamérica': 'rgba(6, 167, 125, 0.8)',
+    'Oceanía': 'rgba(108, 117, 125, 0.8)',
+    'África': 'rgba(208, 0, 0, 0.8)',
+    'Asia Oriental y Pacífico': 'rgba(162, 59, 114, 0.8)',
+    'Europa y Asia Central': 'rgba(46, 134, 171, 0.8)',
+    'América Latina y Caribe': 'rgba(6, 167, 125, 0.8)',
+    'Oriente Medio y Norte de África': 'rgba(199, 125, 255, 0.8)',
+    'Asia Meridional': 'rgba(255, 209, 102, 0.8)',
+    'África Subsahariana': 'rgba(208, 0, 0, 0.8)',
+    'Otros': 'rgba(200, 200, 200, 0.8)'
+}
+
+# Niveles de agregación del Sankey por grupos (ver GROUPINGS)
+SANKEY_LEVELS = {
+    'region': 'Región a Región',
+    'income': 'Ingreso a Ingreso',
+    'community': 'Comunidad a Comunidad'
+}
+
+SANKEY_TITLES = {
+    'region': 'Flujos Migratorios por Región Geográfica',
+    'income': 'Flujos Migratorios por Nivel de Ingreso',
+    'community': 'Flujos Migratorios entre Comunidades de la Red'
+}
+
+DEFAULT_NODE_COLOR = 'rgba(200, 200, 200, 0.8)'
+LINK_COLOR = 'rgba(100, 150, 200, 0.3)'
+
+
+def build_sankey_links(
+    sources,
+    targets,
+    values,
+    top_n: int,
+    aggregate_tail: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Selecciona los top N flujos y construye los índices de nodos del Sankey.
+    
+    Con aggregate_tail, los flujos fuera del top N se agregan: sus extremos
+    que no son nodos del top se sustituyen por el nodo OTHER_NODE_LABEL y los enlaces
+    resultantes se suman, de modo que el número de enlaces queda acotado
+    por el número de nodos visibles y no por el tamaño de la cola.
+    
+    Args:
+        sources: Etiquetas de origen de cada flujo
+        targets: Etiquetas de destino de cada flujo
+        values: Volumen de cada flujo
+        top_n: Número de flujos a mostrar individualmente
+        aggregate_tail: Agregar el resto de flujos en el nodo OTHER_NODE_LABEL
+    
+    Returns:
+        Diccionario con labels (nodos) y arrays source, target y value
+    """
+    sources = np.asarray(sources, dtype=object)
+    targets = np.asarray(targets, dtype=object)
+    values = np.asarray(values, dtype=np.float64)
+    
+    # Top N por volumen (orden estable, como nlargest)
+    order = np.argsort(-values, kind='stable')
+    head, tail = order[:top_n], order[top_n:]
+    
+    link_sources = sources[head]
+    link_targets = targets[head]
+    link_values = values[head]
+    
+    if aggregate_tail and tail.size:
+        visible = pd.unique(np.concatenate([link_sources, link_targets]))
+        tail_sources = np.where(np.isin(sources[tail], visible), sources[tail], OTHER_NODE_LABEL)
+        tail_targets = np.where(np.isin(targets[tail], visible), targets[tail], OTHER_NODE_LABEL)
+        
+        tail_links = pd.DataFrame({
+            'source': tail_sources,
+            'target': tail_targets,
+            'value': values[tail]
+        })
+        # Los flujos entre nodos no visibles quedarían como bucle sobre OTHER_NODE_LABEL
+        tail_links = tail_links[tail_links['source'] != tail_links['target']]
+        tail_links = tail_links.groupby(['source', 'target'], sort=False)['value'].sum().reset_index()
+        
+        link_sources = np.concatenate([link_sources, tail_links['source'].to_numpy(dtype=object)])
+        link_targets = np.concatenate([link_targets, tail_links['target'].to_numpy(dtype=object)])
+        link_values = np.concatenate([link_values, tail_links['value'].to_numpy()])
+    
+    # Índices de nodos: una sola factorización para orígenes y destinos
+    n_links = len(link_sources)
+    codes, labels = pd.factorize(np.concatenate([link_sources, link_targets]))
+    
+    return {
+        'labels': np.asarray(labels, dtype=object),
+        'source': codes[:n_links],
+        'target': codes[n_links:],
+        'value': link_values
+    }
+
+
+def create_sankey_figure(
+    links: Dict[str, np.ndarray],
+    title: str,
+    node_colors=None,
+    height: int = 700,
+    font_size: int = 12
+) -> go.Figure:
+    """
+    Crea la figura Sankey a partir de los enlaces ya indexados.
+    
+    Args:
+        links: Diccionario devuelto por build_sankey_links
+        title: Título del diagrama
+        node_colors: Colores de los nodos (por defecto, paleta por índice)
+        height: Altura en píxeles
+        font_size: Tamaño de fuente
+    
+    Returns:
+        Figura Plotly con el diagrama Sankey
+    """
+    if node_colors is None:
+        node_colors = _index_colors(len(links['labels']))
+    
+    fig = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="white", width=0.5),
+            label=links['labels'],
+            color=node_colors
+        ),
+        link=dict(
+            source=links['source'],
+            target=links['target'],
+            value=links['value'],
+            color=[LINK_COLOR] * len(links['value'])
+        )
+    )])
+    
+    fig.update_layout(
+        title=title,
+        font=dict(size=font_size),
+        height=height,
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig
+
+
+def create_sankey_countries(df: pd.DataFrame, top_n: int = 30, aggregate_tail: bool = False) -> go.Figure:
+    """Crea diagrama Sankey de flujos entre países."""
+    
+    links = build_sankey_links(
+        df['origin_iso3'].to_numpy(dtype=object),
+        df['destination_iso3'].to_numpy(dtype=object),
+        df['n_researchers'].to_numpy(dtype='float64'),
+        top_n,
+        aggregate_tail
+    )
+    
+    return create_sankey_figure(
+        links,
+        title=f"Top {top_n} Flujos Migratorios: País a País",
+        height=700,
+        font_size=12
+    )
+
+
+def create_sankey_regional(region_flows: pd.DataFrame, top_n: Optional[int] = None,
+                           aggregate_tail: bool = False, title: str = SANKEY_TITLES['region']) -> go.Figure:
+    """Crea diagrama Sankey de flujos entre regiones (u otros grupos de países)."""
+    
+    links = build_sankey_links(
+        region_flows['origin_region'].to_numpy(dtype=object),
+        region_flows['destination_region'].to_numpy(dtype=object),
+        region_flows['n_researchers'].to_numpy(dtype='float64'),
+        len(region_flows) if top_n is None else top_n,
+        aggregate_tail
+    )
+    
+    index_colors = _index_colors(len(links['labels']))
+    node_colors = [
+        DEFAULT_NODE_COLOR if r == OTHER_NODE_LABEL else REGION_COLORS.get(r, index_colors[i])
+        for i, r in enumerate(links['labels'])
+    ]
+    
+    return create_sankey_figure(
+        links,
+        title=title,
+        node_colors=node_colors,
+        height=600,
+        font_size=14
+    )
+
+
+@st.cache_data(ttl=3600, max_entries=64)
+def get_sankey_spec(
+    level: str,
+    n_flows: int,
+    signature: tuple,
+    version: tuple,
+    _df: pd.DataFrame,
+    _data_loader: DataLoader,
+    aggregate_tail: bool = False
+) -> dict:
+    """
+    Devuelve la especificación (dict) de la figura Sankey, cacheada.
+    
+    La clave de caché es (nivel, número de flujos, firma de filtros,
+    versión del dataset, agregación de cola); el DataFrame y el cargador no
+    se hashean. La versión incluye country_groups.parquet, del que dependen
+    los niveles por grupos.
+    
+    Args:
+        level: 'country' (país a país) o una clave de SANKEY_LEVELS (grupo a grupo)
+        n_flows: Número de flujos a mostrar
+        signature: Firma de los filtros aplicados a _df
+        version: Versión del dataset (ver get_dataset_version)
+        _df: DataFrame de flujos ya filtrado
+        _data_loader: Cargador de datos compartido
+        aggregate_tail: Agregar los flujos restantes en el nodo OTHER_NODE_LABEL
+    
+    Returns:
+        Diccionario con la especificación de la figura Plotly
+    """
+    if level in SANKEY_LEVELS:
+        region_flows = _data_loader.get_regional_flows(_df, level)
+        fig = create_sankey_regional(region_flows, n_flows, aggregate_tail, SANKEY_TITLES[level])
+    else:
+        fig = create_sankey_countries(_df, n_flows, aggregate_tail)
+    
+    return fig.to_dict()
+
+
+def _index_colors(n_nodes: int) -> list:
+    """Colores deterministas por índice de nodo (vectorizado)."""
+    idx = np.arange(n_nodes)
+    red = (idx * 67) % 200 + 50
+    green = (idx * 131 + 80) % 200 + 50
+    return [f'rgba({r}, {g}, 180, 0.8)' for r, g in zip(red, green)]
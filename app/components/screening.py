@@ -0,0 +1,199 @@
+"""
+Cribado de Indicadores WDI
+==========================
+
+Correlaciona todas las series WDI disponibles (media país × años
+recientes) con el saldo migratorio de cada país en una sola operación
+matricial con máscara de datos faltantes, y ordena los indicadores por
+q-valor (Benjamini-Hochberg) para descubrir factores asociados sin elegir
+los indicadores a mano.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from typing import Tuple
+
+from components.data_loader import DataLoader
+from components.choropleth import get_country_index
+from components.correlation import MIN_PERIODS, correlation_p_values, adjust_p_values_bh
+
+
+# Años promediados por país para cada indicador
+SCREENING_YEARS = (2012, 2016)
+
+# Países mínimos con dato para evaluar un indicador
+MIN_COUNTRIES = 20
+
+# Tasa de falsos descubrimientos para marcar un indicador como significativo
+FDR_ALPHA = 0.05
+
+# Variables migratorias por país que se pueden cribar (clave → etiqueta)
+SCREENING_TARGETS = {
+    'net_balance': 'Saldo neto',
+    'immigration': 'Inmigración',
+    'emigration': 'Emigración',
+    'total_flow': 'Flujo total'
+}
+
+
+def build_indicator_matrix(df_wdi: pd.DataFrame, years: Tuple[int, int] = SCREENING_YEARS) -> pd.DataFrame:
+    """
+    Matriz país × indicador con la media de los años indicados.
+    
+    Args:
+        df_wdi: Panel WDI largo con iso3, IndicatorCode, Year y Value
+        years: Rango de años (inclusivo)
+    
+    Returns:
+        DataFrame indexado por iso3 con una columna por IndicatorCode
+    """
+    recent = df_wdi[df_wdi['Year'].between(*years) & df_wdi['Value'].notna()]
+    
+    return recent.pivot_table(index='iso3', columns='IndicatorCode', values='Value', aggfunc='mean')
+
+
+def _masked_pearson(X: np.ndarray, Y: np.ndarray, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson columna a columna entre X e Y (n × p) sobre las filas de mask.
+    
+    Todas las sumas se obtienen con reducciones por columna sobre arrays
+    puestos a cero fuera de la máscara, tras centrar cada columna en su
+    media sobre la máscara (dos pasadas, sin cancelación con
+    desplazamientos grandes).
+    """
+    M = mask.astype(np.float64)
+    n = M.sum(axis=0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = np.where(mask, X, 0.0).sum(axis=0) / n
+        mean_y = np.where(mask, Y, 0.0).sum(axis=0) / n
+    
+    X0 = np.where(mask, X - mean_x, 0.0)
+    Y0 = np.where(mask, Y - mean_y, 0.0)
+    
+    var_x = np.einsum('ij,ij->j', X0, X0)
+    var_y = np.einsum('ij,ij->j', Y0, Y0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.einsum('ij,ij->j', X0, Y0) / np.sqrt(var_x * var_y)
+    
+    # Varianza nula (salvo error de redondeo respecto a la escala de los
+    # datos): correlación indefinida
+    r[(var_x <= 1e-24 * n * mean_x ** 2) | (var_y <= 1e-24 * n * mean_y ** 2)] = np.nan
+    
+    return np.clip(r, -1.0, 1.0), n.astype(np.int64)
+
+
+def _masked_target_ranks(y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Rangos medios de y dentro de las filas válidas de cada columna (n × p).
+    
+    Con y agrupado por valores únicos, el rango de una fila en la columna j
+    es el número de filas válidas con valor menor más la mitad (+1) de sus
+    empates válidos; ambos salen de una suma acumulada por columna.
+    """
+    values, group = np.unique(y, return_inverse=True)
+    
+    counts = np.zeros((values.size, mask.shape[1]))
+    np.add.at(counts, group, mask.astype(np.float64))
+    below = np.cumsum(counts, axis=0) - counts
+    
+    return below[group] + (counts[group] + 1) / 2
+
+
+def screen_indicators(matrix: pd.DataFrame, target: pd.Series, method: str = 'pearson',
+                      min_obs: int = MIN_COUNTRIES) -> pd.DataFrame:
+    """
+    Correlación de cada indicador con la variable objetivo (datos faltantes por pares).
+    
+    Para Spearman los rangos del indicador y del objetivo se recalculan
+    sobre las filas comunes de cada columna, igual que un Spearman por
+    pares, pero sin bucles sobre los indicadores.
+    
+    Args:
+        matrix: Matriz país × indicador (ver build_indicator_matrix)
+        target: Variable objetivo indexada como matrix
+        method: 'pearson' o 'spearman'
+        min_obs: Países comunes mínimos (si no, NaN)
+    
+    Returns:
+        DataFrame con IndicatorCode, r, n, p_value y q_value
+    """
+    y = target.reindex(matrix.index).to_numpy(dtype=np.float64)
+    rows = np.isfinite(y)
+    
+    X = matrix.to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+    y = y[rows]
+    mask = np.isfinite(X)
+    
+    if method == 'spearman':
+        X = pd.DataFrame(X).rank(axis=0).to_numpy()
+        Y = _masked_target_ranks(y, mask)
+    else:
+        Y = np.broadcast_to(y[:, None], X.shape)
+    
+    r, n = _masked_pearson(X, Y, mask)
+    r[n < max(min_obs, MIN_PERIODS)] = np.nan
+    
+    p_value = correlation_p_values(r, n)
+    p_value[np.isnan(r)] = np.nan
+    
+    return pd.DataFrame({
+        'IndicatorCode': matrix.columns.to_numpy(dtype=object),
+        'r': r,
+        'n': n,
+        'p_value': p_value,
+        'q_value': adjust_p_values_bh(p_value)
+    })
+
+
+@st.cache_data(ttl=3600, show_spinner="Cribando indicadores WDI...")
+def get_indicator_screening(_data_loader: DataLoader, _df_flows: pd.DataFrame, signature: tuple,
+                            version: tuple, target: str = 'net_balance', method: str = 'pearson',
+                            min_obs: int = MIN_COUNTRIES) -> pd.DataFrame:
+    """
+    Cribado de todas las series WDI frente a una variable migratoria por país.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        _df_flows: Flujos filtrados
+        signature: Firma de los filtros aplicados (clave de caché)
+        version: Versión del dataset (ver get_dataset_version)
+        target: Columna de compute_net_migration (ver SCREENING_TARGETS)
+        method: 'pearson' o 'spearman'
+        min_obs: Países comunes mínimos por indicador
+    
+    Returns:
+        DataFrame con IndicatorCode, IndicatorName, Topic, r, n, p_value,
+        q_value y significant, ordenado por q-valor y |r|
+    """
+    matrix = build_indicator_matrix(_data_loader.load_wdi_panel(*SCREENING_YEARS))
+    if matrix.empty or _df_flows.empty:
+        return pd.DataFrame()
+    
+    # Saldo migratorio por país (ISO2) → ISO3 del WDI
+    countries, iso3 = get_country_index(_data_loader, version)
+    iso_map = pd.Series(iso3, index=countries)
+    
+    net_migration = _data_loader.compute_net_migration(_df_flows)
+    target_values = net_migration.set_index(
+        net_migration['country'].astype(str).map(iso_map)
+    )[target]
+    target_values = target_values[target_values.index.notna()]
+    target_values = target_values.groupby(level=0).sum()
+    
+    result = screen_indicators(matrix, target_values, method, min_obs)
+    result = result[result['r'].notna()]
+    
+    series = _data_loader.load_wdi_series()
+    result = result.merge(series, on='IndicatorCode', how='left')
+    result['IndicatorName'] = result['IndicatorName'].fillna(result['IndicatorCode'])
+    result['Topic'] = result['Topic'].fillna('Sin clasificar')
+    result['significant'] = result['q_value'] < FDR_ALPHA
+    
+    result = result.assign(abs_r=result['r'].abs()).sort_values(
+        ['q_value', 'abs_r'], ascending=[True, False]
+    ).drop(columns='abs_r').reset_index(drop=True)
+    
+    return result[['IndicatorCode', 'IndicatorName', 'Topic', 'r', 'n', 'p_value', 'q_value', 'significant']]
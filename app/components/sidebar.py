@@ -11,6 +11,10 @@ from components.data_loader import DataLoader
 from config.settings import ABOUT_TEXT, YEAR_MIN, YEAR_MAX, TOP_N_DEFAULT
 
 
+# Resultados máximos del buscador del catálogo WDI
+WDI_SEARCH_LIMIT = 25
+
+
 def render_sidebar(data_loader: DataLoader) -> Dict:
     """
     Renderiza el sidebar con navegación y filtros.
@@ -128,6 +132,14 @@ def render_sidebar(data_loader: DataLoader) -> Dict:
         
         st.markdown("---")
         
+        # =================================================================
+        # CATÁLOGO WDI
+        # =================================================================
+        
+        render_wdi_catalog_search(data_loader)
+        
+        st.markdown("---")
+        
         # =================================================================
         # INFORMACIÓN Y AYUDA
         # =================================================================
@@ -169,3 +181,60 @@ def render_sidebar(data_loader: DataLoader) -> Dict:
         'min_researchers': min_researchers,
         'top_n': top_n
     }
+
+
+@st.fragment
+def render_wdi_catalog_search(data_loader: DataLoader):
+    """
+    Buscador del catálogo de indicadores WDI.
+    
+    Se ejecuta como fragmento: escribir en el buscador o elegir un
+    indicador no re-ejecuta la página. El indicador elegido queda en
+    st.session_state['wdi_indicator'].
+    
+    Args:
+        data_loader: Instancia del cargador de datos
+    """
+    st.markdown("### 🔎 Catálogo WDI")
+    
+    query = st.text_input(
+        "Buscar indicador",
+        placeholder="p. ej. gdp per capita, NY.GDP",
+        key="wdi_catalog_query",
+        help="Busca por nombre, tema, definición o código de la serie"
+    )
+    
+    if not query.strip():
+        return
+    
+    results = data_loader.search_wdi_indicators(query, WDI_SEARCH_LIMIT)
+    
+    if results.empty:
+        st.caption("Sin resultados")
+        return
+    
+    names = dict(zip(results['IndicatorCode'], results['IndicatorName']))
+    indicator_code = st.selectbox(
+        f"{len(results)} resultados",
+        options=list(names),
+        format_func=lambda code: f"{names[code]} ({code})",
+        key="wdi_indicator"
+    )
+    
+    catalog = data_loader.load_wdi_catalog()['catalog']
+    info = catalog[catalog['IndicatorCode'] == indicator_code].iloc[0]
+    
+    st.caption(f"**{info['Topic']}**")
+    definition = info['ShortDefinition'] if isinstance(info['ShortDefinition'], str) else info['LongDefinition']
+    st.caption(definition if len(definition) <= 300 else definition[:300].rsplit(' ', 1)[0] + '…')
+    
+    series = data_loader.load_wdi_indicator(indicator_code)
+    
+    if series.empty:
+        st.caption("ℹ️ Serie no incluida en el almacén de datos procesados")
+        return
+    
+    st.caption(
+        f"{series['iso3'].nunique()} países · {series['Year'].min()}-{series['Year'].max()}"
+    )
+    st.line_chart(series.groupby('Year')['Value'].median(), height=150)
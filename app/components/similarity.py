@@ -0,0 +1,225 @@
+"""
+Índice de Países Similares
+==========================
+
+Perfil de cada país en bloques —mezcla de inmigración y emigración,
+reparto de destinos, reparto de orígenes e indicadores WDI— normalizados
+para que cada bloque pese lo mismo, e indexados en un KD-tree
+(scikit-learn). Los repartos se representan por la raíz de las cuotas
+(la distancia euclídea es entonces la de Hellinger) y se reducen con SVD
+truncada a pocas dimensiones, donde el árbol es eficaz. El índice se
+construye una vez por versión del dataset y bloques elegidos; cada
+consulta de vecinos es un recorrido del árbol de microsegundos.
+"""
+
+import time
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.neighbors import KDTree
+from typing import Dict
+
+from config.settings import WDI_FEATURES
+from components.data_loader import DataLoader
+from components.choropleth import get_country_index
+from components.network import flow_adjacency
+
+
+PROFILE_BLOCKS = {
+    'mix': 'Mezcla entrada/salida',
+    'destinations': 'Destinos',
+    'origins': 'Orígenes',
+    'wdi': 'Indicadores WDI'
+}
+
+# Dimensiones de los repartos de destinos y orígenes tras la SVD
+SHARE_COMPONENTS = 8
+
+# Flujo total mínimo (inmigración + emigración) para indexar un país
+MIN_TOTAL_FLOW = 10
+
+# Indicadores WDI con escala logarítmica
+LOG_WDI_FEATURES = ('gdp_per_capita', 'population', 'researchers_per_million')
+
+NEIGHBORS_DEFAULT = 8
+NEIGHBORS_MAX = 20
+LEAF_SIZE = 16
+RANDOM_STATE = 42
+
+
+def standardize(B: np.ndarray) -> np.ndarray:
+    """Puntuaciones z por columna; los valores ausentes quedan en la media (0)."""
+    mean = np.nanmean(B, axis=0)
+    std = np.nanstd(B, axis=0)
+    return np.nan_to_num((B - mean) / np.where(std > 0, std, 1.0), nan=0.0)
+
+
+def normalize_block(B: np.ndarray) -> np.ndarray:
+    """
+    Centra un bloque y lo escala a varianza total 1.
+    
+    Así cada bloque aporta lo mismo, en promedio, a la distancia al
+    cuadrado, tenga las dimensiones que tenga.
+    
+    Args:
+        B: Matriz países × dimensiones del bloque
+    
+    Returns:
+        Bloque normalizado
+    """
+    B = B - B.mean(axis=0)
+    total_variance = B.var(axis=0).sum()
+    return B / np.sqrt(total_variance) if total_variance > 0 else B
+
+
+def share_embedding(counts: sparse.csr_matrix, n_components: int = SHARE_COMPONENTS) -> np.ndarray:
+    """
+    Embebido de Hellinger de los repartos por fila, reducido con SVD truncada.
+    
+    Args:
+        counts: Matriz dispersa países × socios (flujos)
+        n_components: Dimensiones del embebido
+    
+    Returns:
+        Matriz países × n_components
+    """
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    shares = (sparse.diags(1.0 / np.where(totals > 0, totals, 1.0)) @ counts).tocsr()
+    shares.data = np.sqrt(shares.data)
+    
+    n_components = min(n_components, min(shares.shape) - 1)
+    return TruncatedSVD(n_components=n_components, random_state=RANDOM_STATE).fit_transform(shares)
+
+
+def build_profiles(df_flows: pd.DataFrame, wdi_country: pd.DataFrame,
+                   iso3: pd.Series) -> Dict[str, object]:
+    """
+    Perfil descriptivo y bloques normalizados de cada país.
+    
+    Args:
+        df_flows: Flujos con origin, destination y n_researchers
+        wdi_country: Indicadores por iso3 (columnas de WDI_FEATURES)
+        iso3: Código ISO3 indexado por país
+    
+    Returns:
+        Diccionario con profiles (DataFrame legible por país) y blocks
+        ({clave de PROFILE_BLOCKS: matriz normalizada})
+    """
+    all_countries, W = flow_adjacency(df_flows)
+    emigration = np.asarray(W.sum(axis=1)).ravel()
+    immigration = np.asarray(W.sum(axis=0)).ravel()
+    
+    keep = immigration + emigration >= MIN_TOTAL_FLOW
+    countries, emigration, immigration = all_countries[keep], emigration[keep], immigration[keep]
+    W_out, W_in = W[keep], W.T.tocsr()[keep]
+    
+    wdi = wdi_country.reindex(iso3.reindex(countries).to_numpy()).reindex(columns=list(WDI_FEATURES))
+    
+    profiles = pd.DataFrame({
+        'country': countries,
+        'immigration': immigration,
+        'emigration': emigration,
+        'net_balance': immigration - emigration,
+        'net_share': (immigration - emigration) / (immigration + emigration),
+        'top_destination': np.where(emigration > 0, all_countries[np.asarray(W_out.argmax(axis=1)).ravel()], None),
+        'top_origin': np.where(immigration > 0, all_countries[np.asarray(W_in.argmax(axis=1)).ravel()], None)
+    })
+    profiles[list(WDI_FEATURES)] = wdi.to_numpy(dtype=np.float64)
+    
+    wdi_values = wdi.to_numpy(dtype=np.float64, copy=True)
+    for position, name in enumerate(WDI_FEATURES):
+        if name in LOG_WDI_FEATURES:
+            wdi_values[:, position] = np.log1p(np.clip(wdi_values[:, position], 0, None))
+    
+    blocks = {
+        'mix': standardize(np.column_stack([
+            np.log1p(immigration), np.log1p(emigration), profiles['net_share'].to_numpy()
+        ])),
+        'destinations': share_embedding(W_out),
+        'origins': share_embedding(W_in),
+        'wdi': standardize(wdi_values[:, ~np.all(np.isnan(wdi_values), axis=0)])
+    }
+    
+    return {
+        'profiles': profiles,
+        'blocks': {name: normalize_block(B) for name, B in blocks.items()}
+    }
+
+
+@st.cache_data(ttl=3600, show_spinner="Construyendo índice de países similares...")
+def get_similarity_index(_data_loader: DataLoader, version: tuple,
+                         blocks: tuple = tuple(PROFILE_BLOCKS)) -> Dict[str, object]:
+    """
+    KD-tree sobre los perfiles de país, cacheado por versión y bloques.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        version: Versión del dataset (ver get_dataset_version)
+        blocks: Claves de PROFILE_BLOCKS que entran en la distancia
+    
+    Returns:
+        Diccionario con profiles, X (países × dimensiones), block_slices
+        ({bloque: slice de columnas de X}) y tree; vacío si no hay datos
+    """
+    df_flows = _data_loader.load_flows()
+    
+    if df_flows.empty or not blocks:
+        return {}
+    
+    wdi_country = _data_loader.load_wdi_country_means(tuple(WDI_FEATURES))
+    
+    countries, iso3 = get_country_index(_data_loader, version)
+    profile = build_profiles(df_flows, wdi_country, pd.Series(iso3, index=countries))
+    
+    block_slices, start = {}, 0
+    for name in blocks:
+        width = profile['blocks'][name].shape[1]
+        block_slices[name] = slice(start, start + width)
+        start += width
+    
+    X = np.ascontiguousarray(np.hstack([profile['blocks'][name] for name in blocks]))
+    
+    return {
+        'profiles': profile['profiles'],
+        'X': X,
+        'block_slices': block_slices,
+        'tree': KDTree(X, leaf_size=LEAF_SIZE)
+    }
+
+
+def query_similar(index: Dict[str, object], country: str, k: int = NEIGHBORS_DEFAULT) -> Dict[str, object]:
+    """
+    Los k países más parecidos a uno dado.
+    
+    Args:
+        index: Resultado de get_similarity_index
+        country: Código del país consultado
+        k: Número de vecinos
+    
+    Returns:
+        Diccionario con neighbors (perfiles de los vecinos con distance y
+        una columna de distancia al cuadrado por bloque) y query_ms
+    """
+    profiles = index['profiles']
+    position = int(np.flatnonzero(profiles['country'].to_numpy() == country)[0])
+    point = index['X'][position:position + 1]
+    
+    start = time.perf_counter()
+    distance, neighbor = index['tree'].query(point, k=min(k + 1, len(profiles)))
+    query_ms = (time.perf_counter() - start) * 1000
+    
+    # El propio país es su vecino a distancia 0
+    keep = neighbor[0] != position
+    distance, neighbor = distance[0][keep][:k], neighbor[0][keep][:k]
+    
+    neighbors = profiles.iloc[neighbor].reset_index(drop=True)
+    neighbors.insert(1, 'distance', distance)
+    
+    difference = (index['X'][neighbor] - point) ** 2
+    for name, columns in index['block_slices'].items():
+        neighbors[f'distance_{name}'] = difference[:, columns].sum(axis=1)
+    
+    return {'neighbors': neighbors, 'query_ms': query_ms}
@@ -0,0 +1,154 @@
+"""
+Motor de Estadísticas Descriptivas
+==================================
+
+Calcula en una sola pasada vectorizada los momentos, percentiles y moda
+de una distribución numérica, sin lanzar un escaneo por estadística.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Sequence
+
+
+# Percentiles mostrados en la tabla del resumen estadístico
+DEFAULT_PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+# A partir de este número de valores se usan cuantiles aproximados
+APPROX_QUANTILE_THRESHOLD = 2_000_000
+APPROX_SAMPLE_SIZE = 250_000
+
+# Rango máximo (max - min) para contar enteros con np.bincount
+MAX_BINCOUNT_RANGE = 10_000_000
+
+
+def describe_distribution(
+    values,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    approx: Optional[bool] = None
+) -> Dict[str, object]:
+    """
+    Calcula estadísticas descriptivas de una serie numérica.
+
+    Los momentos se obtienen con reducciones NumPy sobre el mismo array,
+    los cuantiles con una selección parcial (np.partition) en lugar de una
+    ordenación completa y la moda con un conteo de enteros cuando es posible.
+
+    Args:
+        values: Serie o array de valores (los NaN se ignoran)
+        percentiles: Cuantiles a calcular (en [0, 1])
+        approx: Forzar cuantiles aproximados (None = automático según tamaño)
+
+    Returns:
+        Diccionario con count, mean, median, mode, std, var, min, max,
+        range, iqr y percentiles ({q: valor})
+    """
+    x = np.asarray(values, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    n = x.size
+
+    quantiles = sorted(set(percentiles) | {0.25, 0.5, 0.75})
+
+    if n == 0:
+        return {
+            'count': 0, 'mean': np.nan, 'median': np.nan, 'mode': None,
+            'std': np.nan, 'var': np.nan, 'min': np.nan, 'max': np.nan,
+            'range': np.nan, 'iqr': np.nan,
+            'percentiles': {q: np.nan for q in quantiles},
+            'approximate': False
+        }
+
+    x_min = x.min()
+    x_max = x.max()
+    mean = x.sum() / n
+    var = np.dot(x - mean, x - mean) / (n - 1) if n > 1 else np.nan
+
+    if approx is None:
+        approx = n > APPROX_QUANTILE_THRESHOLD
+
+    # Datos enteros de rango acotado: conteo O(n) que da moda y cuantiles exactos
+    is_integer = (x_max - x_min) <= MAX_BINCOUNT_RANGE and np.array_equal(x, np.floor(x))
+
+    if is_integer:
+        counts = np.bincount((x - x_min).astype(np.int64))
+        mode = x_min + counts.argmax()
+        q_values = _quantiles_from_counts(counts, x_min, n, quantiles)
+        approx = False
+    else:
+        uniques, unique_counts = np.unique(x, return_counts=True)
+        mode = uniques[unique_counts.argmax()]
+        sample = x
+        if approx and n > APPROX_SAMPLE_SIZE:
+            rng = np.random.default_rng(42)
+            sample = rng.choice(x, size=APPROX_SAMPLE_SIZE, replace=False)
+        q_values = _quantiles_from_partition(sample, quantiles)
+
+    q_map = dict(zip(quantiles, q_values))
+
+    return {
+        'count': n,
+        'mean': mean,
+        'median': q_map[0.5],
+        'mode': mode,
+        'std': np.sqrt(var),
+        'var': var,
+        'min': x_min,
+        'max': x_max,
+        'range': x_max - x_min,
+        'iqr': q_map[0.75] - q_map[0.25],
+        'percentiles': {q: q_map[q] for q in quantiles},
+        'approximate': bool(approx)
+    }
+
+
+def stats_to_describe(stats: Dict[str, object], percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> pd.Series:
+    """
+    Convierte el resultado de describe_distribution al formato de pandas.describe().
+
+    Args:
+        stats: Diccionario devuelto por describe_distribution
+        percentiles: Percentiles a incluir en la tabla
+
+    Returns:
+        Serie con count, mean, std, min, percentiles y max
+    """
+    index = ['count', 'mean', 'std', 'min']
+    values = [stats['count'], stats['mean'], stats['std'], stats['min']]
+
+    for q in percentiles:
+        index.append(f"{q * 100:g}%")
+        values.append(stats['percentiles'][q])
+
+    index.append('max')
+    values.append(stats['max'])
+
+    return pd.Series(values, index=index, dtype='float64')
+
+
+def _quantiles_from_partition(x: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """Cuantiles con interpolación lineal (como pandas) usando selección parcial."""
+    n = x.size
+    positions = np.asarray(quantiles) * (n - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+
+    kth = np.unique(np.concatenate([lower, upper]))
+    partitioned = np.partition(x, kth)
+
+    fraction = positions - lower
+    return partitioned[lower] + (partitioned[upper] - partitioned[lower]) * fraction
+
+
+def _quantiles_from_counts(counts: np.ndarray, offset: float, n: int, quantiles: Sequence[float]) -> np.ndarray:
+    """Cuantiles exactos (interpolación lineal) a partir de un conteo de enteros."""
+    cumulative = np.cumsum(counts)
+    positions = np.asarray(quantiles) * (n - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+
+    # El elemento k-ésimo de la muestra ordenada es el primer valor con cumsum > k
+    lower_values = np.searchsorted(cumulative, lower, side='right') + offset
+    upper_values = np.searchsorted(cumulative, upper, side='right') + offset
+
+    fraction = positions - lower
+    return lower_values + (upper_values - lower_values) * fraction
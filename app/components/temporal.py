@@ -0,0 +1,356 @@
+"""
+Cubo Año × País y Mapa Animado
+==============================
+
+Precalcula los saldos migratorios por año y país en un array NumPy compacto
+(años × países). Cada fotograma de la animación es una fila de ese array,
+de modo que generar decenas de fotogramas no requiere ningún groupby.
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from typing import Dict, Optional, Tuple
+
+from components.data_loader import DataLoader, get_dataset_version
+from components.choropleth import get_country_index, get_base_map_spec
+from components.figure_cache import figure_from_spec
+from components.feature_store import ASOF_TOLERANCE
+from config.settings import YEAR_MIN, YEAR_MAX, WDI_FEATURES
+
+
+# Duración de cada fotograma de la animación (ms)
+FRAME_DURATION = 400
+
+# Aviso de las vistas por año cuando solo hay flujos agregados por corredor
+YEARLY_FALLBACK_NOTE = (
+    "⚠️ Sin migraciones individuales (migrations_clean): cada corredor se asigna "
+    "entero al año medio de primera afiliación de sus investigadores. Es una "
+    "aproximación, no la serie real por investigador."
+)
+
+# Igual, para las vistas por año de doctorado ({dropped}: corredores sin año)
+PHD_YEAR_FALLBACK_NOTE = (
+    "⚠️ Sin migraciones individuales (migrations_clean): cada corredor se asigna "
+    "entero al año medio de doctorado de sus investigadores, no al de cada "
+    "investigador. {dropped:,} corredores del dataset no tienen año de doctorado "
+    "y no entran en esta vista."
+)
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_year_country_cube(
+    _data_loader: DataLoader,
+    _df_flows: pd.DataFrame,
+    signature: tuple,
+    version: tuple
+) -> Dict[str, np.ndarray]:
+    """
+    Cubo de inmigración/emigración por (año, país) para los corredores filtrados.
+    
+    Los recuentos por corredor y año se restringen a los corredores presentes
+    en _df_flows (mismos filtros que el resto de la página) y se acumulan con
+    un único np.bincount sobre el índice plano año * n_países + país.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        _df_flows: DataFrame de flujos ya filtrado
+        signature: Firma de los filtros aplicados a _df_flows
+        version: Versión del dataset (ver get_dataset_version)
+    
+    Returns:
+        Diccionario con years (Y,), countries e iso3 (C,) y arrays
+        immigration, emigration y net_balance de forma (Y, C)
+    """
+    countries, iso3 = get_country_index(_data_loader, version)
+    years = np.arange(YEAR_MIN, YEAR_MAX + 1)
+    n_years, n_countries = len(years), len(countries)
+    
+    yearly = filter_yearly_corridors(_data_loader.load_yearly_corridors(), _df_flows)
+    
+    year_idx = yearly['year'].to_numpy(dtype=np.int64) - YEAR_MIN
+    origin_idx = pd.Categorical(yearly['origin'], categories=countries).codes.astype(np.int64)
+    dest_idx = pd.Categorical(yearly['destination'], categories=countries).codes.astype(np.int64)
+    weights = yearly['n_researchers'].to_numpy(dtype=np.float64)
+    
+    size = n_years * n_countries
+    valid_dest = dest_idx >= 0
+    valid_origin = origin_idx >= 0
+    immigration = np.bincount(
+        year_idx[valid_dest] * n_countries + dest_idx[valid_dest], weights[valid_dest], minlength=size
+    ).reshape(n_years, n_countries)
+    emigration = np.bincount(
+        year_idx[valid_origin] * n_countries + origin_idx[valid_origin], weights[valid_origin], minlength=size
+    ).reshape(n_years, n_countries)
+    
+    return {
+        'years': years,
+        'countries': countries,
+        'iso3': iso3,
+        'immigration': immigration,
+        'emigration': emigration,
+        'net_balance': immigration - emigration
+    }
+
+
+def filter_yearly_corridors(yearly: pd.DataFrame, df_flows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Restringe los recuentos por corredor y año a los corredores de df_flows.
+    
+    Args:
+        yearly: DataFrame de DataLoader.load_yearly_corridors
+        df_flows: DataFrame de flujos ya filtrado
+    
+    Returns:
+        Subconjunto de yearly con años dentro de [YEAR_MIN, YEAR_MAX]
+    """
+    selected = pd.MultiIndex.from_arrays([
+        df_flows['origin'].astype(str), df_flows['destination'].astype(str)
+    ])
+    keep = pd.MultiIndex.from_arrays([yearly['origin'], yearly['destination']]).isin(selected)
+    keep &= yearly['year'].between(YEAR_MIN, YEAR_MAX).to_numpy()
+    return yearly[keep]
+
+
+def asof_indicator_cube(
+    panel: pd.DataFrame,
+    codes: Tuple[str, ...],
+    iso3: np.ndarray,
+    years: np.ndarray,
+    tolerance: int = ASOF_TOLERANCE
+) -> np.ndarray:
+    """
+    Valores WDI as-of (último año publicado <= año) en un cubo (F, Y, C).
+    
+    Todas las series se ordenan una vez por la clave plana
+    (indicador, país, año) y cada celda del cubo se resuelve con un único
+    np.searchsorted sobre esa clave.
+    
+    Args:
+        panel: Panel WDI largo con iso3, IndicatorCode, Year y Value
+        codes: Códigos de serie (eje F)
+        iso3: Códigos ISO3 de los países (eje C)
+        years: Años del cubo (eje Y)
+        tolerance: Antigüedad máxima del valor en años
+    
+    Returns:
+        Array float64 (F, Y, C) con NaN donde no hay valor
+    """
+    n_features, n_years, n_countries = len(codes), len(years), len(iso3)
+    
+    feature_idx = pd.Index(codes).get_indexer(panel['IndicatorCode'])
+    country_idx = pd.Index(iso3).get_indexer(panel['iso3'].astype(str))
+    panel_years = panel['Year'].to_numpy(dtype=np.int64)
+    values = panel['Value'].to_numpy(dtype=np.float64)
+    
+    valid = (feature_idx >= 0) & (country_idx >= 0) & np.isfinite(values)
+    if not valid.any():
+        return np.full((n_features, n_years, n_countries), np.nan)
+    
+    # Clave plana: (indicador * C + país) * span + (año - base)
+    base = min(int(panel_years[valid].min()), int(years.min()))
+    span = max(int(panel_years[valid].max()), int(years.max())) - base + 1
+    
+    series_id = feature_idx[valid] * n_countries + country_idx[valid]
+    keys = series_id * span + (panel_years[valid] - base)
+    order = np.argsort(keys, kind='stable')
+    keys, values, series_id = keys[order], values[valid][order], series_id[order]
+    
+    # Consulta de cada celda (f, y, c): último registro con clave <= consulta
+    query_series = (np.arange(n_features)[:, None, None] * n_countries + np.arange(n_countries)[None, None, :])
+    query_years = (years - base)[None, :, None]
+    query = query_series * span + query_years
+    
+    pos = np.searchsorted(keys, query, side='right') - 1
+    safe = np.clip(pos, 0, None)
+    found = (pos >= 0) & (series_id[safe] == query_series)
+    found &= (query_years - (keys[safe] - series_id[safe] * span)) <= tolerance
+    
+    return np.where(found, values[safe], np.nan)
+
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def get_indicator_cube(_data_loader: DataLoader, version: tuple, features: tuple) -> Dict[str, np.ndarray]:
+    """
+    Cubo as-of de indicadores WDI alineado con los ejes del cubo año × país.
+    
+    Se cachea por conjunto de indicadores: no depende de los filtros.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        version: Versión del dataset (ver get_dataset_version)
+        features: Nombres de features WDI (claves de WDI_FEATURES)
+    
+    Returns:
+        Diccionario con features, years (Y,) y values (F, Y, C)
+    """
+    countries, iso3 = get_country_index(_data_loader, version)
+    years = np.arange(YEAR_MIN, YEAR_MAX + 1)
+    
+    panel = _data_loader.load_wdi_panel(YEAR_MIN - ASOF_TOLERANCE, YEAR_MAX)
+    codes = tuple(WDI_FEATURES[name] for name in features)
+    
+    return {
+        'features': features,
+        'years': years,
+        'values': asof_indicator_cube(panel, codes, np.asarray(iso3, dtype=str), years)
+    }
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def get_corridor_indicators(
+    _data_loader: DataLoader,
+    _df_flows: pd.DataFrame,
+    signature: tuple,
+    version: tuple,
+    features: tuple,
+    year_column: str = 'phd_year',
+    fixed_year: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Indicadores de origen y destino as-of del año de cada corredor.
+    
+    Con el cubo de indicadores ya calculado, la unión es una indexación
+    directa values[f, año, país] sobre todos los corredores a la vez.
+    
+    Args:
+        _data_loader: Cargador de datos compartido
+        _df_flows: DataFrame de flujos ya filtrado
+        signature: Firma de los filtros aplicados a _df_flows
+        version: Versión del dataset (ver get_dataset_version)
+        features: Nombres de features WDI (claves de WDI_FEATURES)
+        year_column: Año de referencia del corredor ('phd_year' u 'origin_year')
+        fixed_year: Si se indica, usa los indicadores de ese año para todos
+            los corredores (vista estática de comparación)
+    
+    Returns:
+        DataFrame con origin, destination, year, n_researchers y
+        origin_<feature> / destination_<feature> por cada feature
+    """
+    countries, _ = get_country_index(_data_loader, version)
+    cube = get_indicator_cube(_data_loader, version, features)
+    
+    yearly = filter_yearly_corridors(_data_loader.load_yearly_corridors(year_column), _df_flows)
+    yearly = yearly.reset_index(drop=True)
+    
+    lookup_years = yearly['year'].to_numpy(dtype=np.int64) if fixed_year is None else np.full(len(yearly), fixed_year)
+    year_idx = lookup_years - YEAR_MIN
+    origin_idx = pd.Categorical(yearly['origin'], categories=countries).codes.astype(np.int64)
+    dest_idx = pd.Categorical(yearly['destination'], categories=countries).codes.astype(np.int64)
+    
+    values = cube['values']
+    for f, name in enumerate(features):
+        yearly[f'origin_{name}'] = np.where(origin_idx >= 0, values[f, year_idx, origin_idx], np.nan)
+        yearly[f'destination_{name}'] = np.where(dest_idx >= 0, values[f, year_idx, dest_idx], np.nan)
+    
+    return yearly
+
+
+def trim_cube_years(cube: Dict[str, np.ndarray]) -> Tuple[int, int]:
+    """
+    Primer y último índice de año con algún flujo (para no animar años vacíos).
+    
+    Args:
+        cube: Diccionario devuelto por get_year_country_cube
+    
+    Returns:
+        Tupla (inicio, fin) de índices, fin exclusivo
+    """
+    active = np.flatnonzero((cube['immigration'] + cube['emigration']).sum(axis=1) > 0)
+    if active.size == 0:
+        return 0, 0
+    return int(active[0]), int(active[-1]) + 1
+
+
+def create_animated_map(cube: Dict[str, np.ndarray], cumulative: bool = False) -> go.Figure:
+    """
+    Mapa coroplético animado por año a partir del cubo precalculado.
+    
+    Las ubicaciones y la escala de color son fijas; cada fotograma solo
+    sustituye z y customdata por la fila del año correspondiente.
+    
+    Args:
+        cube: Diccionario devuelto por get_year_country_cube
+        cumulative: Mostrar el saldo acumulado hasta cada año
+    
+    Returns:
+        Figura Plotly con fotogramas, botón de reproducción y slider
+    """
+    start, end = trim_cube_years(cube)
+    years = cube['years'][start:end]
+    immigration = cube['immigration'][start:end]
+    emigration = cube['emigration'][start:end]
+    
+    if cumulative:
+        immigration = np.cumsum(immigration, axis=0)
+        emigration = np.cumsum(emigration, axis=0)
+    net_balance = immigration - emigration
+    
+    # Ubicaciones fijas: países con algún flujo en el periodo
+    mask = (immigration + emigration).sum(axis=0) > 0
+    immigration, emigration, net_balance = immigration[:, mask], emigration[:, mask], net_balance[:, mask]
+    countries = cube['countries'][mask]
+    
+    # Escala simétrica común a todos los fotogramas
+    z_abs = float(np.abs(net_balance).max()) if net_balance.size else 1.0
+    
+    spec = get_base_map_spec(get_dataset_version())
+    trace = dict(spec['data'][0])
+    trace['locations'] = cube['iso3'][mask].tolist()
+    trace['zmin'], trace['zmax'] = -z_abs, z_abs
+    
+    def frame_data(i: int) -> dict:
+        return {
+            'type': 'choropleth',
+            'z': net_balance[i].tolist(),
+            'customdata': np.column_stack([countries, immigration[i], emigration[i]]).tolist()
+        }
+    
+    frames = [
+        {'name': str(year), 'data': [frame_data(i)], 'traces': [0]}
+        for i, year in enumerate(years)
+    ]
+    
+    if frames:
+        trace.update(frame_data(0))
+    
+    layout = dict(spec['layout'])
+    layout['title'] = 'Saldo Migratorio Neto por Año' + (' (acumulado)' if cumulative else '')
+    layout['height'] = 550
+    layout['updatemenus'] = [{
+        'type': 'buttons',
+        'showactive': False,
+        'x': 0.05, 'y': 0.05,
+        'buttons': [
+            {
+                'label': '▶',
+                'method': 'animate',
+                'args': [None, {
+                    'frame': {'duration': FRAME_DURATION, 'redraw': True},
+                    'transition': {'duration': 0},
+                    'fromcurrent': True
+                }]
+            },
+            {
+                'label': '⏸',
+                'method': 'animate',
+                'args': [[None], {'frame': {'duration': 0, 'redraw': False}, 'mode': 'immediate'}]
+            }
+        ]
+    }]
+    layout['sliders'] = [{
+        'active': 0,
+        'x': 0.15, 'len': 0.8, 'y': 0.05,
+        'currentvalue': {'prefix': 'Año: '},
+        'steps': [
+            {
+                'label': str(year),
+                'method': 'animate',
+                'args': [[str(year)], {'frame': {'duration': 0, 'redraw': True}, 'mode': 'immediate'}]
+            }
+            for year in years
+        ]
+    }]
+    
+    return figure_from_spec({'data': [trace], 'layout': layout, 'frames': frames})
@@ -0,0 +1,238 @@
+"""
+Líneas de Tendencia
+===================
+
+Ajusta líneas de tendencia con mínimos cuadrados de NumPy (OLS, robusta
+tipo Huber, LOWESS y log-log) y las añade a las figuras como una traza
+precalculada, sin pasar por trendline="ols" de Plotly Express (que
+importa statsmodels y reajusta el modelo en cada construcción).
+"""
+
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+from scipy import stats
+from typing import Dict, Optional
+
+
+# Métodos disponibles (clave → etiqueta para la interfaz)
+TRENDLINE_METHODS = {
+    'ols': 'OLS',
+    'robust': 'Robusta (Huber)',
+    'lowess': 'LOWESS',
+    'loglog': 'Log-log'
+}
+
+# Puntos de la curva evaluada
+TRENDLINE_POINTS = 100
+
+# Constante de Huber (95% de eficiencia con errores normales)
+HUBER_K = 1.345
+
+# Fracción de puntos de cada ventana LOWESS
+LOWESS_FRAC = 0.6
+
+
+def _linear_fit(x: np.ndarray, y: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Coeficientes (intercepto, pendiente) por mínimos cuadrados (ponderados)."""
+    design = np.column_stack([np.ones_like(x), x])
+    
+    if weights is not None:
+        sqrt_w = np.sqrt(weights)
+        design = design * sqrt_w[:, None]
+        y = y * sqrt_w
+    
+    coefs, *_ = np.linalg.lstsq(design, y, rcond=None)
+    return coefs
+
+
+def _huber_fit(x: np.ndarray, y: np.ndarray, max_iter: int = 50, tol: float = 1e-8) -> np.ndarray:
+    """Regresión robusta de Huber por mínimos cuadrados reponderados (IRLS)."""
+    coefs = _linear_fit(x, y)
+    
+    for _ in range(max_iter):
+        residuals = y - (coefs[0] + coefs[1] * x)
+        scale = np.median(np.abs(residuals - np.median(residuals))) / 0.6745
+        if scale <= 0:
+            break
+        
+        u = np.abs(residuals) / (HUBER_K * scale)
+        weights = np.where(u <= 1, 1.0, 1.0 / np.maximum(u, 1e-12))
+        
+        new_coefs = _linear_fit(x, y, weights)
+        if np.allclose(new_coefs, coefs, rtol=tol, atol=tol):
+            coefs = new_coefs
+            break
+        coefs = new_coefs
+    
+    return coefs
+
+
+def _lowess(x: np.ndarray, y: np.ndarray, x_eval: np.ndarray, frac: float = LOWESS_FRAC) -> np.ndarray:
+    """
+    LOWESS (regresión local lineal con pesos tricúbicos), vectorizado.
+    
+    Evalúa todas las ventanas a la vez con difusión (n_eval × n), por lo
+    que conviene pasar una rejilla de evaluación pequeña.
+    """
+    n = x.size
+    k = max(int(np.ceil(frac * n)), 2)
+    
+    distances = np.abs(x_eval[:, None] - x[None, :])
+    bandwidth = np.partition(distances, k - 1, axis=1)[:, k - 1]
+    bandwidth = np.where(bandwidth > 0, bandwidth, 1.0)
+    
+    w = np.clip(1 - (distances / bandwidth[:, None]) ** 3, 0, None) ** 3
+    
+    # Mínimos cuadrados ponderados locales resueltos en forma cerrada
+    sw = w.sum(axis=1)
+    swx = w @ x
+    swy = w @ y
+    swxx = w @ (x * x)
+    swxy = w @ (x * y)
+    
+    denom = sw * swxx - swx ** 2
+    safe = np.abs(denom) > 1e-12
+    slope = np.where(safe, (sw * swxy - swx * swy) / np.where(safe, denom, 1.0), 0.0)
+    intercept = (swy - slope * swx) / np.where(sw > 0, sw, 1.0)
+    
+    return intercept + slope * x_eval
+
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def fit_trendline(x, y, method: str = 'ols', log_x: bool = False, log_y: bool = False,
+                  n_points: int = TRENDLINE_POINTS) -> Dict[str, object]:
+    """
+    Ajusta una línea de tendencia y evalúa la curva para dibujarla.
+    
+    Con log_x/log_y el ajuste se hace sobre log10 de la variable (se
+    descartan los valores no positivos); 'loglog' equivale a OLS con ambos.
+    
+    Args:
+        x: Valores de la variable independiente
+        y: Valores de la variable dependiente
+        method: 'ols', 'robust', 'lowess' o 'loglog'
+        log_x: Ajustar sobre log10(x)
+        log_y: Ajustar sobre log10(y)
+        n_points: Puntos de la curva evaluada
+    
+    Returns:
+        Diccionario con x_line, y_line (escala original), method, n y, salvo
+        LOWESS, slope, intercept, r2 y slope_ci (IC 95%) en el espacio del ajuste
+        (para 'robust', R² e IC son aproximados sobre los residuos de Huber)
+    """
+    if method == 'loglog':
+        method, log_x, log_y = 'ols', True, True
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    valid = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        valid &= x > 0
+    if log_y:
+        valid &= y > 0
+    
+    fx = np.log10(x[valid]) if log_x else x[valid]
+    fy = np.log10(y[valid]) if log_y else y[valid]
+    n = fx.size
+    
+    result = {
+        'method': method, 'log_x': log_x, 'log_y': log_y, 'n': int(n),
+        'slope': np.nan, 'intercept': np.nan, 'r2': np.nan, 'slope_ci': (np.nan, np.nan),
+        'x_line': np.array([]), 'y_line': np.array([])
+    }
+    
+    if n < 3 or np.ptp(fx) == 0:
+        return result
+    
+    x_grid = np.linspace(fx.min(), fx.max(), n_points)
+    
+    if method == 'lowess':
+        y_grid = _lowess(fx, fy, x_grid)
+    else:
+        coefs = _huber_fit(fx, fy) if method == 'robust' else _linear_fit(fx, fy)
+        intercept, slope = coefs
+        y_grid = intercept + slope * x_grid
+        
+        residuals = fy - (intercept + slope * fx)
+        ss_res = residuals @ residuals
+        ss_tot = np.sum((fy - fy.mean()) ** 2)
+        
+        # Error estándar de la pendiente e IC 95% (t de Student, n - 2 g.l.)
+        sxx = np.sum((fx - fx.mean()) ** 2)
+        se_slope = np.sqrt(ss_res / (n - 2) / sxx)
+        t_crit = stats.t.ppf(0.975, n - 2)
+        
+        result.update({
+            'slope': float(slope),
+            'intercept': float(intercept),
+            'r2': float(1 - ss_res / ss_tot) if ss_tot > 0 else np.nan,
+            'slope_ci': (float(slope - t_crit * se_slope), float(slope + t_crit * se_slope))
+        })
+    
+    result['x_line'] = 10 ** x_grid if log_x else x_grid
+    result['y_line'] = 10 ** y_grid if log_y else y_grid
+    
+    return result
+
+
+def trendline_trace(fit: Dict[str, object], name: Optional[str] = None,
+                    color: str = 'rgba(255, 255, 255, 0.8)') -> go.Scatter:
+    """
+    Traza de la línea de tendencia precalculada.
+    
+    Args:
+        fit: Resultado de fit_trendline
+        name: Nombre en la leyenda (por defecto, el método)
+        color: Color de la línea
+    
+    Returns:
+        Traza go.Scatter en modo líneas
+    """
+    return go.Scatter(
+        x=fit['x_line'],
+        y=fit['y_line'],
+        mode='lines',
+        name=name or f"Tendencia ({TRENDLINE_METHODS.get(fit['method'], fit['method'])})",
+        line=dict(color=color, width=2),
+        hoverinfo='skip'
+    )
+
+
+def add_trendline(fig: go.Figure, fit: Dict[str, object], **kwargs) -> go.Figure:
+    """Añade la línea de tendencia a una figura (si el ajuste es válido)."""
+    if len(fit['x_line']):
+        fig.add_trace(trendline_trace(fit, **kwargs))
+    return fig
+
+
+def format_trendline_summary(fit: Dict[str, object]) -> str:
+    """
+    Resumen legible del ajuste (pendiente, IC 95% y R²).
+    
+    Args:
+        fit: Resultado de fit_trendline
+    
+    Returns:
+        Texto markdown de una línea
+    """
+    if fit['n'] < 3:
+        return "Datos insuficientes para ajustar una tendencia."
+    
+    if fit['method'] == 'lowess':
+        return f"LOWESS (fracción {LOWESS_FRAC:.0%}) sobre {fit['n']} países; sin pendiente global."
+    
+    space = {
+        (False, False): '',
+        (True, False): ' (en log₁₀ x)',
+        (False, True): ' (en log₁₀ y)',
+        (True, True): ' (log-log: elasticidad)'
+    }[(fit['log_x'], fit['log_y'])]
+    low, high = fit['slope_ci']
+    
+    return (
+        f"**{TRENDLINE_METHODS.get(fit['method'], fit['method'])}**{space}: "
+        f"pendiente = {fit['slope']:,.3g} (IC 95%: {low:,.3g} a {high:,.3g}) · "
+        f"R² = {fit['r2']:.3f} · n = {fit['n']}"
+    )
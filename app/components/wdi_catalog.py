@@ -0,0 +1,347 @@
+"""
+Catálogo de Metadatos WDI
+=========================
+
+Construye en el preprocesamiento un catálogo compacto de las series del
+World Development Indicators (Series.csv, con el recuento de notas de
+SeriesNotes.csv y CountryNotes.csv) y un índice invertido de tokens sobre
+nombre, tema y definiciones, guardado como arrays CSR en un .npz. Los
+valores de las series se guardan en un Parquet ordenado por indicador, de
+modo que leer una serie solo descomprime sus grupos de filas. Junto a él
+se guarda el panel con los huecos rellenados (ver gap_filling).
+"""
+
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from components.gap_filling import fill_gaps
+
+
+# Ficheros generados en el directorio de datos procesados
+CATALOG_FILE = 'wdi_catalog.parquet'
+INDEX_FILE = 'wdi_catalog_index.npz'
+SERIES_STORE_FILE = 'wdi_series.parquet'
+FILLED_STORE_FILE = 'wdi_filled.parquet'
+
+# Campos indexados y su peso en la puntuación de búsqueda
+INDEXED_FIELDS = {
+    'IndicatorName': 3,
+    'Topic': 2,
+    'ShortDefinition': 1,
+    'LongDefinition': 1
+}
+
+CATALOG_COLUMNS = [
+    'IndicatorCode', 'IndicatorName', 'Topic', 'ShortDefinition', 'LongDefinition',
+    'UnitOfMeasure', 'Source'
+]
+
+# Filas por grupo del almacén de series (unidad mínima de lectura)
+SERIES_ROW_GROUP_SIZE = 50_000
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'which', 'with'
+})
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Tokens en minúsculas y sin acentos (se descartan palabras vacías).
+    
+    Args:
+        text: Texto a tokenizar (None o NaN devuelven lista vacía)
+    
+    Returns:
+        Lista de tokens en orden de aparición
+    """
+    if not isinstance(text, str):
+        return []
+    
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    return [token for token in _TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def build_catalog(raw_dir: Path, series_store: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Catálogo de series WDI con recuento de notas y cobertura.
+    
+    Args:
+        raw_dir: Directorio de la descarga original del WDI
+        series_store: Valores de las series (iso3, IndicatorCode, Year, Value)
+            para calcular la cobertura; opcional
+    
+    Returns:
+        DataFrame con una fila por serie, ordenado por IndicatorCode
+    """
+    catalog = pd.read_csv(
+        raw_dir / 'Series.csv',
+        usecols=['SeriesCode'] + CATALOG_COLUMNS[1:]
+    ).rename(columns={'SeriesCode': 'IndicatorCode'})
+    
+    for notes_file, count_column in (('SeriesNotes.csv', 'n_series_notes'),
+                                     ('CountryNotes.csv', 'n_country_notes')):
+        path = raw_dir / notes_file
+        if path.exists():
+            counts = pd.read_csv(path, usecols=['Seriescode'])['Seriescode'].value_counts()
+            catalog[count_column] = catalog['IndicatorCode'].map(counts).fillna(0).astype('int32')
+        else:
+            catalog[count_column] = np.int32(0)
+    
+    if series_store is not None and not series_store.empty:
+        coverage = series_store.groupby('IndicatorCode').agg(
+            n_countries=('iso3', 'nunique'),
+            year_min=('Year', 'min'),
+            year_max=('Year', 'max')
+        )
+        catalog = catalog.join(coverage, on='IndicatorCode')
+    else:
+        catalog = catalog.assign(n_countries=pd.NA, year_min=pd.NA, year_max=pd.NA)
+    
+    catalog = catalog.astype({'n_countries': 'Int32', 'year_min': 'Int32', 'year_max': 'Int32'})
+    
+    catalog['Topic'] = catalog['Topic'].fillna('Sin clasificar')
+    
+    return catalog.sort_values('IndicatorCode').reset_index(drop=True)
+
+
+def build_inverted_index(catalog: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Índice invertido token → series en formato CSR.
+    
+    La lista de series del token tokens[i] es postings[offsets[i]:offsets[i+1]],
+    con el peso del campo más relevante en que aparece (weights).
+    
+    Args:
+        catalog: Catálogo devuelto por build_catalog
+    
+    Returns:
+        Diccionario con tokens (ordenados), offsets, postings y weights
+    """
+    doc_ids, tokens, weights = [], [], []
+    
+    for field, weight in INDEXED_FIELDS.items():
+        for doc_id, text in enumerate(catalog[field].to_numpy(dtype=object)):
+            field_tokens = set(tokenize(text))
+            doc_ids.extend([doc_id] * len(field_tokens))
+            tokens.extend(field_tokens)
+            weights.extend([weight] * len(field_tokens))
+    
+    postings = pd.DataFrame({'token': tokens, 'doc': doc_ids, 'weight': weights})
+    postings = postings.groupby(['token', 'doc'], sort=True)['weight'].max().reset_index()
+    
+    unique_tokens, starts = np.unique(postings['token'].to_numpy(dtype=str), return_index=True)
+    
+    return {
+        'tokens': unique_tokens,
+        'offsets': np.append(starts, len(postings)).astype(np.int64),
+        'postings': postings['doc'].to_numpy(dtype=np.int32),
+        'weights': postings['weight'].to_numpy(dtype=np.int8)
+    }
+
+
+def search_catalog(catalog: pd.DataFrame, index: Dict[str, np.ndarray], query: str,
+                   limit: int = 20) -> pd.DataFrame:
+    """
+    Busca series cuyo texto contenga todos los términos de la consulta.
+    
+    Cada término se compara como prefijo ('pop' encuentra 'population')
+    mediante búsqueda binaria sobre los tokens ordenados; la puntuación
+    suma el peso del campo por el IDF de cada término. Una consulta que es
+    prefijo de un código (p. ej. 'NY.GDP') devuelve esas series primero.
+    
+    Args:
+        catalog: Catálogo devuelto por build_catalog
+        index: Índice devuelto por build_inverted_index
+        query: Texto de búsqueda
+        limit: Resultados máximos
+    
+    Returns:
+        DataFrame con IndicatorCode, IndicatorName, Topic y score
+    """
+    n_docs = len(catalog)
+    scores = np.zeros(n_docs)
+    
+    code_query = query.strip().upper()
+    if code_query and '.' in code_query:
+        code_hits = catalog['IndicatorCode'].str.upper().str.startswith(code_query).to_numpy()
+        scores[code_hits] = np.inf
+    
+    terms = list(dict.fromkeys(tokenize(query)))
+    if terms:
+        tokens, offsets = index['tokens'], index['offsets']
+        matched = np.zeros(n_docs, dtype=np.int64)
+        text_scores = np.zeros(n_docs)
+        
+        for term in terms:
+            low = np.searchsorted(tokens, term, side='left')
+            high = np.searchsorted(tokens, term + '\uffff', side='left')
+            
+            term_weight = np.zeros(n_docs)
+            np.maximum.at(
+                term_weight,
+                index['postings'][offsets[low]:offsets[high]],
+                index['weights'][offsets[low]:offsets[high]].astype(np.float64)
+            )
+            
+            doc_freq = np.count_nonzero(term_weight)
+            if doc_freq:
+                text_scores += term_weight * np.log1p(n_docs / doc_freq)
+                matched += term_weight > 0
+        
+        all_terms = matched == len(terms)
+        scores[all_terms] = np.maximum(scores[all_terms], text_scores[all_terms])
+    
+    # Empates: primero los nombres más cortos (la serie más general)
+    hits = np.flatnonzero(scores > 0)
+    name_length = catalog['IndicatorName'].iloc[hits].str.len().to_numpy()
+    hits = hits[np.lexsort((name_length, -scores[hits]))][:limit]
+    
+    result = catalog.iloc[hits][['IndicatorCode', 'IndicatorName', 'Topic']].reset_index(drop=True)
+    result['score'] = scores[hits]
+    
+    return result
+
+
+def load_country_regions(raw_dir: Path) -> Optional[pd.Series]:
+    """
+    Región del Banco Mundial de cada país (Country.csv).
+    
+    Args:
+        raw_dir: Directorio de la descarga original del WDI
+    
+    Returns:
+        Serie Region indexada por iso3 (agregados sin región), o None si
+        no existe Country.csv
+    """
+    path = raw_dir / 'Country.csv'
+    if not path.exists():
+        return None
+    
+    return pd.read_csv(path, usecols=['CountryCode', 'Region']).set_index('CountryCode')['Region'].dropna()
+
+
+def build_series_store(df_wdi: pd.DataFrame, path: Path, extra_columns: tuple = ()) -> Path:
+    """
+    Guarda las series en Parquet ordenado por indicador.
+    
+    Con los grupos de filas ordenados por IndicatorCode, las estadísticas
+    min/max de cada grupo permiten leer una serie sin tocar el resto.
+    
+    Args:
+        df_wdi: Panel largo con iso3, IndicatorCode, Year y Value
+        path: Ruta del Parquet
+        extra_columns: Columnas adicionales a guardar (p. ej. source)
+    
+    Returns:
+        Ruta del fichero guardado
+    """
+    store = df_wdi[['IndicatorCode', 'iso3', 'Year', 'Value', *extra_columns]].dropna(subset=['Value'])
+    store = store.astype({'IndicatorCode': str, 'iso3': str, 'Year': 'int16', 'Value': 'float64'})
+    store = store.sort_values(['IndicatorCode', 'iso3', 'Year']).reset_index(drop=True)
+    
+    store.to_parquet(path, engine='pyarrow', compression='snappy', index=False,
+                     row_group_size=SERIES_ROW_GROUP_SIZE)
+    return path
+
+
+def read_series(path: Path, codes: Optional[List[str]] = None,
+                years: Optional[tuple] = None, extra_columns: tuple = ()) -> pd.DataFrame:
+    """
+    Lee series del almacén con filtros empujados al lector Parquet.
+    
+    Args:
+        path: Ruta del almacén (ver build_series_store)
+        codes: Códigos de indicador (todos si None)
+        years: Rango de años (year_min, year_max), inclusivo
+        extra_columns: Columnas adicionales a devolver (p. ej. source)
+    
+    Returns:
+        DataFrame con iso3, IndicatorCode, Year, Value y extra_columns
+    """
+    filters = []
+    if codes is not None:
+        filters.append(('IndicatorCode', 'in', list(codes)))
+    if years is not None:
+        filters.extend([('Year', '>=', years[0]), ('Year', '<=', years[1])])
+    
+    columns = ['iso3', 'IndicatorCode', 'Year', 'Value', *extra_columns]
+    return pd.read_parquet(path, engine='pyarrow', columns=columns, filters=filters or None)
+
+
+def save_catalog(catalog: pd.DataFrame, index: Dict[str, np.ndarray], out_dir: Path) -> None:
+    """Guarda el catálogo (Parquet) y el índice invertido (.npz comprimido, sin pickle)."""
+    catalog.to_parquet(out_dir / CATALOG_FILE, engine='pyarrow', compression='snappy', index=False)
+    np.savez_compressed(out_dir / INDEX_FILE, **index)
+
+
+def load_catalog(data_dir: Path, raw_dir: Path) -> Dict[str, object]:
+    """
+    Carga el catálogo y su índice; si no se generaron, los construye en memoria.
+    
+    Args:
+        data_dir: Directorio de datos procesados
+        raw_dir: Directorio de la descarga original del WDI
+    
+    Returns:
+        Diccionario con catalog e index (vacíos si no hay metadatos)
+    """
+    catalog_path, index_path = data_dir / CATALOG_FILE, data_dir / INDEX_FILE
+    
+    if catalog_path.exists() and index_path.exists():
+        with np.load(index_path, allow_pickle=False) as npz:
+            index = {key: npz[key] for key in npz.files}
+        return {'catalog': pd.read_parquet(catalog_path), 'index': index}
+    
+    if not (raw_dir / 'Series.csv').exists():
+        return {'catalog': pd.DataFrame(columns=CATALOG_COLUMNS), 'index': None}
+    
+    store_path = data_dir / SERIES_STORE_FILE
+    catalog = build_catalog(raw_dir, read_series(store_path) if store_path.exists() else None)
+    return {'catalog': catalog, 'index': build_inverted_index(catalog)}
+
+
+def build_wdi_store(raw_dir: Path, out_dir: Path, df_wdi: Optional[pd.DataFrame] = None) -> Dict[str, Path]:
+    """
+    Paso de preprocesamiento: almacén de series, panel rellenado, catálogo e índice.
+    
+    Usa Indicators.csv completo si está en raw_dir; si no, el panel
+    df_wdi (p. ej. los indicadores ya procesados). El panel rellenado usa
+    las regiones de Country.csv para la mediana regional.
+    
+    Args:
+        raw_dir: Directorio de la descarga original del WDI
+        out_dir: Directorio de datos procesados
+        df_wdi: Panel largo alternativo con iso3, IndicatorCode, Year y Value
+    
+    Returns:
+        Diccionario con las rutas generadas
+    """
+    indicators_path = raw_dir / 'Indicators.csv'
+    if indicators_path.exists():
+        df_wdi = pd.read_csv(
+            indicators_path,
+            usecols=['CountryCode', 'IndicatorCode', 'Year', 'Value'],
+            dtype={'CountryCode': str, 'IndicatorCode': str, 'Year': 'int16', 'Value': 'float64'}
+        ).rename(columns={'CountryCode': 'iso3'})
+    
+    paths = {}
+    if df_wdi is not None and not df_wdi.empty:
+        paths['series'] = build_series_store(df_wdi, out_dir / SERIES_STORE_FILE)
+        paths['filled'] = build_series_store(
+            fill_gaps(df_wdi[['iso3', 'IndicatorCode', 'Year', 'Value']], load_country_regions(raw_dir)),
+            out_dir / FILLED_STORE_FILE,
+            extra_columns=('source',)
+        )
+    
+    catalog = build_catalog(raw_dir, read_series(paths['series']) if 'series' in paths else None)
+    save_catalog(catalog, build_inverted_index(catalog), out_dir)
+    paths.update({'catalog': out_dir / CATALOG_FILE, 'index': out_dir / INDEX_FILE})
+    
+    return paths
@@ -14,6 +14,10 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent.parent  # Carpeta 'app'
 PROJECT_ROOT = BASE_DIR.parent  # Carpeta raíz del proyecto
 DATA_DIR = PROJECT_ROOT / 'outputs' / 'processed'
+MODELS_DIR = PROJECT_ROOT / 'outputs' / 'models'  # Artefactos de modelos ajustados
+FEATURES_DIR = PROJECT_ROOT / 'outputs' / 'features'  # Feature store país × año
+CENTROIDS_FILE = BASE_DIR / 'config' / 'country_centroids.csv'  # Centroides por ISO3
+WDI_RAW_DIR = PROJECT_ROOT / 'data' / 'World Development Indicators'  # Descarga original del WDI
 DOCS_DIR = PROJECT_ROOT / 'docs'
 IMG_DIR = PROJECT_ROOT / 'img'
 
@@ -117,6 +121,35 @@ REGION_MAP = {
     'UGA': 'África'
 }
 
+# Regiones e ingreso del Banco Mundial (Country.csv) → etiqueta en español
+WB_REGION_NAMES = {
+    'East Asia & Pacific': 'Asia Oriental y Pacífico',
+    'Europe & Central Asia': 'Europa y Asia Central',
+    'Latin America & Caribbean': 'América Latina y Caribe',
+    'Middle East & North Africa': 'Oriente Medio y Norte de África',
+    'North America': 'Norteamérica',
+    'South Asia': 'Asia Meridional',
+    'Sub-Saharan Africa': 'África Subsahariana'
+}
+
+INCOME_GROUP_NAMES = {
+    'High income: OECD': 'Ingreso alto (OCDE)',
+    'High income: nonOECD': 'Ingreso alto (no OCDE)',
+    'Upper middle income': 'Ingreso medio-alto',
+    'Lower middle income': 'Ingreso medio-bajo',
+    'Low income': 'Ingreso bajo'
+}
+
+# Países y territorios de los flujos (ISO2) que no figuran en Country.csv
+WB_REGION_EXTRA = {
+    'TW': 'East Asia & Pacific', 'CC': 'East Asia & Pacific', 'UM': 'East Asia & Pacific',
+    'AI': 'Latin America & Caribbean', 'BL': 'Latin America & Caribbean',
+    'FK': 'Latin America & Caribbean', 'GF': 'Latin America & Caribbean',
+    'GP': 'Latin America & Caribbean', 'MQ': 'Latin America & Caribbean',
+    'RE': 'Sub-Saharan Africa', 'TF': 'Sub-Saharan Africa',
+    'SJ': 'Europe & Central Asia', 'VA': 'Europe & Central Asia'
+}
+
 # =============================================================================
 # CONSTANTES DE ANÁLISIS
 # =============================================================================
@@ -132,6 +165,14 @@ RD_THRESHOLD_MEDIUM = 1.5   # % del PIB en I+D
 YEAR_MIN = 1950
 YEAR_MAX = 2020
 
+# Indicadores WDI del feature store (nombre de feature → código de serie)
+WDI_FEATURES = {
+    'gdp_per_capita': 'NY.GDP.PCAP.CD',
+    'rd_expenditure_pct': 'GB.XPD.RSDV.GD.ZS',
+    'population': 'SP.POP.TOTL',
+    'researchers_per_million': 'SP.POP.SCIE.RD.P6'
+}
+
 # Top N para visualizaciones
 TOP_N_DEFAULT = 15
 TOP_N_CORRIDORS = 20
@@ -0,0 +1,12 @@
+"""
+Configuración de pytest
+=======================
+
+Añade el directorio de la aplicación al path, igual que main.py, para
+importar los módulos como components.* desde los tests.
+"""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,70 @@
+"""
+Tests del Motor de Correlaciones
+================================
+
+Comparan correlation_matrix con pandas.DataFrame.corr, que ignora los
+valores no finitos (NaN e infinitos) por pares.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.correlation import correlation_matrix
+
+
+@pytest.fixture
+def data_with_inf() -> pd.DataFrame:
+    """Columnas con NaN e infinitos, como migration_ratio de compute_net_migration."""
+    rng = np.random.default_rng(0)
+    n = 200
+    
+    immigration = rng.gamma(2.0, 50.0, n)
+    emigration = rng.gamma(2.0, 50.0, n)
+    emigration[:15] = 0.0
+    
+    data = pd.DataFrame({
+        'immigration': immigration,
+        'emigration': emigration,
+        'net_balance': immigration - emigration,
+        'migration_ratio': np.divide(immigration, emigration, out=np.full(n, np.inf), where=emigration > 0)
+    })
+    data.loc[20:30, 'net_balance'] = np.nan
+    data.loc[40:45, 'immigration'] = -np.inf
+    
+    return data
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+def test_correlation_matrix_ignores_infinite_values(data_with_inf, method):
+    result = correlation_matrix(data_with_inf, method)
+    expected = data_with_inf.corr(method=method).to_numpy()
+    
+    assert np.isfinite(result['r']).all()
+    np.testing.assert_allclose(result['r'], expected, atol=1e-12)
+
+
+def test_correlation_matrix_counts_only_finite_pairs(data_with_inf):
+    result = correlation_matrix(data_with_inf)
+    finite = np.isfinite(data_with_inf.to_numpy()).astype(np.int64)
+    
+    np.testing.assert_array_equal(result['n'], finite.T @ finite)
+
+
+def test_correlation_matrix_large_offset():
+    # Serie en torno a 1e9 con desviación 1e3: Σx² − (Σx)²/n sin centrar pierde ~1e-4 en r
+    rng = np.random.default_rng(1)
+    n = 500
+    x = rng.normal(size=n)
+    
+    data = pd.DataFrame({
+        'offset': 1e9 + 1e3 * x,
+        'noisy': x + rng.normal(size=n),
+        'other': rng.normal(size=n)
+    })
+    data.loc[:60, 'other'] = np.nan
+    data.loc[100:130, 'offset'] = np.nan
+    
+    result = correlation_matrix(data)
+    
+    np.testing.assert_allclose(result['r'], data.corr().to_numpy(), atol=1e-9)
@@ -0,0 +1,58 @@
+"""
+Tests del Feature Store País × Año
+==================================
+
+La tabla actualizada de forma incremental debe coincidir con la calculada
+en memoria, también cuando aparecen países nuevos.
+"""
+
+import pandas as pd
+import pytest
+
+from components.feature_store import (
+    update_feature_store, load_store, compute_feature_table, read_features, select_features
+)
+
+
+INDICATORS = {'gdp_per_capita': 'NY.GDP.PCAP.CD'}
+
+
+@pytest.fixture
+def wdi_panel() -> pd.DataFrame:
+    """Panel WDI largo con un indicador para tres países."""
+    return pd.DataFrame({
+        'iso3': ['ESP', 'ESP', 'FRA', 'PRT'],
+        'IndicatorCode': 'NY.GDP.PCAP.CD',
+        'Year': [2000, 2002, 2001, 2000],
+        'Value': [1.0, 2.0, 3.0, 4.0]
+    })
+
+
+def corridors(rows) -> pd.DataFrame:
+    """Recuentos por corredor y año a partir de tuplas (origen, destino, año, n)."""
+    return pd.DataFrame(rows, columns=['origin_iso3', 'destination_iso3', 'year', 'n_researchers'])
+
+
+def test_new_country_rebuilds_dense_grid(tmp_path, wdi_panel):
+    update_feature_store(corridors([('ESP', 'FRA', 2000, 3), ('FRA', 'ESP', 2002, 1)]), wdi_panel, INDICATORS, tmp_path)
+    
+    # PRT solo aparece en 2001: el resto de años también necesita sus filas
+    yearly = corridors([('ESP', 'FRA', 2000, 3), ('FRA', 'ESP', 2002, 1), ('PRT', 'ESP', 2001, 2)])
+    update_feature_store(yearly, wdi_panel, INDICATORS, tmp_path)
+    
+    table, manifest = load_store(tmp_path)
+    expected = compute_feature_table(yearly, wdi_panel, INDICATORS).reset_index()
+    
+    assert len(table) == 3 * 3
+    pd.testing.assert_frame_equal(table, expected, check_categorical=False)
+
+
+def test_select_features_matches_store(tmp_path, wdi_panel):
+    yearly = corridors([('ESP', 'FRA', 2000, 3), ('FRA', 'ESP', 2002, 1)])
+    update_feature_store(yearly, wdi_panel, INDICATORS, tmp_path)
+    
+    features = ['net_balance', 'gdp_per_capita']
+    stored = read_features(features, (2001, 2002), tmp_path)
+    in_memory = select_features(compute_feature_table(yearly, wdi_panel, INDICATORS), features, (2001, 2002))
+    
+    pd.testing.assert_frame_equal(stored, in_memory, check_categorical=False)
@@ -0,0 +1,33 @@
+"""
+Tests del Cribado de Indicadores
+================================
+
+Comparan screen_indicators con pandas.DataFrame.corrwith (datos
+faltantes por pares).
+"""
+
+import numpy as np
+import pandas as pd
+
+from components.screening import screen_indicators
+
+
+def test_screen_indicators_large_offset():
+    # Indicador en torno a 1e9 con desviación 1e3 (p. ej. población)
+    rng = np.random.default_rng(1)
+    n = 200
+    x = rng.normal(size=n)
+    
+    matrix = pd.DataFrame({
+        'OFFSET': 1e9 + 1e3 * x,
+        'SCALED': 1e3 * x + rng.normal(size=n),
+        'CONSTANT': np.full(n, 1e9)
+    })
+    matrix.loc[:20, 'SCALED'] = np.nan
+    target = pd.Series(x + rng.normal(size=n))
+    
+    result = screen_indicators(matrix, target).set_index('IndicatorCode')
+    expected = matrix[['OFFSET', 'SCALED']].corrwith(target)
+    
+    np.testing.assert_allclose(result.loc[expected.index, 'r'], expected, atol=1e-12)
+    assert np.isnan(result.loc['CONSTANT', 'r'])